@@ -78,10 +78,20 @@ else
     echo "⚠️ populate_data command not found, skipping..."
 fi
 
+# Refresh precomputed related projects (kept up to date by signals afterwards)
+echo "🔗 Rebuilding related projects..."
+python manage.py rebuild_related_projects || echo "⚠️ Related projects rebuild failed"
+
+# Store srcset data for images saved before variants existed (or after presets changed)
+echo "🖼️  Rebuilding responsive image variants..."
+python manage.py rebuild_image_variants || echo "⚠️ Image variants rebuild failed"
+python manage.py backfill_image_placeholders || echo "⚠️ Image placeholder backfill failed"
+
 # NEW: Check existing images and their storage
 echo "🖼️  Checking image storage..."
 if python manage.py help fix_cloudinary_images >/dev/null 2>&1; then
-    python manage.py fix_cloudinary_images
+    # Bounded by --deadline so slow assets cannot stall the deploy
+    python manage.py fix_cloudinary_images --deadline 60 --report asset-health.json || echo "⚠️ Image check failed"
 else
     echo "⚠️ fix_cloudinary_images command not found, skipping image check..."
 fi
@@ -108,3 +118,5 @@ echo "   1. All images should be uploaded through Django Admin (/admin/)"
 echo "   2. Images are stored in Cloudinary and will persist between deployments"
 echo "   3. If images disappear, check Cloudinary environment variables"
 echo "   4. Re-upload any missing images through the admin interface"
+echo "   5. Queued tasks (contact emails, image placeholders) run in the web process"
+echo "      unless TASK_WORKER=True and a 'python manage.py run_worker' service runs"
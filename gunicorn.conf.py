@@ -0,0 +1,11 @@
+# gunicorn.conf.py - read by gunicorn from the working directory
+
+
+def post_worker_init(worker):
+    """Open the persistent database connections before taking requests"""
+    from main.database import warm_up
+
+    timings = warm_up()
+    if timings:
+        worker.log.info('Database connections ready: %s', ', '.join(
+            f'{alias} {elapsed:.0f} ms' for alias, elapsed in timings.items()))
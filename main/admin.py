@@ -1,15 +1,49 @@
 # main/admin.py - Enhanced with debugging (Updated Skills section - NO PROFICIENCY)
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from django.contrib import messages
-from .models import Profile, Project, Skill, Resume, ContactMessage
+from django.utils import timezone
+from .media import variant_transformation
+from .archive import read_archived
+from .queue import backlog
+from .models import ArchivedMessage, Profile, Project, Skill, Resume, ContactMessage, Task
+from .templatetags.images import responsive_image
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class DebugColumnsMixin:
+    """Adds ``debug_list_display`` to the changelist when ADMIN_DEBUG_COLUMNS is on"""
+    debug_list_display = []
+
+    def get_list_display(self, request):
+        list_display = super().get_list_display(request)
+        if settings.ADMIN_DEBUG_COLUMNS:
+            return [*list_display, *self.debug_list_display]
+        return list_display
+
+
+class OptionalEditableMixin:
+    """Drops ``list_editable`` when ADMIN_LIST_EDITABLE is turned off.
+
+    Each editable cell renders a form widget, which on large changelists
+    costs more than everything else on the page.
+    """
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        if not settings.ADMIN_LIST_EDITABLE:
+            changelist.list_editable = ()
+        return changelist
+
+
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
+class ProfileAdmin(DebugColumnsMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'image_preview']  # Removed updated_at
+    debug_list_display = ['image_url_debug']
     fields = [
         'name', 'tagline', 'bio', 'email', 'location',
         'profile_image',
@@ -19,8 +53,8 @@ class ProfileAdmin(admin.ModelAdmin):
     def image_preview(self, obj):
         if obj.profile_image:
             return format_html(
-                '<img src="{}" style="width: 50px; height: 50px; object-fit: cover; border-radius: 25px;" />',
-                obj.profile_image.url
+                '<img src="{}" width="50" height="50" loading="lazy" style="object-fit: cover; border-radius: 25px;" />',
+                obj.get_profile_image_url(variant_transformation('avatar', 150))
             )
         return "No image"
     image_preview.short_description = 'Profile Image'
@@ -28,7 +62,7 @@ class ProfileAdmin(admin.ModelAdmin):
     def image_url_debug(self, obj):
         """Debug field to show the actual URL being stored"""
         if obj.profile_image:
-            return format_html('<code style="font-size: 10px;">{}</code>', obj.profile_image.url)
+            return format_html('<code style="font-size: 10px;">{}</code>', obj.get_profile_image_url())
         return "No URL"
     image_url_debug.short_description = 'Image URL'
 
@@ -53,8 +87,9 @@ class SkillAdmin(admin.ModelAdmin):
     ordering = ['name']  # Changed ordering since we're not showing proficiency
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
-    list_display = ['title', 'status', 'is_featured', 'image_preview', 'image_url_debug', 'tech_count', 'created_at']
+class ProjectAdmin(OptionalEditableMixin, DebugColumnsMixin, admin.ModelAdmin):
+    list_display = ['title', 'status', 'is_featured', 'image_preview', 'tech_count', 'created_at']
+    debug_list_display = ['image_url_debug']
     list_filter = ['status', 'is_featured', 'technologies']
     search_fields = ['title', 'description']
     list_editable = ['status', 'is_featured']
@@ -76,23 +111,25 @@ class ProjectAdmin(admin.ModelAdmin):
         })
     )
 
+    def get_queryset(self, request):
+        # One query for the whole changelist instead of a COUNT per row
+        return super().get_queryset(request).annotate(tech_total=Count('technologies', distinct=True))
+
+    @admin.display(description='Tech Count', ordering='tech_total')
     def tech_count(self, obj):
-        return obj.technologies.count()
-    tech_count.short_description = 'Tech Count'
+        return obj.tech_total
 
     def image_preview(self, obj):
         if obj.image:
-            return format_html(
-                '<img src="{}" style="width: 60px; height: 45px; object-fit: cover; border-radius: 5px;" />',
-                obj.image.url
-            )
+            # The stored 60px thumbnail variant, no URL building per row
+            return responsive_image(obj, 'thumb', style='width: 60px; height: 45px; object-fit: cover; border-radius: 5px;')
         return "No image"
     image_preview.short_description = 'Image'
 
     def image_url_debug(self, obj):
         """Debug field to show the actual URL being stored"""
         if obj.image:
-            return format_html('<code style="font-size: 10px;">{}</code>', obj.image.url)
+            return format_html('<code style="font-size: 10px;">{}</code>', obj.get_image_url())
         return "No URL"
     image_url_debug.short_description = 'Image URL'
 
@@ -108,8 +145,10 @@ class ProjectAdmin(admin.ModelAdmin):
 
 
 @admin.register(Resume)
-class ResumeAdmin(admin.ModelAdmin):
-    list_display = ['title', 'is_active', 'file_info_debug', 'file_link', 'download_link', 'uploaded_at']
+class ResumeAdmin(DebugColumnsMixin, admin.ModelAdmin):
+    # The links use signed URLs that main.media caches between renders
+    list_display = ['title', 'is_active', 'file_link', 'download_link', 'uploaded_at']
+    debug_list_display = ['file_info_debug']
     list_filter = ['is_active', 'uploaded_at']
     fields = ['title', 'file', 'is_active']
 
@@ -186,6 +225,54 @@ class ContactMessageAdmin(admin.ModelAdmin):
         })
     )
 
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(admin.ModelAdmin):
+    """Read-only view of the archive index; only the detail page opens a file"""
+    list_display = ['name', 'email', 'subject', 'created_at', 'archive']
+    search_fields = ['name', 'email', 'subject']
+    fields = ['name', 'email', 'subject', 'created_at', 'archived_at', 'archive', 'message']
+    readonly_fields = ['message']
+    # The index grows without bound; skip the unfiltered COUNT(*)
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Message')
+    def message(self, obj):
+        row = read_archived(settings.MESSAGE_ARCHIVE_ROOT, obj)
+        return row['message'] if row else 'Archive file not found'
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'queue', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at']
+    list_filter = ['status', 'queue', 'name']
+    readonly_fields = ['locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at']
+    actions = ['retry_tasks']
+
+    def changelist_view(self, request, extra_context=None):
+        waiting = backlog()
+        if waiting['count']:
+            messages.warning(request, (
+                f"{waiting['count']} task(s) waiting, the oldest due since "
+                f"{timezone.localtime(waiting['oldest']):%Y-%m-%d %H:%M}. "
+                'Is a run_worker process running (or TASK_WORKER off)?'
+            ))
+        return super().changelist_view(request, extra_context)
+
+    @admin.action(description='Retry selected tasks now')
+    def retry_tasks(self, request, queryset):
+        count = queryset.exclude(status=Task.RUNNING).update(
+            status=Task.PENDING, attempts=0, run_at=timezone.now(), locked_by='', locked_at=None,
+        )
+        messages.success(request, f'{count} task(s) queued again.')
+
 # Customize admin site
 admin.site.site_header = 'Vedang Portfolio Admin'
 admin.site.site_title = 'Portfolio Admin'
@@ -0,0 +1,120 @@
+# main/archive.py
+"""Retention for ContactMessage: old read messages move to archive files.
+
+``archive_messages`` takes read messages created before a cutoff, oldest
+first, ``chunk_size`` at a time. For each chunk it:
+
+1. appends the full rows to one gzipped NDJSON file per day of creation
+   (``messages/2024/05/2024-05-17.ndjson.gz`` under the archive root,
+   the same row format as main.backup), flushed to disk;
+2. records an ArchivedMessage index row per message (sender, subject,
+   dates, file) and deletes the messages by primary key.
+
+Each chunk is its own short transaction, so the table is never locked
+for long, and ``pause`` leaves room for other writers between chunks.
+On PostgreSQL the chunk rows are locked with SKIP LOCKED, so a message
+being marked unread in the admin at that moment is left for next time.
+
+Appending adds a gzip member to an existing day file, which readers
+handle transparently. If a run dies after writing a file but before its
+transaction commits, the next run writes those messages again: files may
+hold duplicates (``read_archived`` returns the last copy), the index
+never does.
+
+The admin lists and searches the index only; a message body is read from
+its day file when one archived message is opened.
+"""
+import gzip
+import io
+import json
+import os
+import time
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .backup import BackupEncoder, field_names
+from .models import ArchivedMessage, ContactMessage
+
+
+def partition(created_at):
+    """Archive file of a message, relative to the archive root"""
+    day = timezone.localdate(created_at)
+    return f'messages/{day:%Y}/{day:%m}/{day:%Y-%m-%d}.ndjson.gz'
+
+
+def expired(cutoff):
+    """Messages the retention policy archives: read, and created before ``cutoff``"""
+    return ContactMessage.objects.filter(is_read=True, created_at__lt=cutoff)
+
+
+def append_rows(path, rows, compresslevel=6):
+    """Append ``rows`` to the gzipped NDJSON file ``path`` and flush it to disk"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab', compresslevel=compresslevel, mtime=0) as compressed:
+            with io.TextIOWrapper(compressed, encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(row, cls=BackupEncoder, separators=(',', ':')))
+                    f.write('\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive_chunk(cutoff, root, chunk_size):
+    """Archive up to ``chunk_size`` messages; returns {file: message count}"""
+    with transaction.atomic():
+        rows = list(
+            expired(cutoff).select_for_update(skip_locked=True)
+            .order_by('created_at', 'pk').values(*field_names(ContactMessage))[:chunk_size]
+        )
+        files = defaultdict(list)
+        for row in rows:
+            files[partition(row['created_at'])].append(row)
+        for name, file_rows in files.items():
+            append_rows(os.path.join(root, name), file_rows)
+
+        ArchivedMessage.objects.bulk_create(
+            [
+                ArchivedMessage(
+                    message_id=row['id'], name=row['name'], email=row['email'],
+                    subject=row['subject'], created_at=row['created_at'], archive=name,
+                )
+                for name, file_rows in files.items()
+                for row in file_rows
+            ],
+            ignore_conflicts=True,
+        )
+        ContactMessage.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+    return {name: len(file_rows) for name, file_rows in files.items()}
+
+
+def archive_messages(cutoff, root, chunk_size=500, pause=0, log=None):
+    """Move every expired message into ``root``; returns how many were moved"""
+    total = 0
+    while True:
+        files = archive_chunk(cutoff, root, chunk_size)
+        if not files:
+            return total
+        total += sum(files.values())
+        if log:
+            log(total, files)
+        if pause:
+            time.sleep(pause)
+
+
+def read_archived(root, entry):
+    """The archived row of ArchivedMessage ``entry`` (a dict), or None"""
+    if not root:
+        return None
+    found = None
+    try:
+        with gzip.open(os.path.join(root, entry.archive), 'rt', encoding='utf-8') as f:
+            for line in f:
+                row = json.loads(line)
+                if row['id'] == entry.message_id:
+                    found = row
+    except FileNotFoundError:
+        return None
+    return found
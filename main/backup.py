@@ -0,0 +1,293 @@
+# main/backup.py
+"""Streaming backup format shared by ``backup_data`` and ``restore_data``.
+
+A backup is a directory holding one gzip-compressed NDJSON file per
+table (one JSON object per line) and a ``manifest.json`` listing each
+file's row count, size and SHA-256. The manifest is written last, so a
+directory without one is an interrupted backup.
+
+Rows are read with ``.iterator()`` and written one at a time, so memory
+use does not grow with the table. Technologies are stored as
+(project id, skill name) pairs: projects keep their UUIDs everywhere,
+while skills are matched by name on restore.
+
+Derived tables (search documents, related projects) are not backed up;
+``rebuild_search_index`` and ``rebuild_related_projects`` recreate them.
+Neither are the task queue and asset checks. The archived message index
+is, but the archive files it points to (main.archive) are not; copy
+MESSAGE_ARCHIVE_ROOT along with the backups.
+
+An incremental backup (``since``) holds the rows whose ``updated_at``
+is since then, i.e. created or saved since then (archived messages, which
+never change, by ``archived_at``). For each changed project it also holds
+that project's full technology set. Deletions are not recorded, and
+neither are ``QuerySet.update()`` calls that leave ``updated_at`` alone.
+
+``restore_backup`` loads a backup with bulk_create in batches inside one
+transaction. Rows are upserted by primary key, except skills, which are
+matched by name, so restoring into a non-empty database updates it in
+place. Stored timestamps (``updated_at`` included) are kept as they were.
+"""
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+
+from cloudinary import CloudinaryResource
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ArchivedMessage, ContactMessage, Profile, Project, Resume, Skill
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+CHUNK_SIZE = 2000
+
+# ``since_field`` picks the rows of an incremental backup
+Table = namedtuple('Table', 'name model since_field')
+TABLES = [
+    Table('skills', Skill, 'updated_at'),
+    Table('projects', Project, 'updated_at'),
+    Table('project_technologies', Project.technologies.through, None),
+    Table('profile', Profile, 'updated_at'),
+    Table('resumes', Resume, 'updated_at'),
+    Table('messages', ContactMessage, 'updated_at'),
+    Table('archived_messages', ArchivedMessage, 'archived_at'),
+]
+
+
+class BackupError(Exception):
+    pass
+
+
+class BackupEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, CloudinaryResource):
+            return o.get_prep_value()
+        if isinstance(o, datetime.datetime):
+            # DjangoJSONEncoder drops microseconds below a millisecond
+            return o.isoformat()
+        return super().default(o)
+
+
+def field_names(model):
+    """Column attribute names stored for ``model`` (``id``, ``file``...)"""
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def table_rows(table, since=None):
+    """Dicts of the rows of ``table``, streamed from the database"""
+    if table.name == 'project_technologies':
+        rows = table.model.objects.order_by('project_id', 'skill__name')
+        if since is not None:
+            rows = rows.filter(project__updated_at__gte=since)
+        for project_id, skill in rows.values_list('project_id', 'skill__name').iterator(chunk_size=CHUNK_SIZE):
+            yield {'project': project_id, 'skill': skill}
+        return
+
+    rows = table.model.objects.order_by('pk')
+    if since is not None:
+        rows = rows.filter(**{f'{table.since_field}__gte': since})
+    yield from rows.values(*field_names(table.model)).iterator(chunk_size=CHUNK_SIZE)
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_table(path, rows, compresslevel=6):
+    """Write ``rows`` as gzipped NDJSON; returns the row count"""
+    count = 0
+    # mtime=0 so the same rows always give the same bytes (and checksum)
+    with gzip.GzipFile(path, 'wb', compresslevel=compresslevel, mtime=0) as raw:
+        with io.TextIOWrapper(raw, encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, cls=BackupEncoder, separators=(',', ':')))
+                f.write('\n')
+                count += 1
+    return count
+
+
+def write_backup(directory, since=None, compresslevel=6, log=None):
+    """Back up every table into ``directory``; returns the manifest"""
+    os.makedirs(directory)
+    manifest = {
+        'format': FORMAT_VERSION,
+        'created_at': timezone.now().isoformat(),
+        'since': since.isoformat() if since else None,
+        'tables': {},
+    }
+    for table in TABLES:
+        filename = f'{table.name}.ndjson.gz'
+        path = os.path.join(directory, filename)
+        rows = write_table(path, table_rows(table, since), compresslevel)
+        manifest['tables'][table.name] = {
+            'file': filename,
+            'rows': rows,
+            'bytes': os.path.getsize(path),
+            'sha256': file_checksum(path),
+        }
+        if log:
+            log(table.name, manifest['tables'][table.name])
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(directory, verify=True):
+    """The manifest of backup ``directory``, after checking every file's checksum"""
+    try:
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise BackupError(f'{directory} has no {MANIFEST}; the backup is incomplete')
+    if manifest.get('format') != FORMAT_VERSION:
+        raise BackupError(f"Unsupported backup format {manifest.get('format')}")
+    if verify:
+        for name, entry in manifest['tables'].items():
+            if file_checksum(os.path.join(directory, entry['file'])) != entry['sha256']:
+                raise BackupError(f"Checksum mismatch for {entry['file']}")
+    return manifest
+
+
+def read_table(directory, entry):
+    """Rows of one manifest entry, streamed from its file"""
+    with gzip.open(os.path.join(directory, entry['file']), 'rt', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def latest_backup(root):
+    """Manifest creation time of the newest complete backup under ``root``"""
+    newest = None
+    if os.path.isdir(root):
+        for entry in os.scandir(root):
+            path = os.path.join(entry.path, MANIFEST)
+            if entry.is_dir() and os.path.exists(path):
+                with open(path) as f:
+                    created_at = json.load(f)['created_at']
+                newest = max(newest or created_at, created_at)
+    return newest
+
+
+@contextmanager
+def stored_timestamps(model):
+    """Let bulk_create write ``auto_now`` fields from the rows instead of now.
+
+    Yields defaults for rows from backups written before a field existed.
+    """
+    fields = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+    now = timezone.now()
+    for field in fields:
+        field.auto_now = False
+    try:
+        yield {field.attname: now for field in fields}
+    finally:
+        for field in fields:
+            field.auto_now = True
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _upsert(model, objs):
+    fields = [field.attname for field in model._meta.concrete_fields if not field.primary_key]
+    model.objects.bulk_create(objs, update_conflicts=True, unique_fields=[model._meta.pk.name], update_fields=fields)
+
+
+def _restore_skills(directory, entry, batch_size):
+    """Upsert skills matched by name; returns name -> pk"""
+    skill_ids = dict(Skill.objects.values_list('name', 'pk'))
+    with stored_timestamps(Skill) as defaults:
+        for batch in _batches(read_table(directory, entry), batch_size):
+            existing, new = [], []
+            for row in batch:
+                pk = skill_ids.get(row['name'])
+                row['id'] = pk
+                (existing if pk is not None else new).append(Skill(**{**defaults, **row}))
+            if existing:
+                _upsert(Skill, existing)
+            if new:
+                Skill.objects.bulk_create(new)
+                if new[0].pk is None:  # backends that cannot return ids
+                    skill_ids = dict(Skill.objects.values_list('name', 'pk'))
+                skill_ids.update((skill.name, skill.pk) for skill in new if skill.pk is not None)
+    return skill_ids
+
+
+def _restore_technologies(directory, entry, project_ids, skill_ids, batch_size):
+    """Replace the technology sets of the restored projects"""
+    Through = Project.technologies.through
+    project_ids = list(project_ids)
+    for start in range(0, len(project_ids), batch_size):
+        Through.objects.filter(project_id__in=project_ids[start:start + batch_size]).delete()
+    missing = set()
+    count = 0
+    for batch in _batches(read_table(directory, entry), batch_size):
+        links = []
+        for row in batch:
+            skill_id = skill_ids.get(row['skill'])
+            if skill_id is None:
+                missing.add(row['skill'])
+                continue
+            links.append(Through(project_id=row['project'], skill_id=skill_id))
+        Through.objects.bulk_create(links, ignore_conflicts=True)
+        count += len(links)
+    if missing:
+        raise BackupError(f"Unknown skills referenced by project technologies: {', '.join(sorted(missing))}")
+    return count
+
+
+def restore_backup(directory, batch_size=1000, log=None):
+    """Load backup ``directory`` in one transaction; returns rows restored per table"""
+    manifest = read_manifest(directory)
+    tables = manifest['tables']
+    restored = {}
+    with transaction.atomic():
+        skill_ids = _restore_skills(directory, tables['skills'], batch_size)
+        restored['skills'] = tables['skills']['rows']
+        if log:
+            log('skills', restored['skills'])
+        project_ids = set()
+        for table in TABLES:
+            if table.name in ('skills', 'project_technologies') or table.name not in tables:
+                continue  # tables added since the backup was written are left alone
+            count = 0
+            with stored_timestamps(table.model) as defaults:
+                for batch in _batches(read_table(directory, tables[table.name]), batch_size):
+                    _upsert(table.model, [table.model(**{**defaults, **row}) for row in batch])
+                    if table.model is Project:
+                        project_ids.update(row['id'] for row in batch)
+                    count += len(batch)
+            restored[table.name] = count
+            if log:
+                log(table.name, count)
+        restored['project_technologies'] = _restore_technologies(
+            directory, tables['project_technologies'], project_ids, skill_ids, batch_size,
+        )
+        if log:
+            log('project_technologies', restored['project_technologies'])
+        # Rows were inserted with explicit ids; move sequences past them
+        models = [table.model for table in TABLES if table.name != 'project_technologies']
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+    return restored
@@ -0,0 +1,220 @@
+# main/cache.py
+"""Content-versioned caching for public pages.
+
+All portfolio content (Profile, Project, Skill, Resume) shares a single
+version number stored in the shared cache. Signals in main.signals bump
+it on every change, and cached pages are keyed by it, so an admin edit
+invalidates the pages of every worker at once without relying on TTLs.
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+try:
+    import brotli
+except ImportError:  # optional; responses fall back to gzip
+    brotli = None
+
+CONTENT_VERSION_KEY = 'portfolio:content-version'
+SKILLS_VERSION_KEY = 'portfolio:skills-version'
+PROFILE_VERSION_KEY = 'portfolio:profile-version'
+RESUME_VERSION_KEY = 'portfolio:resume-version'
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock rather than 1 so a lost key never brings
+        # back entries cached under an earlier version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    version = max(time.time_ns(), (cache.get(key) or 0) + 1)
+    cache.set(key, version, timeout=None)
+    return version
+
+
+def get_content_version():
+    return _get_version(CONTENT_VERSION_KEY)
+
+
+def bump_content_version():
+    return _bump_version(CONTENT_VERSION_KEY)
+
+
+def get_skills_version():
+    """Nanosecond timestamp of the last change to skills or project technologies"""
+    return _get_version(SKILLS_VERSION_KEY)
+
+
+def bump_skills_version():
+    return _bump_version(SKILLS_VERSION_KEY)
+
+
+def get_profile_version():
+    return _get_version(PROFILE_VERSION_KEY)
+
+
+def bump_profile_version():
+    return _bump_version(PROFILE_VERSION_KEY)
+
+
+def get_resume_version():
+    return _get_version(RESUME_VERSION_KEY)
+
+
+def bump_resume_version():
+    return _bump_version(RESUME_VERSION_KEY)
+
+
+def content_validators(parts=('projects', 'profile', 'skills', 'resume'), request=None):
+    """Raw inputs for ETag/Last-Modified, without rendering anything.
+
+    Each part is a one-tuple of the nanosecond version covering it:
+    ``projects`` uses the content version, ``profile``, ``skills`` and
+    ``resume`` their own. Versions are bumped on deletes as well as saves,
+    so unlike a max(updated_at) they also move Last-Modified forward when
+    a row goes away. Passing ``request`` memoizes the result for the rest
+    of that request.
+    """
+    memo = getattr(request, '_content_validators', None)
+    if memo is not None and memo[0] == parts:
+        return memo[1]
+
+    getters = {
+        'projects': get_content_version,
+        'profile': get_profile_version,
+        'skills': get_skills_version,
+        'resume': get_resume_version,
+    }
+    validators = {part: (getters[part](),) for part in parts}
+
+    if request is not None:
+        request._content_validators = (parts, validators)
+    return validators
+
+
+def _last_modified(part):
+    return datetime.datetime.fromtimestamp(part[0] / 1e9, tz=datetime.timezone.utc)
+
+
+def conditional(*parts, weak=False):
+    """Answer conditional GETs with 304 using validators of ``parts``.
+
+    ``parts`` names the content a view depends on: any of ``projects``,
+    ``profile``, ``skills`` and ``resume`` (pages linking ``resume_url``). Use ``weak=True`` when the same content is
+    served with different content encodings. The view can read the same
+    validators again with ``content_validators(parts, request)``.
+    """
+    def etag(request, *args, **kwargs):
+        validators = content_validators(parts, request)
+        raw = repr([validators[part] for part in parts])
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        return f'W/"{digest}"' if weak else digest
+
+    def last_modified(request, *args, **kwargs):
+        validators = content_validators(parts, request)
+        return max(_last_modified(validators[part]) for part in parts)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+_memo = {}
+
+
+def versioned(name, version, build):
+    """``build()`` computed once per ``version``.
+
+    The value is shared through the cache and memoized in the process,
+    so repeat calls for the current version cost a dict lookup.
+    """
+    memo = _memo.get(name)
+    if memo is not None and memo[0] == version:
+        return memo[1]
+
+    key = f'portfolio:{name}:{version}'
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, settings.PAGE_CACHE_TIMEOUT)
+    _memo[name] = (version, value)
+    return value
+
+
+def precompressed_json(name, version, build):
+    """JSON of ``build()``, serialized and compressed once per ``version``.
+
+    Returns a dict of content encoding -> body: ``identity``, ``gzip`` and,
+    when the brotli package is installed, ``br``.
+    """
+    def compress():
+        body = json.dumps(build(), cls=DjangoJSONEncoder).encode()
+        bodies = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            bodies['br'] = brotli.compress(body, quality=11)
+        return bodies
+
+    return versioned(f'payload:{name}', version, compress)
+
+
+def accepted_encodings(request):
+    """Content codings the client accepts (ignoring any with q=0)"""
+    encodings = set()
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = item.partition(';')
+        params = params.replace(' ', '')
+        if coding.strip() and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+def precompressed_response(request, bodies, content_type='application/json'):
+    """Serve the best precompressed body the client accepts"""
+    accepted = accepted_encodings(request)
+    for encoding in ('br', 'gzip'):
+        if encoding in bodies and encoding in accepted:
+            response = HttpResponse(bodies[encoding], content_type=content_type)
+            response['Content-Encoding'] = encoding
+            break
+    else:
+        response = HttpResponse(bodies['identity'], content_type=content_type)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def page_cache_key(request, name):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'portfolio:page:{get_content_version()}:{name}:{path}'
+
+
+def content_cached(view):
+    """Cache successful anonymous GET responses of ``view`` per content version"""
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        key = page_cache_key(request, view.__name__)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            cache.set(key, (response.content, response['Content-Type']), settings.PAGE_CACHE_TIMEOUT)
+        return response
+    return wrapped
@@ -0,0 +1,15 @@
+# main/context_processors.py
+from django.utils.functional import SimpleLazyObject
+
+from .profile import get_profile
+from .resume import download_url
+
+
+def profile(request):
+    """Expose the cached site profile to every template as ``profile``"""
+    return {'profile': SimpleLazyObject(get_profile)}
+
+
+def resume(request):
+    """Expose the versioned resume download link as ``resume_url``"""
+    return {'resume_url': SimpleLazyObject(download_url)}
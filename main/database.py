@@ -0,0 +1,39 @@
+# main/database.py
+"""Database connection lifecycle.
+
+With DB_CONN_MAX_AGE > 0 (portfolio.settings) a worker keeps its
+connection between requests instead of paying a connect, and with
+PostgreSQL a TLS handshake, on every one. Django closes it once it is
+older than that, or when it turns out to be unusable, and with
+DB_CONN_HEALTH_CHECKS it is checked before the first query of a request
+reuses it, so a connection dropped by the server or a proxy costs a
+reconnect rather than a 500.
+
+``warm_up`` opens the connections ahead of the first request; gunicorn
+calls it from ``post_worker_init`` (gunicorn.conf.py). Connections belong
+to a thread, so this covers the sync worker class; threaded workers open
+their own on first use.
+"""
+import logging
+import time
+
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(aliases=None):
+    """Connect to each persistent database; returns {alias: milliseconds}"""
+    timings = {}
+    for alias in aliases or connections:
+        connection = connections[alias]
+        if not connection.settings_dict['CONN_MAX_AGE']:
+            continue  # closed again at the start of the first request
+        start = time.perf_counter()
+        try:
+            connection.ensure_connection()
+        except DatabaseError as e:
+            logger.warning('Could not warm up database %s: %s', alias, e)
+            continue
+        timings[alias] = (time.perf_counter() - start) * 1000
+    return timings
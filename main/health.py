@@ -0,0 +1,174 @@
+# main/health.py
+"""Concurrent health checks of the media assets referenced by the database.
+
+Every Profile image, Project image and Resume file is requested with HEAD
+from a bounded thread pool sharing one pooled ``requests.Session``:
+
+* at most ``per_host`` requests are in flight to any one host, so the
+  check never hammers the CDN;
+* the whole run has a ``deadline``; requests still queued when it passes
+  are reported as ``timeout`` and retried on the next run;
+* results are stored in AssetCheck, and an asset whose URL (and so its
+  Cloudinary version) is unchanged since a passing check younger than
+  ``max_age`` is not requested again.
+
+Only the calling thread touches the database.
+"""
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.utils import timezone
+
+from .media import resource_url
+from .models import AssetCheck, Profile, Project, Resume
+
+ASSET_FIELDS = [(Profile, 'profile_image'), (Project, 'image'), (Resume, 'file')]
+
+Asset = namedtuple('Asset', 'key label url')
+
+
+def collect_assets():
+    """Every stored asset with its delivery URL (None if it cannot be built)"""
+    assets = []
+    for model, field in ASSET_FIELDS:
+        for obj in model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''}):
+            try:
+                # Absolute even with the media proxy on: requests needs a host
+                url = resource_url(getattr(obj, field), proxy=False)
+            except Exception:
+                url = None
+            assets.append(Asset(f'{model._meta.model_name}:{obj.pk}:{field}', str(obj), url))
+    return assets
+
+
+class HealthChecker:
+    """Checks assets concurrently; see the module docstring"""
+
+    def __init__(self, workers=16, per_host=4, timeout=10.0, deadline=60.0,
+                 max_age=timedelta(days=7), force=False):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_age = max_age
+        self.force = force
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return self._hosts[host]
+
+    def _result(self, asset, result, status_code=None, error='', elapsed_ms=None):
+        return {
+            'key': asset.key,
+            'label': asset.label,
+            'url': asset.url,
+            'result': result,
+            'status_code': status_code,
+            'error': error[:300],
+            'elapsed_ms': elapsed_ms,
+        }
+
+    def check(self, asset, deadline_at):
+        """Request one asset; runs on a pool thread"""
+        if asset.url is None:
+            return self._result(asset, 'failed', error='Could not build a delivery URL')
+        slot = self._host_slot(asset.url)
+        if not slot.acquire(timeout=max(0, deadline_at - time.monotonic())):
+            return self._result(asset, 'timeout')
+        try:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                return self._result(asset, 'timeout')
+            timeout = min(self.timeout, remaining)
+            start = time.perf_counter()
+            try:
+                response = self.session.head(asset.url, timeout=timeout, allow_redirects=True)
+                if response.status_code in (405, 501):
+                    # Some origins only answer GET; read the headers, not the body
+                    response = self.session.get(asset.url, timeout=timeout, stream=True)
+                    response.close()
+            except requests.RequestException as e:
+                elapsed = (time.perf_counter() - start) * 1000
+                return self._result(asset, 'failed', error=f'{type(e).__name__}: {e}', elapsed_ms=round(elapsed, 1))
+            elapsed = (time.perf_counter() - start) * 1000
+            result = 'ok' if 200 <= response.status_code < 400 else 'failed'
+            return self._result(asset, result, status_code=response.status_code, elapsed_ms=round(elapsed, 1))
+        finally:
+            slot.release()
+
+    def run(self, assets):
+        """Check ``assets`` and store the outcome; returns the JSON report"""
+        started_at = timezone.now()
+        start = time.monotonic()
+        deadline_at = start + self.deadline
+
+        previous = {check.key: check for check in AssetCheck.objects.filter(key__in=[a.key for a in assets])}
+        fresh_after = started_at - self.max_age
+        results = {}
+        pending = []
+        for asset in assets:
+            check = previous.get(asset.key)
+            if (not self.force and check is not None and check.ok and check.url == asset.url
+                    and check.checked_at >= fresh_after):
+                results[asset.key] = self._result(asset, 'unchanged', status_code=check.status_code)
+            else:
+                pending.append(asset)
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='asset-check')
+        futures = {executor.submit(self.check, asset, deadline_at): asset for asset in pending}
+        done, not_done = wait(futures, timeout=max(0, deadline_at - time.monotonic()))
+        executor.shutdown(wait=False, cancel_futures=True)
+        for future in done:
+            result = future.result()
+            results[result['key']] = result
+        for future in not_done:
+            asset = futures[future]
+            results[asset.key] = self._result(asset, 'timeout')
+
+        self._store([results[asset.key] for asset in pending], previous)
+
+        ordered = [results[asset.key] for asset in assets]
+        summary = {name: 0 for name in ('ok', 'failed', 'unchanged', 'timeout')}
+        for result in ordered:
+            summary[result['result']] += 1
+        return {
+            'started_at': started_at.isoformat(),
+            'duration_ms': round((time.monotonic() - start) * 1000, 1),
+            'deadline_exceeded': bool(not_done),
+            'summary': summary,
+            'assets': ordered,
+        }
+
+    def _store(self, results, previous):
+        now = timezone.now()
+        created, updated = [], []
+        for result in results:
+            if result['result'] == 'timeout' or result['url'] is None:
+                continue  # nothing learned; check again next time
+            check = previous.get(result['key']) or AssetCheck(key=result['key'])
+            check.url = result['url']
+            check.status_code = result['status_code']
+            check.ok = result['result'] == 'ok'
+            check.error = result['error']
+            check.elapsed_ms = result['elapsed_ms']
+            check.checked_at = now
+            (updated if check.pk else created).append(check)
+        AssetCheck.objects.bulk_create(created, batch_size=500)
+        AssetCheck.objects.bulk_update(
+            updated, ['url', 'status_code', 'ok', 'error', 'elapsed_ms', 'checked_at'], batch_size=500
+        )
@@ -0,0 +1,98 @@
+# main/http.py
+"""File responses with single byte-range support (RFC 9110 section 14).
+
+Django's FileResponse always sends the whole file. ``ranged_file_response``
+also answers ``Range: bytes=...`` with 206 Partial Content, so interrupted
+downloads resume and PDF viewers can fetch only the pages they show.
+``If-Range`` is honoured: when the client's copy is outdated it gets the
+whole new file instead of a piece of it. Multi-range requests get the
+whole file, which the RFC allows.
+"""
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """Inclusive (start, end) of a single-range header, or None for the whole file"""
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if match is None:
+        return None  # absent, multi-range or not bytes: ignore it
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the final ``last`` bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def _if_range_matches(request, etag, last_modified):
+    validator = request.headers.get('If-Range')
+    if validator is None:
+        return True
+    if validator.startswith(('"', 'W/')):
+        # Only strong ETags may be used
+        return etag is not None and validator == etag and not etag.startswith('W/')
+    return last_modified is not None and validator == http_date(last_modified)
+
+
+def _read(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def ranged_file_response(request, file, content_type, etag=None, last_modified=None):
+    """Response for open binary ``file``: 200, 206 or 416.
+
+    ``last_modified`` is a Unix timestamp. ``etag``, when given, must be
+    the quoted strong ETag of exactly these bytes.
+    """
+    size = os.fstat(file.fileno()).st_size
+    byte_range = None
+    if 'Range' in request.headers and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except RangeNotSatisfiable:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(_read(file, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,49 @@
+# main/management/commands/archive_messages.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from main.archive import archive_messages, expired
+
+
+class Command(BaseCommand):
+    help = 'Move read contact messages older than the retention period into compressed daily archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.MESSAGE_RETENTION_DAYS,
+                            help='Archive read messages older than this many days')
+        parser.add_argument('--output', default=settings.MESSAGE_ARCHIVE_ROOT,
+                            help='Archive root directory on persistent storage (default: MESSAGE_ARCHIVE_ROOT)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Messages moved per transaction')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to wait between chunks, to leave room for other writers')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be archived')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+
+        if options['dry_run']:
+            stats = expired(cutoff).aggregate(count=Count('pk'), oldest=Min('created_at'), newest=Max('created_at'))
+            self.stdout.write(f"🔍 Dry run: {stats['count']} read messages older than {cutoff:%Y-%m-%d %H:%M}")
+            if stats['count']:
+                self.stdout.write(f"  created {stats['oldest']:%Y-%m-%d} to {stats['newest']:%Y-%m-%d}")
+            return
+
+        def log(total, files):
+            for name, count in files.items():
+                self.stdout.write(f'  {name:<40} +{count:>6}')
+            self.stdout.write(f'  {total} archived so far')
+
+        if not options['output']:
+            raise CommandError(
+                'MESSAGE_ARCHIVE_ROOT is not set. Archived messages are deleted from the database, '
+                'so point it (or --output) at persistent storage that survives deploys.'
+            )
+        self.stdout.write(f'🗄️  Archiving read messages older than {cutoff:%Y-%m-%d %H:%M} into {options["output"]}')
+        total = archive_messages(cutoff, options['output'], max(1, options['chunk_size']), options['pause'], log=log)
+        self.stdout.write(self.style.SUCCESS(f'✅ Archived {total} messages'))
@@ -0,0 +1,53 @@
+# main/management/commands/backfill_image_placeholders.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.core.management.base import BaseCommand
+from requests.adapters import HTTPAdapter
+
+from main.cache import bump_content_version, bump_profile_version
+from main.models import Profile, Project
+from main.placeholders import measure_url
+
+
+class Command(BaseCommand):
+    help = 'Store image sizes and blurred placeholders for images that have none (in parallel)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Images downloaded at once')
+        parser.add_argument('--force', action='store_true', help='Measure every image again')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_maxsize=workers))
+        session.mount('http://', HTTPAdapter(pool_maxsize=workers))
+
+        total = 0
+        for model in (Project, Profile):
+            field = model.IMAGE_FIELD
+            rows = model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+            if not options['force']:
+                rows = rows.filter(image_placeholder='')
+
+            changed = []
+            # Only downloads and Pillow run on the pool; the database stays on this thread
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(measure_url, getattr(obj, field).url, session): obj for obj in rows}
+                for future in as_completed(futures):
+                    obj = futures[future]
+                    try:
+                        obj.image_width, obj.image_height, obj.image_placeholder = future.result()
+                    except Exception as e:
+                        self.stdout.write(f'⚠️  Could not measure image of {obj}: {e}')
+                        continue
+                    changed.append(obj)
+
+            model.objects.bulk_update(changed, ['image_width', 'image_height', 'image_placeholder'], batch_size=500)
+            total += len(changed)
+            self.stdout.write(self.style.SUCCESS(f'✅ {model.__name__}: stored placeholders for {len(changed)} images'))
+
+        if total:
+            # bulk_update sends no signals, so invalidate cached pages here
+            bump_content_version()
+            bump_profile_version()
@@ -1,24 +1,50 @@
-from django.core.management.base import BaseCommand
-from django.core import serializers
-from main.models import Project, Skill, Profile, ContactMessage
-import json
+# main/management/commands/backup_data.py
+import os
 from datetime import datetime
 
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from main.backup import latest_backup, write_backup
+
+
 class Command(BaseCommand):
-    help = 'Backup portfolio data to JSON'
+    help = 'Back up portfolio data as gzipped NDJSON, one file per table, with a checksum manifest'
 
-    def handle(self, *args, **options):
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'portfolio_backup_{timestamp}.json'
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='backups', help='Directory that holds the backups')
+        parser.add_argument('--since', help='Only rows created/updated since this ISO date or datetime, '
+                                            'or "last" for the newest backup in --output')
+        parser.add_argument('--compress-level', type=int, default=6, choices=range(1, 10))
+
+    def parse_since(self, value, root):
+        if value is None:
+            return None
+        if value == 'last':
+            value = latest_backup(root)
+            if value is None:
+                raise CommandError(f'No complete backup in {root} to continue from')
+        since = parse_datetime(value)
+        if since is None and parse_date(value) is not None:
+            since = datetime.combine(parse_date(value), datetime.min.time())
+        if since is None:
+            raise CommandError(f'Invalid --since value: {value}')
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
 
-        data = {
-            'projects': serializers.serialize('json', Project.objects.all()),
-            'skills': serializers.serialize('json', Skill.objects.all()),
-            'profile': serializers.serialize('json', Profile.objects.all()),
-            'messages': serializers.serialize('json', ContactMessage.objects.all()),
-        }
+    def handle(self, *args, **options):
+        since = self.parse_since(options['since'], options['output'])
+        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S_%f')
+        kind = 'incremental' if since else 'full'
+        directory = os.path.join(options['output'], f'portfolio_{kind}_{timestamp}')
 
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        def log(name, entry):
+            self.stdout.write(f"  {name:<22} {entry['rows']:>8} rows  {filesizeformat(entry['bytes'])}")
 
-        self.stdout.write(self.style.SUCCESS(f'Data backed up to {filename}'))
+        self.stdout.write(f'💾 Writing {kind} backup to {directory}' + (f' (since {since:%Y-%m-%d %H:%M})' if since else ''))
+        manifest = write_backup(directory, since, options['compress_level'], log=log)
+        rows = sum(entry['rows'] for entry in manifest['tables'].values())
+        self.stdout.write(self.style.SUCCESS(f'✅ Backed up {rows} rows to {directory}'))
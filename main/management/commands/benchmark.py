@@ -0,0 +1,370 @@
+# main/management/commands/benchmark.py
+"""Benchmarks for hot paths, run against generated data.
+
+Everything happens inside a transaction that is rolled back at the end,
+so this is safe to point at a real database:
+
+    python manage.py benchmark search --projects 10000
+
+``--db-latency`` adds a fixed delay to every query, which makes the cost
+of query counts visible against a local SQLite file. ``--connect-latency``
+does the same for opening a connection (the ``connections`` scenario),
+standing in for a PostgreSQL connect and TLS handshake.
+"""
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import nullcontext
+
+import cloudinary
+from cloudinary.utils import cloudinary_url
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection, transaction
+from django.db.models import Q
+from django.http import JsonResponse
+from django.template import Context, Template
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.html import format_html
+
+from main import backup, media
+from main.admin import ProjectAdmin
+from main.cache import bump_content_version, bump_skills_version
+from main.models import ContactMessage, Project, Skill
+from main.search import get_backend, search_queryset
+from main.views import skills_api
+
+WORDS = (
+    'vision neural network dashboard realtime sensor energy chatbot health '
+    'recommendation pipeline scraper compiler embedded analytics forecast '
+    'classifier detection tracking inventory payment portfolio robot drone'
+).split()
+SKILLS = ['Python', 'Django', 'React', 'TensorFlow', 'PyTorch', 'OpenCV', 'Docker', 'PostgreSQL', 'Arduino', 'C++']
+
+
+def seed_projects(count, rng):
+    """Bulk-create ``count`` projects with 1-4 technologies each"""
+    skills = [Skill.objects.create(name=name, category='other') for name in SKILLS]
+    projects = [
+        Project(
+            title=' '.join(rng.sample(WORDS, 3)).title(),
+            short_description=' '.join(rng.sample(WORDS, 8)),
+            description=' '.join(rng.choice(WORDS) for _ in range(120)),
+            is_featured=rng.random() < 0.1,
+            order=rng.randrange(10),
+        )
+        for _ in range(count)
+    ]
+    Project.objects.bulk_create(projects, batch_size=1000)
+    Through = Project.technologies.through
+    Through.objects.bulk_create(
+        [
+            Through(project_id=project.pk, skill_id=skill.pk)
+            for project in projects
+            for skill in rng.sample(skills, rng.randint(1, 4))
+        ],
+        batch_size=1000,
+    )
+    return projects
+
+
+def timed(func, repeat):
+    """Median and best wall time of ``func`` in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark hot paths against generated data (rolled back afterwards)'
+
+    scenarios = ['search', 'skills_api', 'image_urls', 'admin', 'restore', 'connections']
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=self.scenarios)
+        parser.add_argument('--projects', type=int, default=10000, help='Number of generated projects')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per measurement')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per throughput measurement')
+        parser.add_argument('--messages', type=int, default=100000, help='Number of generated contact messages')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--admin-target', type=float, default=500,
+                            help='Wall-time budget in ms for rendering the 500-row admin changelist')
+        parser.add_argument('--db-latency', type=float, default=0,
+                            help='Milliseconds added to every query, to mimic a remote database')
+        parser.add_argument('--connect-latency', type=float, default=0,
+                            help='Milliseconds added to every new connection, to mimic a connect and TLS handshake')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.repeat = options['repeat']
+        latency = options['db_latency'] / 1000
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        if options['scenario'] == 'connections':
+            # Opens and closes connections, so it cannot run in a
+            # transaction; it only reads
+            with connection.execute_wrapper(delay) if latency else nullcontext():
+                self.bench_connections(options)
+            return
+
+        with connection.execute_wrapper(delay) if latency else nullcontext(), transaction.atomic():
+            getattr(self, f"bench_{options['scenario']}")(options)
+            transaction.set_rollback(True)
+        # Anything cached from the generated rows must not outlive them
+        bump_content_version()
+        bump_skills_version()
+
+    def report(self, label, func):
+        median, best = timed(func, self.repeat)
+        self.stdout.write(f'  {label:<40} median {median:8.2f} ms   best {best:8.2f} ms')
+        return median
+
+    def bench_search(self, options):
+        self.stdout.write(f"Seeding {options['projects']} projects...")
+        seed_projects(options['projects'], self.rng)
+        backend = get_backend()
+        backend.rebuild()
+
+        def icontains(query):
+            projects = Project.objects.filter(
+                Q(title__icontains=query) |
+                Q(description__icontains=query) |
+                Q(technologies__name__icontains=query)
+            ).distinct()
+            return projects.count(), list(projects[:12])
+
+        def indexed(query):
+            projects = search_queryset(Project.objects.all(), query)
+            return projects.count(), list(projects.order_by('-search_rank', 'pk')[:12])
+
+        self.stdout.write(f'Search backend: {backend.vendor or "icontains"}')
+        for query in ['python', 'neural network', 'drone', 'nomatch']:
+            self.stdout.write(f'Query "{query}":')
+            before = self.report('icontains + distinct', lambda: icontains(query))
+            after = self.report('full-text index', lambda: indexed(query))
+            self.stdout.write(f'  speedup x{before / after:.1f}')
+
+    def throughput(self, label, view, request, count):
+        start = time.perf_counter()
+        for _ in range(count):
+            response = view(request)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'  {label:<40} {count / elapsed:10.0f} req/s   {len(response.content):6d} bytes'
+        )
+        return count / elapsed
+
+    def bench_skills_api(self, options):
+        for i in range(40):
+            Skill.objects.create(name=f'Skill {i}', category='other', proficiency=i, icon='fas fa-code')
+
+        def legacy_skills_api(request):
+            skills = Skill.objects.all().values('name', 'proficiency', 'category', 'icon')
+            return JsonResponse({'skills': list(skills)})
+
+        factory = RequestFactory()
+        plain = factory.get('/api/skills/')
+        compressed = factory.get('/api/skills/', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        count = options['requests']
+
+        self.stdout.write('skills_api throughput (view only, no middleware):')
+        before = self.throughput('query + JsonResponse per request', legacy_skills_api, plain, count)
+        skills_api(compressed)
+        after = self.throughput('precompressed (Accept-Encoding: br)', skills_api, compressed, count)
+        self.throughput('precompressed (identity)', skills_api, plain, count)
+        self.stdout.write(f'  speedup x{after / before:.1f}')
+
+    def bench_image_urls(self, options):
+        if not cloudinary.config().cloud_name:
+            cloudinary.config(cloud_name='demo')
+        cloudinary.config(api_secret=cloudinary.config().api_secret or 'benchmark')
+        projects = seed_projects(100, self.rng)
+        for index, project in enumerate(projects):
+            project.image = f'image/upload/v1700000000/portfolio/projects/card-{index}.jpg'
+        Project.objects.bulk_update(projects, ['image'], batch_size=1000)
+        projects = list(Project.objects.all())
+        transformation = {'width': 400, 'height': 300, 'crop': 'fill', 'quality': 'auto', 'fetch_format': 'auto'}
+
+        card = '<div class="card"><img src="{{ %s }}" alt="{{ project.title }}"></div>'
+        legacy = Template('{% for project in projects %}' + card % 'project.image.url' + '{% endfor %}')
+        memoized = Template('{% for project in projects %}' + card % 'project.get_image_url' + '{% endfor %}')
+        context = Context({'projects': projects})
+
+        def signed_each():
+            for project in projects:
+                cloudinary_url(project.image.public_id, sign_url=True, **transformation)
+
+        def signed_memoized():
+            for project in projects:
+                project.get_image_url(dict(transformation, sign_url=True))
+
+        self.stdout.write('Rendering 100 project cards:')
+        media.clear()
+        before = self.report('image.url (built per render)', lambda: legacy.render(context))
+        after = self.report('get_image_url (memoized)', lambda: memoized.render(context))
+        self.stdout.write(f'  speedup x{before / after:.1f}')
+        self.stdout.write('Building 100 signed, transformed URLs:')
+        before = self.report('cloudinary_url(sign_url=True)', signed_each)
+        after = self.report('memoized', signed_memoized)
+        self.stdout.write(f'  speedup x{before / after:.1f}')
+        media.clear()
+
+    def bench_admin(self, options):
+        if not cloudinary.config().cloud_name:
+            cloudinary.config(cloud_name='demo')
+        projects = seed_projects(500, self.rng)
+        for index, project in enumerate(projects):
+            project.image = f'image/upload/v1700000000/portfolio/projects/card-{index}.jpg'
+            project.refresh_image_variants()
+        Project.objects.bulk_update(projects, ['image', 'image_variants'], batch_size=1000)
+
+        class LegacyProjectAdmin(admin.ModelAdmin):
+            """The changelist as it was: a COUNT, a full-size URL and two form widgets per row"""
+            list_display = ['title', 'status', 'is_featured', 'image_preview', 'image_url_debug', 'tech_count']
+            list_editable = ['status', 'is_featured']
+
+            def tech_count(self, obj):
+                return obj.technologies.count()
+
+            def image_preview(self, obj):
+                return format_html('<img src="{}" style="width: 60px; height: 45px;" />', obj.image.url)
+
+            def image_url_debug(self, obj):
+                return format_html('<code>{}</code>', obj.image.url)
+
+        request = RequestFactory().get('/admin/main/project/')
+        request.user = User(username='benchmark', is_staff=True, is_superuser=True, is_active=True)
+
+        def changelist(model_admin):
+            model_admin.list_per_page = 500
+            def render():
+                with CaptureQueriesContext(connection) as queries:
+                    model_admin.changelist_view(request).render()
+                self.queries = len(queries)
+            return render
+
+        self.stdout.write('Rendering the 500-row project changelist:')
+        media.clear()
+        # Admin templates without a collectstatic manifest
+        with override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage'):
+            before = self.report('per-row COUNT + image.url', changelist(LegacyProjectAdmin(Project, admin.site)))
+            self.stdout.write(f'  {"":<40} {self.queries} queries')
+            after = self.report('annotated count + stored thumbnail', changelist(ProjectAdmin(Project, admin.site)))
+            self.stdout.write(f'  {"":<40} {self.queries} queries')
+            with override_settings(ADMIN_LIST_EDITABLE=False):
+                read_only = self.report('... with ADMIN_LIST_EDITABLE=False', changelist(ProjectAdmin(Project, admin.site)))
+            self.stdout.write(f'  {"":<40} {self.queries} queries')
+        self.stdout.write(f'  speedup x{before / after:.1f}')
+        target = options['admin_target']
+        for label, elapsed in (('default', after), ('ADMIN_LIST_EDITABLE=False', read_only)):
+            if elapsed <= target:
+                self.stdout.write(self.style.SUCCESS(f'  {label}: {elapsed:.0f} ms is within the {target:.0f} ms target'))
+            else:
+                self.stdout.write(self.style.ERROR(f'  {label}: {elapsed:.0f} ms misses the {target:.0f} ms target'))
+        media.clear()
+
+    def bench_restore(self, options):
+        self.stdout.write(f"Seeding {options['projects']} projects and {options['messages']} messages...")
+        seed_projects(options['projects'], self.rng)
+        ContactMessage.objects.bulk_create(
+            [
+                ContactMessage(
+                    name=f'Visitor {i}', email=f'visitor{i}@example.com',
+                    subject=' '.join(self.rng.sample(WORDS, 4)),
+                    message=' '.join(self.rng.choice(WORDS) for _ in range(60)),
+                )
+                for i in range(options['messages'])
+            ],
+            batch_size=2000,
+        )
+        directory = tempfile.mkdtemp()
+        try:
+            path = f'{directory}/backup'
+            start = time.perf_counter()
+            manifest = backup.write_backup(path)
+            elapsed = time.perf_counter() - start
+            rows = sum(entry['rows'] for entry in manifest['tables'].values())
+            size = sum(entry['bytes'] for entry in manifest['tables'].values())
+            self.stdout.write(f'  {"backup_data":<40} {elapsed * 1000:10.0f} ms   {rows} rows, {size // 1024} KiB')
+
+            def wipe():
+                for model in (ContactMessage, Project, Skill):
+                    model.objects.all().delete()
+
+            wipe()
+            start = time.perf_counter()
+            backup.restore_backup(path)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'  {"restore_data (bulk, one transaction)":<40} {elapsed * 1000:10.0f} ms   '
+                              f'{rows / elapsed:8.0f} rows/s')
+
+            # What loaddata does: one INSERT per row
+            ContactMessage.objects.all().delete()
+            start = time.perf_counter()
+            for row in backup.read_table(path, manifest['tables']['messages']):
+                ContactMessage(**row).save(force_insert=True)
+            elapsed = time.perf_counter() - start
+            count = manifest['tables']['messages']['rows']
+            self.stdout.write(f'  {"messages row by row (like loaddata)":<40} {elapsed * 1000:10.0f} ms   '
+                              f'{count / elapsed:8.0f} rows/s')
+        finally:
+            shutil.rmtree(directory)
+
+    def bench_connections(self, options):
+        latency = options['connect_latency'] / 1000
+        connect = connection.get_new_connection
+        connects = []
+
+        def counted_connect(conn_params):
+            connects.append(1)
+            time.sleep(latency)
+            return connect(conn_params)
+
+        def request():
+            # What the handler does around a view that runs one query
+            request_started.send(sender=self.__class__)
+            Project.objects.order_by().exists()
+            request_finished.send(sender=self.__class__)
+
+        count = options['requests']
+        saved = connection.settings_dict['CONN_MAX_AGE'], connection.settings_dict['CONN_HEALTH_CHECKS']
+        connection.get_new_connection = counted_connect
+        self.stdout.write(f'{count} requests, one query each ({connection.vendor}):')
+        try:
+            results = {}
+            for label, max_age, health_checks in [
+                ('new connection per request', 0, False),
+                ('persistent', 600, False),
+                ('persistent + health checks', 600, True),
+            ]:
+                connection.close()
+                connection.settings_dict['CONN_MAX_AGE'] = max_age
+                connection.settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                connects.clear()
+                samples = []
+                for _ in range(count):
+                    start = time.perf_counter()
+                    request()
+                    samples.append((time.perf_counter() - start) * 1000)
+                samples.sort()
+                results[label] = statistics.median(samples)
+                self.stdout.write(
+                    f'  {label:<40} median {results[label]:8.3f} ms   '
+                    f'p95 {samples[int(len(samples) * 0.95)]:8.3f} ms   {len(connects)} connects'
+                )
+            self.stdout.write(f"  speedup x{results['new connection per request'] / results['persistent + health checks']:.1f}")
+        finally:
+            del connection.get_new_connection
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'], connection.settings_dict['CONN_HEALTH_CHECKS'] = saved
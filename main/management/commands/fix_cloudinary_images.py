@@ -1,79 +1,53 @@
 # main/management/commands/fix_cloudinary_images.py
-# Create this directory structure: main/management/commands/
+import json
+from datetime import timedelta
 
 from django.core.management.base import BaseCommand
-from main.models import Profile, Project, Resume
-import cloudinary.uploader
-import requests
-from urllib.parse import urlparse
 
-class Command(BaseCommand):
-    help = 'Re-upload any locally stored images to Cloudinary'
-
-    def handle(self, *args, **options):
-        self.stdout.write('🔄 Checking and fixing image storage...')
-
-        # Check Profile images
-        profiles = Profile.objects.all()
-        for profile in profiles:
-            if profile.profile_image:
-                self.check_and_fix_image(profile, 'profile_image', 'portfolio/profile')
-
-        # Check Project images
-        projects = Project.objects.all()
-        for project in projects:
-            if project.image:
-                self.check_and_fix_image(project, 'image', 'portfolio/projects')
+from main.health import HealthChecker, collect_assets
 
-        # Check Resume files
-        resumes = Resume.objects.all()
-        for resume in resumes:
-            if resume.file:
-                self.check_and_fix_file(resume, 'file', 'portfolio/documents')
 
-        self.stdout.write(self.style.SUCCESS('✅ Image fixing completed!'))
-
-    def check_and_fix_image(self, obj, field_name, folder):
-        """Check if image is properly stored in Cloudinary"""
-        field = getattr(obj, field_name)
-        if not field:
-            return
-
-        # Check if URL is from Cloudinary
-        url = str(field)
-        if 'cloudinary.com' not in url:
-            self.stdout.write(f'⚠️  Found non-Cloudinary image for {obj}: {url}')
-            # This would need manual re-upload through admin
-            self.stdout.write(f'   Please re-upload this image through Django admin')
-        else:
-            # Test if Cloudinary URL is accessible
-            try:
-                response = requests.head(url, timeout=10)
-                if response.status_code != 200:
-                    self.stdout.write(f'⚠️  Cloudinary image not accessible for {obj}: {url}')
-                    self.stdout.write(f'   Please re-upload this image through Django admin')
-                else:
-                    self.stdout.write(f'✅ Image OK for {obj}')
-            except requests.RequestException:
-                self.stdout.write(f'⚠️  Cannot verify image for {obj}: {url}')
-
-    def check_and_fix_file(self, obj, field_name, folder):
-        """Check if file is properly stored in Cloudinary"""
-        field = getattr(obj, field_name)
-        if not field:
-            return
+class Command(BaseCommand):
+    help = 'Check that every stored image and file is reachable on Cloudinary (concurrently, within a deadline)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16, help='Requests in flight at once')
+        parser.add_argument('--per-host', type=int, default=4, help='Requests in flight per host')
+        parser.add_argument('--timeout', type=float, default=10.0, help='Seconds per request')
+        parser.add_argument('--deadline', type=float, default=60.0, help='Seconds for the whole run')
+        parser.add_argument('--max-age', type=float, default=24 * 7,
+                            help='Hours a passing check of an unchanged asset is trusted')
+        parser.add_argument('--force', action='store_true', help='Check every asset again')
+        parser.add_argument('--report', help='Write the JSON report to this file ("-" for stdout)')
 
-        url = str(field)
-        if 'cloudinary.com' not in url:
-            self.stdout.write(f'⚠️  Found non-Cloudinary file for {obj}: {url}')
-            self.stdout.write(f'   Please re-upload this file through Django admin')
-        else:
-            try:
-                response = requests.head(url, timeout=10)
-                if response.status_code != 200:
-                    self.stdout.write(f'⚠️  Cloudinary file not accessible for {obj}: {url}')
-                    self.stdout.write(f'   Please re-upload this file through Django admin')
-                else:
-                    self.stdout.write(f'✅ File OK for {obj}')
-            except requests.RequestException:
-                self.stdout.write(f'⚠️  Cannot verify file for {obj}: {url}')
+    def handle(self, *args, **options):
+        self.stdout.write('🔄 Checking image storage...')
+        checker = HealthChecker(
+            workers=max(1, options['workers']),
+            per_host=max(1, options['per_host']),
+            timeout=options['timeout'],
+            deadline=options['deadline'],
+            max_age=timedelta(hours=options['max_age']),
+            force=options['force'],
+        )
+        report = checker.run(collect_assets())
+
+        for asset in report['assets']:
+            if asset['result'] == 'failed':
+                problem = asset['status_code'] or asset['error']
+                self.stdout.write(f"⚠️  Not accessible ({problem}) for {asset['label']}: {asset['url']}")
+                self.stdout.write('   Please re-upload it through Django admin')
+            elif asset['result'] == 'timeout':
+                self.stdout.write(f"⏱️  Not checked before the deadline: {asset['label']}")
+
+        if options['report'] == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif options['report']:
+            with open(options['report'], 'w') as f:
+                json.dump(report, f, indent=2)
+
+        summary = report['summary']
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Checked assets in {report['duration_ms'] / 1000:.1f}s: {summary['ok']} OK, "
+            f"{summary['unchanged']} unchanged, {summary['failed']} failed, {summary['timeout']} timed out"
+        ))
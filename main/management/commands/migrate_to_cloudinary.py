@@ -1,80 +1,65 @@
-# Create this file: main/management/commands/migrate_to_cloudinary.py
+# main/management/commands/migrate_to_cloudinary.py
+import cloudinary
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
 
-import os
-from django.core.management.base import BaseCommand
-from django.core.management import call_command
-from main.models import Profile, Project, Skill, Resume
+from main.media_migration import Manifest, Migrator, find_items
 
-class Command(BaseCommand):
-    help = 'Migrate to Cloudinary storage'
+# Upload speed of one worker assumed by --dry-run before any upload was timed
+DEFAULT_THROUGHPUT = 1024 * 1024
 
-    def handle(self, *args, **options):
-        self.stdout.write("🚀 Starting Cloudinary Migration...")
 
-        # Check environment variables
-        self.stdout.write("📋 Checking environment variables...")
+class Command(BaseCommand):
+    help = 'Upload locally stored media (project images, profile image, resumes) to Cloudinary'
 
-        cloud_name = os.environ.get('CLOUDINARY_CLOUD_NAME')
-        api_key = os.environ.get('CLOUDINARY_API_KEY')
-        api_secret = os.environ.get('CLOUDINARY_API_SECRET')
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(settings.BASE_DIR / 'media'),
+                            help='Local media root the stored paths are relative to')
+        parser.add_argument('--manifest', default='cloudinary_migration.json',
+                            help='Progress file; rerun with the same one to resume')
+        parser.add_argument('--workers', type=int, default=4, help='Files uploaded at once')
+        parser.add_argument('--batch-size', type=int, default=50, help='Rows per bulk_update')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be uploaded, its size and an estimated time')
 
-        if not all([cloud_name, api_key, api_secret]):
-            self.stdout.write(
-                self.style.ERROR('❌ Missing Cloudinary environment variables!')
-            )
-            return
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        manifest = Manifest(options['manifest'])
+        items, missing = find_items(options['source'])
 
-        self.stdout.write(
-            self.style.SUCCESS(f'✅ Environment variables OK - Cloud: {cloud_name}')
-        )
+        for path in missing:
+            self.stdout.write(self.style.WARNING(f'⚠️  Missing local file: {path}'))
 
-        # Create backup
-        self.stdout.write("💾 Creating backup...")
-        try:
-            call_command('dumpdata', 'main', output='backup_cloudinary.json')
-            self.stdout.write(self.style.SUCCESS('✅ Backup created'))
-        except Exception as e:
-            self.stdout.write(self.style.WARNING(f'⚠️ Backup failed: {e}'))
+        resumable = [item for item in items if manifest.done(item)]
+        todo = [item for item in items if not manifest.done(item)]
+        size = sum(item.size for item in todo)
 
-        # Create migrations
-        self.stdout.write("🔧 Creating migrations...")
-        try:
-            call_command('makemigrations', 'main', name='switch_to_cloudinary')
-            self.stdout.write(self.style.SUCCESS('✅ Migrations created'))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'❌ Migration creation failed: {e}'))
+        if options['dry_run']:
+            throughput = manifest.throughput() or DEFAULT_THROUGHPUT
+            estimate = size / (throughput * min(workers, len(todo) or 1))
+            self.stdout.write(f'📋 {len(todo)} files to upload ({filesizeformat(size)}), '
+                              f'{len(resumable)} already uploaded, {len(missing)} missing')
+            self.stdout.write(f'⏱️  Estimated time with {workers} workers: {estimate:.0f}s '
+                              f'at {filesizeformat(throughput)}/s per upload')
             return
 
-        # Run migrations
-        self.stdout.write("⚙️ Running migrations...")
-        try:
-            call_command('migrate')
-            self.stdout.write(self.style.SUCCESS('✅ Migrations applied'))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'❌ Migration failed: {e}'))
+        if not items:
+            self.stdout.write(self.style.SUCCESS('✅ Nothing to migrate'))
             return
 
-        # Test database
-        self.stdout.write("🔍 Testing database...")
-        try:
-            profile_count = Profile.objects.count()
-            project_count = Project.objects.count()
-            skill_count = Skill.objects.count()
-            resume_count = Resume.objects.count()
-
-            self.stdout.write(self.style.SUCCESS(f'✅ Profiles: {profile_count}'))
-            self.stdout.write(self.style.SUCCESS(f'✅ Projects: {project_count}'))
-            self.stdout.write(self.style.SUCCESS(f'✅ Skills: {skill_count}'))
-            self.stdout.write(self.style.SUCCESS(f'✅ Resumes: {resume_count}'))
+        config = cloudinary.config()
+        if not all([config.cloud_name, config.api_key, config.api_secret]):
+            raise CommandError('Missing Cloudinary credentials (CLOUDINARY_CLOUD_NAME, _API_KEY, _API_SECRET)')
 
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'❌ Database test failed: {e}'))
-            return
+        self.stdout.write(f'🚀 Uploading {len(todo)} files ({filesizeformat(size)}) with {workers} workers, '
+                          f'resuming {len(resumable)} from {options["manifest"]}')
+        migrator = Migrator(manifest, workers=workers, batch_size=options['batch_size'], log=self.stdout.write)
+        migrator.run(items)
 
-        self.stdout.write(
-            self.style.SUCCESS('🎉 MIGRATION SUCCESSFUL!')
-        )
-        self.stdout.write("📝 Next Steps:")
-        self.stdout.write("1. Go to Django Admin")
-        self.stdout.write("2. Re-upload all images and files")
-        self.stdout.write("3. Test frontend functionality")
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Uploaded {migrator.uploaded}, applied {migrator.resumed} from the manifest, '
+            f'{len(migrator.failed)} failed'
+        ))
+        if migrator.failed:
+            raise CommandError(f'{len(migrator.failed)} uploads failed; run again to retry them')
@@ -0,0 +1,28 @@
+# main/management/commands/rebuild_image_variants.py
+from django.core.management.base import BaseCommand
+
+from main.cache import bump_content_version, bump_profile_version
+from main.models import Profile, Project
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored responsive image variants of projects and the profile'
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in (Project, Profile):
+            changed = []
+            for obj in model.objects.only('pk', model.IMAGE_FIELD, 'image_variants'):
+                stored = obj.image_variants
+                if obj.refresh_image_variants() != stored:
+                    changed.append(obj)
+            model.objects.bulk_update(changed, ['image_variants'], batch_size=500)
+            total += len(changed)
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {model.__name__}: updated image variants of {len(changed)} rows'
+            ))
+
+        if total:
+            # bulk_update sends no signals, so invalidate cached pages here
+            bump_content_version()
+            bump_profile_version()
@@ -0,0 +1,12 @@
+# main/management/commands/rebuild_related_projects.py
+from django.core.management.base import BaseCommand
+
+from main.related import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed related-projects index'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✅ Stored {count} related-project links'))
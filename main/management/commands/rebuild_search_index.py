@@ -0,0 +1,25 @@
+# main/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from main.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the project full-text search index from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to rebuild')
+
+    def handle(self, *args, **options):
+        backend = get_backend(options['database'])
+        if backend.vendor is None:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️ No full-text index for {backend.connection.vendor}, searches use icontains'
+            ))
+            return
+
+        with transaction.atomic(using=options['database']):
+            count = backend.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Indexed {count} projects ({backend.vendor})'))
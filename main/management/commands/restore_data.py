@@ -0,0 +1,46 @@
+# main/management/commands/restore_data.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main import related
+from main.backup import BackupError, restore_backup
+from main.cache import bump_content_version, bump_profile_version, bump_resume_version, bump_skills_version
+from main.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Restore a backup written by backup_data (bulk inserts in one transaction)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Backup directory (the one holding manifest.json)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+        parser.add_argument('--no-rebuild', action='store_true',
+                            help='Skip rebuilding the search index and related projects afterwards')
+
+    def handle(self, *args, **options):
+        def log(name, count):
+            self.stdout.write(f'  {name:<22} {count:>8} rows')
+
+        self.stdout.write(f"📦 Restoring {options['directory']}")
+        start = time.perf_counter()
+        try:
+            restored = restore_backup(options['directory'], max(1, options['batch_size']), log=log)
+        except BackupError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+
+        # Bulk inserts send no signals
+        bump_content_version()
+        bump_skills_version()
+        bump_profile_version()
+        bump_resume_version()
+        if options['no_rebuild']:
+            self.stdout.write('⚠️  Skipped derived data; run rebuild_search_index and rebuild_related_projects')
+        else:
+            get_backend().rebuild()
+            related.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Restored {sum(restored.values())} rows in {elapsed:.1f}s'
+        ))
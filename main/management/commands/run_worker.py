@@ -0,0 +1,41 @@
+# main/management/commands/run_worker.py
+import signal
+
+from django.core.management.base import BaseCommand
+
+from main.queue import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (contact emails, ...) until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues', help='Only run tasks from this queue (repeatable)')
+        parser.add_argument('--concurrency', type=int, default=1, help='Number of tasks to run at once')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when nothing is due')
+        parser.add_argument('--burst', action='store_true', help='Exit once no task is due')
+        parser.add_argument('--max-tasks', type=int, help='Exit after running this many tasks')
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            queues=options['queues'],
+            concurrency=max(1, options['concurrency']),
+            poll_interval=options['poll_interval'],
+        )
+
+        def shutdown(signum, frame):
+            self.stdout.write('🛑 Finishing running tasks before exit...')
+            worker.stop()
+
+        previous = signal.signal(signal.SIGTERM, shutdown)
+        self.stdout.write(f'👷 Worker {worker.name} started with concurrency {worker.concurrency}')
+        try:
+            worker.run(burst=options['burst'], max_tasks=options['max_tasks'])
+        except KeyboardInterrupt:
+            worker.stop()
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Ran {worker.processed} tasks ({worker.failed} failed)'
+        ))
@@ -1,27 +1,38 @@
-from django.core.management.base import BaseCommand
-from main.models import Skill
+# main/management/commands/update_skills.py
+from django.core.management.base import BaseCommand, CommandError
+
+from main import seed
+
 
 class Command(BaseCommand):
-    help = 'Update skill proficiencies and add new skills'
+    help = 'Create or update skills from a JSON/CSV file, or a single skill from options'
 
     def add_arguments(self, parser):
+        parser.add_argument('file', nargs='?', help='skills.csv (name,proficiency,...) or a JSON seed file')
         parser.add_argument('--skill', type=str, help='Skill name')
         parser.add_argument('--proficiency', type=int, help='Proficiency level (0-100)')
+        parser.add_argument('--dry-run', action='store_true', help='Show the changes without writing them')
 
     def handle(self, *args, **options):
-        if options['skill'] and options['proficiency']:
-            skill, created = Skill.objects.get_or_create(
-                name=options['skill'],
-                defaults={'proficiency': options['proficiency']}
-            )
-            if not created:
-                skill.proficiency = options['proficiency']
-                skill.save()
+        try:
+            if options['file']:
+                data = seed.load(options['file'], 'skills')
+                data = {'skills': data.get('skills', [])}
+            elif options['skill'] and options['proficiency'] is not None:
+                data = {'skills': [{'name': options['skill'], 'proficiency': options['proficiency']}]}
+            else:
+                self.stdout.write('Usage: python manage.py update_skills skills.csv\n'
+                                  '       python manage.py update_skills --skill "Python" --proficiency 90')
+                return
+            changes = seed.plan(data, update=True)
+        except (OSError, ValueError, seed.SeedError) as e:
+            raise CommandError(str(e))
 
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'{"Created" if created else "Updated"} skill: {skill.name} ({skill.proficiency}%)'
-                )
-            )
-        else:
-            self.stdout.write('Usage: python manage.py update_skills --skill "Python" --proficiency 90')
+        lines = changes.describe()
+        for line in lines:
+            self.stdout.write(f'  {line}')
+        if options['dry_run']:
+            self.stdout.write(f'🔍 Dry run: {len(lines)} changes, nothing written')
+            return
+        seed.apply(changes)
+        self.stdout.write(self.style.SUCCESS(f'✅ Applied {len(lines)} skill changes'))
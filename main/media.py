@@ -0,0 +1,192 @@
+# main/media.py
+"""Memoized Cloudinary delivery URLs.
+
+Building a URL runs cloudinary.utils.cloudinary_url(), which normalizes
+every transformation option and, for ``sign_url``, hashes the result with
+the API secret. Templates and admin changelists ask for the same URLs on
+every render, so results are kept in a per-process LRU keyed by
+``(cloud name, public_id, resource_type, options)``.
+
+* Unsigned URLs are kept until evicted. The key includes the asset's
+  version, so replacing the asset produces a new key.
+* Signed URLs are dropped after SIGNED_URL_TTL, so a rotated API secret
+  takes effect without restarting workers.
+* URLs carrying ``expires_at`` are dropped EXPIRY_MARGIN seconds before
+  that moment, so a cached link never reaches a visitor already expired.
+
+With MEDIA_PROXY_ENABLED, URLs point at the local read-through cache in
+main.media_proxy instead of at Cloudinary.
+
+It also defines the responsive image variants (IMAGE_VARIANTS). Their
+srcset data is stored on each model by main.signals, so templates only
+read it (see the ``responsive_image`` tag in main.templatetags.images).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import cloudinary
+from cloudinary.utils import cloudinary_url
+from django.conf import settings
+from django.urls import reverse
+
+MAX_URLS = 4096
+EXPIRY_MARGIN = 60
+
+# ``size`` is the intrinsic size of the default rendition (and so the
+# aspect ratio of every width in ``widths``); ``sizes`` is the <img> sizes
+# attribute matching the layout in base.html. ``uncropped`` variants are
+# only scaled down to each width, keeping the image's own aspect ratio;
+# their rendered size comes from the stored image dimensions, with
+# ``size`` as the fallback until those are known
+IMAGE_VARIANTS = {
+    'thumb': {'size': (120, 90), 'widths': (60, 120), 'sizes': '60px'},
+    'card': {
+        'size': (640, 440),
+        'widths': (320, 480, 640, 960),
+        'sizes': '(max-width: 767px) 100vw, (max-width: 991px) 50vw, 33vw',
+    },
+    'hero': {
+        'size': (1200, 675),
+        'widths': (640, 960, 1200, 1600),
+        'sizes': '(max-width: 991px) 100vw, 66vw',
+        'uncropped': True,
+    },
+    'og': {'size': (1200, 630), 'widths': (1200,), 'sizes': '1200px'},
+    'avatar': {
+        'size': (600, 600),
+        'widths': (150, 300, 600),
+        'sizes': '300px',
+        'options': {'gravity': 'face'},
+    },
+}
+VARIANT_OPTIONS = {
+    'crop': 'fill',
+    'gravity': 'auto',
+    'quality': 'auto',
+    'fetch_format': 'auto',
+    'secure': True,
+}
+
+_urls = OrderedDict()
+_lock = threading.Lock()
+
+
+def _freeze(value):
+    """Hashable form of nested transformation options"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _deadline(options, now):
+    """Monotonic time after which a cached URL must be rebuilt, or None"""
+    if options.get('expires_at'):
+        return now + int(options['expires_at']) - time.time() - EXPIRY_MARGIN
+    if options.get('sign_url'):
+        return now + settings.CLOUDINARY_SIGNED_URL_TTL
+    return None
+
+
+def upstream_base():
+    """Delivery URL prefix the media proxy fetches from"""
+    return settings.MEDIA_PROXY_UPSTREAM or f'https://res.cloudinary.com/{cloudinary.config().cloud_name}/'
+
+
+def proxied_url(url):
+    """``url`` served through the media proxy, when it is enabled"""
+    if settings.MEDIA_PROXY_ENABLED:
+        base = upstream_base()
+        for prefix in (base, base.replace('https://', 'http://', 1)):
+            if url.startswith(prefix):
+                return reverse('media_proxy', kwargs={'path': url[len(prefix):]})
+    return url
+
+
+def build_url(public_id, resource_type='image', proxy=True, **options):
+    """Memoized ``cloudinary_url(public_id, resource_type=..., **options)[0]``.
+
+    With ``proxy=False`` the URL is always the absolute upstream one, for
+    server-side requests that cannot follow a relative media proxy path.
+    """
+    proxy = proxy and settings.MEDIA_PROXY_ENABLED
+    key = (
+        cloudinary.config().cloud_name, proxy,
+        public_id, resource_type, _freeze(options),
+    )
+    now = time.monotonic()
+    with _lock:
+        entry = _urls.get(key)
+        if entry is not None and (entry[1] is None or entry[1] > now):
+            _urls.move_to_end(key)
+            return entry[0]
+
+    url = cloudinary_url(public_id, resource_type=resource_type, **options)[0]
+    if proxy:
+        url = proxied_url(url)
+    with _lock:
+        _urls[key] = (url, _deadline(options, now))
+        _urls.move_to_end(key)
+        while len(_urls) > MAX_URLS:
+            _urls.popitem(last=False)
+    return url
+
+
+def resource_url(resource, proxy=True, **options):
+    """Memoized ``resource.build_url(**options)`` for a CloudinaryResource"""
+    combined = {'format': resource.format, 'version': resource.version, 'type': resource.type}
+    combined.update(resource.url_options)
+    combined.update(options)
+    resource_type = combined.pop('resource_type', None) or resource.resource_type or 'image'
+    return build_url(resource.public_id, resource_type, proxy, **combined)
+
+
+def variant_transformation(preset, width):
+    """Cloudinary options for ``width`` pixels of variant ``preset``"""
+    spec = IMAGE_VARIANTS[preset]
+    base_width, base_height = spec['size']
+    options = dict(VARIANT_OPTIONS)
+    options.update(spec.get('options', {}))
+    if spec.get('uncropped'):
+        del options['gravity']
+        options.update(crop='limit', width=width)
+    else:
+        options.update(width=width, height=round(width * base_height / base_width))
+    return options
+
+
+def rendered_size(variant, image_width=None, image_height=None):
+    """(width, height) attributes of a stored ``variant`` for an image of that size"""
+    if variant.get('uncropped') and image_width and image_height:
+        width = min(variant['width'], image_width)  # 'limit' never scales up
+        return width, round(width * image_height / image_width)
+    return variant['width'], variant['height']
+
+
+def image_variants(resource, presets):
+    """Stored ``<img>`` data (src, srcset, sizes, width, height) per preset"""
+    variants = {}
+    for preset in presets:
+        spec = IMAGE_VARIANTS[preset]
+        width, height = spec['size']
+        srcset = [
+            f'{resource_url(resource, **variant_transformation(preset, size))} {size}w'
+            for size in spec['widths']
+        ]
+        variants[preset] = {
+            'src': resource_url(resource, **variant_transformation(preset, width)),
+            'srcset': ', '.join(srcset),
+            'sizes': spec['sizes'],
+            'width': width,
+            'height': height,
+        }
+        if spec.get('uncropped'):
+            variants[preset]['uncropped'] = True
+    return variants
+
+
+def clear():
+    with _lock:
+        _urls.clear()
@@ -0,0 +1,206 @@
+# main/media_migration.py
+"""Bulk upload of locally stored media to Cloudinary.
+
+Rows whose media value has no Cloudinary version (``projects/a.jpg`` left
+over from the old FileSystemStorage days) point at a file under the local
+media root. ``migrate_to_cloudinary`` uploads those files from a thread
+pool and rewrites the rows with bulk_update.
+
+Progress lives in a JSON manifest that is rewritten atomically after
+every upload, recording the old and new value of each item. A crashed
+run picks up where it stopped: finished uploads are applied from the
+manifest without uploading again. The manifest is also the record needed
+to roll the rows back.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import cloudinary.uploader
+from cloudinary import CloudinaryResource
+
+from .cache import bump_content_version, bump_profile_version, bump_resume_version
+from .models import Profile, Project, Resume
+from .placeholders import measure
+
+# (model, field, Cloudinary folder, resource type)
+MEDIA_FIELDS = [
+    (Profile, 'profile_image', 'portfolio/profile', 'image'),
+    (Project, 'image', 'portfolio/projects', 'image'),
+    (Resume, 'file', 'portfolio/documents', 'raw'),
+]
+
+Item = namedtuple('Item', 'key model field pk old path size folder resource_type')
+
+
+def local_path(resource):
+    name = resource.public_id
+    if resource.format:
+        name = f'{name}.{resource.format}'
+    return name
+
+
+def find_items(source):
+    """(items to upload, local paths that are missing) for media root ``source``"""
+    items, missing = [], []
+    for model, field, folder, resource_type in MEDIA_FIELDS:
+        rows = model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+        for pk, resource in rows.values_list('pk', field).order_by('pk'):
+            if resource is None or resource.version:
+                continue  # already on Cloudinary
+            name = local_path(resource)
+            path = os.path.join(source, name)
+            if not os.path.isfile(path):
+                missing.append(path)
+                continue
+            items.append(Item(
+                f'{model._meta.label_lower}:{pk}:{field}', model, field, pk,
+                name, path, os.path.getsize(path), folder, resource_type,
+            ))
+    return items, missing
+
+
+class Manifest:
+    """Resumable record of finished uploads, saved after every change"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = {'items': {}, 'bytes': 0, 'seconds': 0.0}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.data = json.load(f)
+
+    def done(self, item):
+        """The recorded upload of ``item``, unless its row changed since"""
+        entry = self.data['items'].get(item.key)
+        if entry is not None and entry['old'] == item.old:
+            return entry
+        return None
+
+    def throughput(self):
+        """Observed bytes per second of one upload, or None"""
+        if self.data['seconds'] > 0:
+            return self.data['bytes'] / self.data['seconds']
+        return None
+
+    def record(self, item, value, seconds):
+        with self._lock:
+            self.data['items'][item.key] = {
+                'old': item.old, 'new': value, 'bytes': item.size, 'seconds': round(seconds, 3),
+            }
+            self.data['bytes'] += item.size
+            self.data['seconds'] += seconds
+            self.save()
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(temp_path, self.path)
+
+
+def upload(item):
+    """Upload one file; returns (stored field value, image metadata, seconds)"""
+    start = time.perf_counter()
+    result = cloudinary.uploader.upload(
+        item.path,
+        folder=item.folder,
+        resource_type=item.resource_type,
+        use_filename=True,
+        unique_filename=True,
+    )
+    seconds = time.perf_counter() - start
+    value = CloudinaryResource(
+        result['public_id'],
+        format=result.get('format'),
+        version=result['version'],
+        type=result.get('type', 'upload'),
+        resource_type=result.get('resource_type', item.resource_type),
+    ).get_prep_value()
+    return value, measure_item(item), seconds
+
+
+def measure_item(item):
+    """Size and placeholder of an image item, read from the local file"""
+    if item.resource_type != 'image':
+        return None
+    try:
+        with open(item.path, 'rb') as f:
+            return measure(f)
+    except OSError:
+        return None  # left to `manage.py backfill_image_placeholders`
+
+
+class Migrator:
+    """Uploads ``items`` with ``workers`` threads; the database stays on the calling thread"""
+
+    def __init__(self, manifest, workers=4, batch_size=50, log=print):
+        self.manifest = manifest
+        self.workers = workers
+        self.batch_size = batch_size
+        self.log = log
+        self.uploaded = 0
+        self.resumed = 0
+        self.failed = []
+        self.models = set()
+
+    def run(self, items):
+        batch = []
+        todo = []
+        for item in items:
+            done = self.manifest.done(item)
+            if done is not None:
+                batch.append((item, done['new'], measure_item(item)))
+                self.resumed += 1
+            else:
+                todo.append(item)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(upload, item): item for item in todo}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    value, metadata, seconds = future.result()
+                except Exception as e:
+                    self.failed.append((item, e))
+                    self.log(f'⚠️  Upload failed for {item.key} ({item.path}): {e}')
+                    continue
+                self.manifest.record(item, value, seconds)
+                self.uploaded += 1
+                batch.append((item, value, metadata))
+                if len(batch) >= self.batch_size:
+                    self.apply(batch)
+                    batch = []
+        self.apply(batch)
+
+        if self.uploaded or self.resumed:
+            # bulk_update sends no signals, so invalidate cached pages here
+            bump_content_version()
+            bump_profile_version()
+        if Resume in self.models:
+            # The active resume is memoized per resume version (main.resume)
+            bump_resume_version()
+
+    def apply(self, batch):
+        """Write finished uploads to their rows"""
+        by_model = {}
+        for item, value, metadata in batch:
+            obj = item.model(pk=item.pk)
+            setattr(obj, item.field, value)
+            fields = [item.field]
+            if hasattr(obj, 'refresh_image_variants'):
+                obj.refresh_image_variants()
+                fields.append('image_variants')
+                if metadata is not None:
+                    obj.image_width, obj.image_height, obj.image_placeholder = metadata
+                    fields += ['image_width', 'image_height', 'image_placeholder']
+            by_model.setdefault((item.model, tuple(fields)), []).append(obj)
+        for (model, fields), objs in by_model.items():
+            model.objects.bulk_update(objs, fields, batch_size=self.batch_size)
+            self.models.add(model)
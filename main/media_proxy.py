@@ -0,0 +1,229 @@
+# main/media_proxy.py
+"""Local read-through disk cache for Cloudinary media.
+
+When MEDIA_PROXY_ENABLED is set, delivery URLs from main.media point at
+the ``media_proxy`` view, which serves each asset from a size-bounded LRU
+cache under MEDIA_PROXY_ROOT and only goes to Cloudinary on a miss:
+
+* Files are written to a temporary name and renamed into place, so
+  concurrent workers never read a partial file.
+* Least recently used files are evicted once the cache exceeds
+  MEDIA_PROXY_MAX_BYTES (each hit refreshes the file's mtime).
+* A copy older than MEDIA_PROXY_MAX_AGE is revalidated upstream with
+  If-None-Match. If upstream is slower than MEDIA_PROXY_TIMEOUT or fails,
+  the cached copy is served anyway.
+* On a miss that cannot be fetched in time, the view redirects to
+  Cloudinary, so visitors still get the file.
+* Only delivery paths of our own cloud are proxied (``image``, ``raw``
+  or ``video`` assets, without ``.``/``..``/empty segments); anything
+  else is a 404, so the proxy cannot be pointed at other clouds.
+
+Versioned Cloudinary URLs (``/v<digits>/``) never change, so responses for
+them are marked immutable.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import unquote
+
+import requests
+from cloudinary_storage.storage import MediaCloudinaryStorage
+from django.conf import settings
+from django.core.files import File
+
+from .media import proxied_url, upstream_base
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+VERSIONED_RE = re.compile(r'(^|/)v\d+/')
+DELIVERY_RE = re.compile(r'^(image|raw|video)/(upload|private|authenticated)/')
+
+_session = requests.Session()
+
+
+class UpstreamError(Exception):
+    """Upstream could not deliver the asset; ``status`` is its HTTP status if any"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class DiskCache:
+    """Files keyed by a hash, each with a JSON metadata sidecar"""
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        directory = os.path.join(self.root, key[:2])
+        return os.path.join(directory, key), os.path.join(directory, f'{key}.json')
+
+    def get(self, key):
+        """(open file, metadata) or None; marks the entry as recently used"""
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            file = open(data_path, 'rb')
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(data_path)
+        except OSError:
+            pass
+        return file, meta
+
+    def update_meta(self, key, meta):
+        data_path, meta_path = self._paths(key)
+        self._write(meta_path, [json.dumps(meta).encode()])
+
+    def put(self, key, chunks, meta):
+        """Store ``chunks`` under ``key`` and return (open file, metadata)"""
+        data_path, meta_path = self._paths(key)
+        meta['size'] = self._write(data_path, chunks)
+        self._write(meta_path, [json.dumps(meta).encode()])
+        self.evict(keep=data_path)
+        return open(data_path, 'rb'), meta
+
+    def _write(self, path, chunks):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return size
+
+    def evict(self, keep=None):
+        """Delete least recently used files (except ``keep``) until the cache fits"""
+        with self._lock:
+            entries = []
+            total = 0
+            for shard in os.scandir(self.root):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(('.json', '.tmp')):
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                for victim in (path, f'{path}.json'):
+                    try:
+                        os.unlink(victim)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+
+
+def get_cache():
+    return DiskCache(settings.MEDIA_PROXY_ROOT, settings.MEDIA_PROXY_MAX_BYTES)
+
+
+def is_immutable(path):
+    return bool(VERSIONED_RE.search(path))
+
+
+def upstream_url(path):
+    """Upstream URL of delivery ``path``; UpstreamError (404) unless it is one of ours"""
+    if not DELIVERY_RE.match(path) or any(unquote(segment) in ('', '.', '..') for segment in path.split('/')):
+        raise UpstreamError(f'Not a media path: {path}', 404)
+    base = upstream_base()
+    url = requests.Request('GET', base + path).prepare().url
+    if not url.startswith(base):
+        raise UpstreamError(f'Not a media path: {path}', 404)
+    return url
+
+
+def fetch(path):
+    """(open file, metadata) for delivery ``path``, read through the disk cache"""
+    url = upstream_url(path)
+    cache = get_cache()
+    key = hashlib.sha256(path.encode()).hexdigest()
+    cached = cache.get(key)
+    if cached is not None:
+        file, meta = cached
+        if is_immutable(path) or time.time() - meta['fetched_at'] < settings.MEDIA_PROXY_MAX_AGE:
+            return cached
+
+    headers = {}
+    if cached is not None and cached[1].get('etag'):
+        headers['If-None-Match'] = cached[1]['etag']
+    try:
+        response = _session.get(
+            url, headers=headers, stream=True, timeout=settings.MEDIA_PROXY_TIMEOUT,
+        )
+    except requests.RequestException as e:
+        if cached is not None:
+            logger.warning(f'Media upstream failed for {path}, serving cached copy: {e}')
+            return cached
+        raise UpstreamError(str(e))
+
+    with response:
+        if cached is not None and response.status_code == 304:
+            cached[1]['fetched_at'] = time.time()
+            cache.update_meta(key, cached[1])
+            return cached
+        if response.status_code != 200:
+            if cached is not None:
+                if response.status_code >= 500:
+                    return cached
+                cached[0].close()
+            raise UpstreamError(f'Upstream returned {response.status_code}', response.status_code)
+        meta = {
+            'content_type': response.headers.get('Content-Type', 'application/octet-stream'),
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', ''),
+            'fetched_at': time.time(),
+        }
+        try:
+            stored = cache.put(key, response.iter_content(CHUNK_SIZE), meta)
+        except requests.RequestException as e:
+            # Too slow mid-transfer; the old copy was left in place
+            if cached is not None:
+                return cached
+            raise UpstreamError(str(e))
+        if cached is not None:
+            cached[0].close()
+        return stored
+
+
+class MediaProxyStorage(MediaCloudinaryStorage):
+    """MediaCloudinaryStorage whose URLs and reads go through the disk cache"""
+
+    def url(self, name):
+        return proxied_url(super().url(name))
+
+    def _open(self, name, mode='rb'):
+        url = self._get_url(name)
+        base = upstream_base()
+        if not url.startswith(base):
+            return super()._open(name, mode)
+        try:
+            file, meta = fetch(url[len(base):])
+        except UpstreamError as e:
+            if e.status == 404:
+                raise IOError(f'{name} does not exist')
+            raise
+        return File(file, name=name)
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE main_project_search USING fts5(
+        project_id UNINDEXED, title, description, technologies,
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO main_project_search (project_id, title, description, technologies)
+    SELECT p.id, p.title, p.description,
+           COALESCE((SELECT group_concat(s.name, ' ')
+                     FROM main_project_technologies pt
+                     JOIN main_skill s ON s.id = pt.skill_id
+                     WHERE pt.project_id = p.id), '')
+    FROM main_project p
+    """,
+]
+
+POSTGRESQL_CREATE = [
+    """
+    CREATE TABLE main_project_search (
+        project_id uuid PRIMARY KEY
+            REFERENCES main_project (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX main_project_search_document_gin ON main_project_search USING GIN (document)",
+    """
+    INSERT INTO main_project_search (project_id, document)
+    SELECT p.id,
+           setweight(to_tsvector('english', p.title), 'A') ||
+           setweight(to_tsvector('english', COALESCE(
+               (SELECT string_agg(s.name, ' ')
+                FROM main_project_technologies pt
+                JOIN main_skill s ON s.id = pt.skill_id
+                WHERE pt.project_id = p.id), '')), 'B') ||
+           setweight(to_tsvector('english', p.description), 'C')
+    FROM main_project p
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {
+        'sqlite': SQLITE_CREATE,
+        'postgresql': POSTGRESQL_CREATE,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE IF EXISTS main_project_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_profile_created_at_profile_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSearchDocument',
+            fields=[
+                ('project', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='main.project')),
+            ],
+            options={
+                'db_table': 'main_project_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
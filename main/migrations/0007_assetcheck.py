@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetCheck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='model:pk:field', max_length=100, unique=True)),
+                ('url', models.URLField(max_length=500)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('ok', models.BooleanField(default=False)),
+                ('error', models.CharField(blank=True, max_length=300)),
+                ('elapsed_ms', models.FloatField(blank=True, null=True)),
+                ('checked_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['key'],
+            },
+        ),
+    ]
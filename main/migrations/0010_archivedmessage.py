@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:39
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message_id', models.BigIntegerField(help_text='id of the deleted ContactMessage', unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=200)),
+                ('created_at', models.DateTimeField()),
+                ('archive', models.CharField(help_text='Partition file, relative to MESSAGE_ARCHIVE_ROOT', max_length=100)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='main_archived_created_idx'), models.Index(fields=['email'], name='main_archived_email_idx')],
+            },
+        ),
+    ]
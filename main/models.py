@@ -1,12 +1,15 @@
 # main/models.py - FIXED VERSION FOR PERSISTENT CLOUDINARY STORAGE
 
 from django.db import models
+from django.db.models.functions import Upper
 from django.urls import reverse
 from django.core.validators import URLValidator
 from cloudinary.models import CloudinaryField
 from django.utils import timezone
 import uuid
 
+from .media import image_variants, resource_url
+
 class Skill(models.Model):
     SKILL_CATEGORIES = [
         ('programming', 'Programming Languages'),
@@ -23,9 +26,18 @@ class Skill(models.Model):
     icon = models.CharField(max_length=50, blank=True, help_text="Font Awesome icon class")
     is_featured = models.BooleanField(default=False, help_text="Show on main page")
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-proficiency', 'name']
+        indexes = [
+            models.Index(fields=['name'], name='main_skill_name_idx'),
+            # technologies__name__iexact compares UPPER(name) on PostgreSQL
+            models.Index(Upper('name'), name='main_skill_name_upper_idx'),
+            models.Index(fields=['-proficiency', 'name'], name='main_skill_ordering_idx'),
+            models.Index(fields=['-proficiency', 'name'], condition=models.Q(is_featured=True),
+                         name='main_skill_featured_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.proficiency}%)"
@@ -37,6 +49,9 @@ class Project(models.Model):
         ('planned', 'Planned'),
     ]
 
+    IMAGE_FIELD = 'image'
+    IMAGE_VARIANTS = ('thumb', 'card', 'hero', 'og')
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=200)
     short_description = models.CharField(max_length=250, help_text="Brief description for cards")
@@ -51,6 +66,12 @@ class Project(models.Model):
         use_filename=True,
         unique_filename=True,
     )
+    image_variants = models.JSONField(default=dict, blank=True, editable=False,
+                                      help_text="srcset data per variant preset, see main.media")
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False,
+                                         help_text="Tiny blurred preview as a data: URI, see main.placeholders")
 
     github_url = models.URLField(blank=True, validators=[URLValidator()])
     live_url = models.URLField(blank=True, validators=[URLValidator()], help_text="Live demo URL")
@@ -63,6 +84,12 @@ class Project(models.Model):
 
     class Meta:
         ordering = ['-is_featured', 'order', '-created_at']
+        indexes = [
+            # Model ordering plus the keyset paginator's pk tiebreaker
+            models.Index(fields=['-is_featured', 'order', '-created_at', 'id'], name='main_project_listing_idx'),
+            models.Index(fields=['status', '-is_featured', 'order', '-created_at', 'id'], name='main_project_status_idx'),
+            models.Index(fields=['updated_at'], name='main_project_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -73,16 +100,58 @@ class Project(models.Model):
     def get_image_url(self, transformation=None):
         """Get image URL with optional transformation"""
         if self.image:
-            if transformation:
-                from cloudinary.utils import cloudinary_url
-                url, options = cloudinary_url(
-                    self.image.public_id,
-                    **transformation
-                )
-                return url
-            return self.image.url
+            return resource_url(self.image, **(transformation or {}))
         return None
 
+    def refresh_image_variants(self):
+        """Rebuild ``image_variants`` from the current image (not saved)"""
+        image = self._meta.get_field(self.IMAGE_FIELD).to_python(self.image)
+        self.image_variants = image_variants(image, self.IMAGE_VARIANTS) if image else {}
+        return self.image_variants
+
+
+class ProjectSearchDocument(models.Model):
+    """Full-text search index row for a project.
+
+    The table is created per database vendor by migration 0003 (an FTS5
+    virtual table on SQLite, a tsvector column with a GIN index on
+    PostgreSQL) and kept in sync by main.signals; see main.search.
+    """
+    project = models.OneToOneField(
+        Project,
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='search_document',
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'main_project_search'
+
+
+class RelatedProject(models.Model):
+    """Precomputed neighbour of a project, scored by technology overlap.
+
+    Rows are maintained by main.related so the detail page can read the
+    top neighbours with one indexed lookup.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text="Jaccard similarity of the technology sets")
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'related'], name='main_relatedproject_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['project', '-score'], name='main_related_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.project} -> {self.related} ({self.score:.2f})"
+
 
 # Updated Resume model methods with better error handling
 
@@ -98,16 +167,20 @@ class Resume(models.Model):
     )
     is_active = models.BooleanField(default=True, help_text="Currently active resume")
     uploaded_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['-uploaded_at'], condition=models.Q(is_active=True), name='main_resume_active_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.uploaded_at.strftime('%Y-%m-%d')}"
 
     def save(self, *args, **kwargs):
         if self.is_active:
-            Resume.objects.filter(is_active=True).update(is_active=False)
+            Resume.objects.filter(is_active=True).update(is_active=False, updated_at=timezone.now())
         super().save(*args, **kwargs)
 
     def get_download_url(self):
@@ -116,18 +189,15 @@ class Resume(models.Model):
             return None
 
         try:
-            from cloudinary.utils import cloudinary_url
-
             # Method 1: Try with public_id
             if hasattr(self.file, 'public_id') and self.file.public_id:
-                url, options = cloudinary_url(
-                    self.file.public_id,
+                return resource_url(
+                    self.file,
                     resource_type='raw',
                     flags='attachment',
                     secure=True,
                     sign_url=True
                 )
-                return url
 
             # Method 2: Use direct URL if public_id fails
             elif hasattr(self.file, 'url'):
@@ -147,16 +217,13 @@ class Resume(models.Model):
             return None
 
         try:
-            from cloudinary.utils import cloudinary_url
-
             if hasattr(self.file, 'public_id') and self.file.public_id:
-                url, options = cloudinary_url(
-                    self.file.public_id,
+                return resource_url(
+                    self.file,
                     resource_type='raw',
                     secure=True,
                     sign_url=True
                 )
-                return url
             elif hasattr(self.file, 'url'):
                 return self.file.url
 
@@ -175,7 +242,7 @@ class Resume(models.Model):
         info = {
             'has_file': bool(self.file),
             'file_name': str(self.file) if self.file else None,
-            'url': getattr(self.file, 'url', None),
+            'url': resource_url(self.file),
             'public_id': getattr(self.file, 'public_id', None),
         }
         return info
@@ -188,14 +255,22 @@ class ContactMessage(models.Model):
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='main_contact_created_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(is_read=False), name='main_contact_unread_idx'),
+        ]
 
     def __str__(self):
         return f"Message from {self.name} - {self.subject}"
 
 class Profile(models.Model):
+    IMAGE_FIELD = 'profile_image'
+    IMAGE_VARIANTS = ('avatar', 'og')
+
     name = models.CharField(max_length=100, default="Vedang Deshmukh")
     tagline = models.CharField(max_length=200, default="Aspiring AIML Student and Developer")
     bio = models.TextField(default="I am a second-year Computer Science student specializing in Artificial Intelligence and Machine Learning.")
@@ -209,6 +284,12 @@ class Profile(models.Model):
         use_filename=True,
         unique_filename=True,
     )
+    image_variants = models.JSONField(default=dict, blank=True, editable=False,
+                                      help_text="srcset data per variant preset, see main.media")
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False,
+                                         help_text="Tiny blurred preview as a data: URI, see main.placeholders")
 
     email = models.EmailField(default="vedangdeshmukh777@gmail.com")
     github_url = models.URLField(default="https://github.com/vedang18200")
@@ -224,15 +305,95 @@ class Profile(models.Model):
     def get_profile_image_url(self, transformation=None):
         """Get profile image URL with optional transformation"""
         if self.profile_image:
-            if transformation:
-                from cloudinary.utils import cloudinary_url
-                url, options = cloudinary_url(
-                    self.profile_image.public_id,
-                    **transformation
-                )
-                return url
-            return self.profile_image.url
+            return resource_url(self.profile_image, **(transformation or {}))
         return None
 
+    def refresh_image_variants(self):
+        """Rebuild ``image_variants`` from the current image (not saved)"""
+        image = self._meta.get_field(self.IMAGE_FIELD).to_python(self.profile_image)
+        self.image_variants = image_variants(image, self.IMAGE_VARIANTS) if image else {}
+        return self.image_variants
+
     class Meta:
         verbose_name_plural = "Profile"
+
+
+class Task(models.Model):
+    """A unit of background work, run by ``manage.py run_worker``.
+
+    See main.queue for enqueueing, claiming and retries.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (DEAD, 'Dead'),
+    ]
+
+    name = models.CharField(max_length=200)
+    queue = models.CharField(max_length=50, default='default')
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'queue', 'run_at'], name='main_task_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+
+class AssetCheck(models.Model):
+    """Last health check of a stored media asset, see main.health"""
+    key = models.CharField(max_length=100, unique=True, help_text="model:pk:field")
+    url = models.URLField(max_length=500)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    ok = models.BooleanField(default=False)
+    error = models.CharField(max_length=300, blank=True)
+    elapsed_ms = models.FloatField(null=True, blank=True)
+    checked_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['key']
+
+    def __str__(self):
+        return f"{self.key}: {'OK' if self.ok else self.status_code or self.error}"
+
+
+class ArchivedMessage(models.Model):
+    """Index entry of a ContactMessage moved to an archive file, see main.archive.
+
+    The message body stays in the file; everything the admin lists and
+    searches on is here.
+    """
+    message_id = models.BigIntegerField(unique=True, help_text="id of the deleted ContactMessage")
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    subject = models.CharField(max_length=200)
+    created_at = models.DateTimeField()
+    archive = models.CharField(max_length=100, help_text="Partition file, relative to MESSAGE_ARCHIVE_ROOT")
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='main_archived_created_idx'),
+            models.Index(fields=['email'], name='main_archived_email_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived message from {self.name} - {self.subject}"
@@ -0,0 +1,150 @@
+# main/pagination.py
+"""Keyset (cursor) pagination for ordered querysets.
+
+Instead of OFFSET, each page is fetched with a WHERE clause that continues
+from the last row of the previous page, so page cost stays flat no matter
+how deep the visitor goes. Cursors are opaque url-safe tokens holding the
+ordering values of the boundary row.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    """One page of results plus the cursors to its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginate a queryset on its model ordering plus the primary key.
+
+    The ordering fields must be non-nullable concrete fields or annotations
+    (such as a search rank); the primary key is appended as a tiebreaker so
+    the ordering is total.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.model = queryset.model
+        ordering = list(ordering or self.model._meta.ordering)
+        if not any(f.lstrip('-') in ('pk', self.model._meta.pk.name) for f in ordering):
+            ordering.append('pk')
+        self.ordering = [
+            (f.lstrip('-'), f.startswith('-')) for f in ordering
+        ]
+
+    # Cursor encoding -------------------------------------------------
+
+    def _field(self, name):
+        if name == 'pk':
+            return self.model._meta.pk
+        if name in self.queryset.query.annotations:
+            return self.queryset.query.annotations[name].output_field
+        return self.model._meta.get_field(name)
+
+    def _value(self, obj, name):
+        if name in self.queryset.query.annotations:
+            return getattr(obj, name)
+        return self._field(name).value_to_string(obj)
+
+    def encode_cursor(self, obj, reverse=False):
+        values = [self._value(obj, name) for name, _ in self.ordering]
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            raw_values = payload['v']
+            reverse = bool(payload.get('r'))
+            if len(raw_values) != len(self.ordering):
+                raise InvalidCursor('Cursor does not match ordering')
+            values = [
+                self._field(name).to_python(raw)
+                for (name, _), raw in zip(self.ordering, raw_values)
+            ]
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError) as e:
+            raise InvalidCursor(str(e)) from e
+        return values, reverse
+
+    # Querying --------------------------------------------------------
+
+    def _order_by(self, reverse):
+        return [
+            ('-' if descending != reverse else '') + name
+            for name, descending in self.ordering
+        ]
+
+    def _seek(self, values, reverse):
+        """Rows strictly after ``values`` in the (possibly reversed) ordering"""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def page(self, cursor=None):
+        """Return the page following (or preceding) ``cursor``.
+
+        Invalid cursors fall back to the first page.
+        """
+        values, reverse = None, False
+        if cursor:
+            try:
+                values, reverse = self.decode_cursor(cursor)
+            except InvalidCursor:
+                values, reverse = None, False
+
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows)
+
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1]) if has_next else None,
+            prev_cursor=self.encode_cursor(rows[0], reverse=True) if has_previous else None,
+        )
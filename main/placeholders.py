@@ -0,0 +1,55 @@
+# main/placeholders.py
+"""Tiny blurred previews (LQIP) and intrinsic sizes of uploaded images.
+
+A placeholder is a PLACEHOLDER_SIZE pixel WebP as a ``data:`` URI, small
+enough (~150 bytes) to inline in every card. Templates paint it behind the
+real image, so cards have their final shape and colours before the
+Cloudinary image arrives.
+
+Uploads are measured from the uploaded bytes before they go to Cloudinary
+(see main.signals). Images set from an existing public id are fetched once
+by the ``store_image_placeholder`` task or by
+``manage.py backfill_image_placeholders``.
+"""
+import base64
+import io
+
+import requests
+from PIL import Image, ImageOps
+
+PLACEHOLDER_SIZE = 16
+FETCH_TIMEOUT = 30
+
+# EXIF orientations that rotate the image by 90 degrees
+ROTATED = {5, 6, 7, 8}
+
+
+def measure(file):
+    """(width, height, placeholder data URI) of an image file object"""
+    with Image.open(file) as image:
+        width, height = image.size
+        if image.getexif().get(0x0112, 1) in ROTATED:
+            width, height = height, width
+        # Let JPEG decode at a fraction of its size; only a few pixels are needed
+        image.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        preview = ImageOps.exif_transpose(image).convert('RGB')
+    preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.LANCZOS)
+    buffer = io.BytesIO()
+    preview.save(buffer, 'WEBP', quality=40)
+    data = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return width, height, f'data:image/webp;base64,{data}'
+
+
+def measure_upload(upload):
+    """``measure()`` an UploadedFile, leaving it ready to be uploaded"""
+    upload.seek(0)
+    try:
+        return measure(upload)
+    finally:
+        upload.seek(0)
+
+
+def measure_url(url, session=requests):
+    response = session.get(url, timeout=FETCH_TIMEOUT)
+    response.raise_for_status()
+    return measure(io.BytesIO(response.content))
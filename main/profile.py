@@ -0,0 +1,34 @@
+# main/profile.py
+"""Cached access to the site's single Profile row.
+
+The profile is loaded once per profile version and memoized in each
+worker. Saving or deleting a Profile (ProfileAdmin.save_model included)
+bumps the version in the shared cache through main.signals, so every
+worker reloads it on its next request.
+"""
+import logging
+
+from .cache import get_profile_version, versioned
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+
+def _load_profile():
+    profile = Profile.objects.first()
+    if profile is not None:
+        # Read from the stored variants so templates never build URLs
+        profile.image_url = None
+        if profile.profile_image:
+            try:
+                variant = profile.image_variants.get('avatar') or profile.refresh_image_variants()['avatar']
+                profile.image_url = variant['src']
+            except Exception as e:
+                logger.warning(f'Could not build profile image URL: {e}')
+                profile.image_url = profile.profile_image.url
+    # Wrapped so that "no profile yet" is cached too
+    return (profile,)
+
+
+def get_profile():
+    """The site Profile (or None), with ``image_url`` precomputed"""
+    return versioned('profile', get_profile_version(), _load_profile)[0]
@@ -0,0 +1,252 @@
+# main/queue.py
+"""A small database-backed background task queue.
+
+Tasks are plain functions registered with ``@task`` in a ``tasks`` module
+of an installed app. ``enqueue()`` stores a Task row and returns at once;
+``manage.py run_worker`` claims due rows and runs them.
+
+* Claiming is an optimistic ``UPDATE ... WHERE status = <seen status>``,
+  so any number of workers can poll the same table on SQLite or
+  PostgreSQL without row locks.
+* A task that raises is retried with exponential backoff (with jitter)
+  until ``max_attempts`` is used up, then dead-lettered: left with status
+  ``dead`` and its traceback for inspection and retry from the admin.
+* ``concurrency`` caps how many rows of one task run at once across all
+  workers, e.g. to stay under an SMTP server's connection limit.
+* Rows still ``running`` after TASK_LOCK_TIMEOUT seconds belong to a
+  worker that died and are claimed again.
+
+Without a worker (TASK_WORKER off, e.g. a host with a single web
+service) ``enqueue()`` runs due tasks itself, after the transaction
+commits, up to INLINE_MAX_TASKS at a time; retries then run on a later
+enqueue. That response waits for the task, but nothing is left queued.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = 60 * 60
+CLAIM_BATCH = 20
+INLINE_MAX_TASKS = 5
+
+_registry = {}
+
+
+class TaskSpec:
+    """Options of a registered task function"""
+
+    def __init__(self, func, name, queue, max_attempts, concurrency, backoff):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.backoff = backoff
+
+    def retry_delay(self, attempts):
+        """Seconds to wait after the ``attempts``-th failure"""
+        delay = min(self.backoff * 2 ** (attempts - 1), MAX_BACKOFF)
+        return random.uniform(delay / 2, delay)
+
+
+def task(func=None, *, name=None, queue='default', max_attempts=5, concurrency=None, backoff=30):
+    """Register ``func`` as a task; usable with or without arguments.
+
+    ``backoff`` is the base delay in seconds before the first retry; it
+    doubles with each further failure, up to an hour.
+    """
+    def register(func):
+        spec = TaskSpec(
+            func,
+            name or f'{func.__module__}.{func.__qualname__}',
+            queue,
+            max_attempts,
+            concurrency,
+            backoff,
+        )
+        _registry[spec.name] = spec
+        func.task_name = spec.name
+        return func
+
+    return register(func) if func is not None else register
+
+
+def get_spec(name):
+    return _registry.get(name)
+
+
+def enqueue(func, run_at=None, **kwargs):
+    """Store a run of task ``func`` (or its name) with JSON ``kwargs``"""
+    name = getattr(func, 'task_name', func)
+    spec = _registry.get(name)
+    if spec is None:
+        raise LookupError(f'{name!r} is not a registered task')
+    job = Task.objects.create(
+        name=name,
+        queue=spec.queue,
+        kwargs=kwargs,
+        max_attempts=spec.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+    if not settings.TASK_WORKER:
+        transaction.on_commit(run_inline)
+    return job
+
+
+def _stale_before(now):
+    return now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+
+
+def _running_counts(names, now):
+    rows = (
+        Task.objects.filter(status=Task.RUNNING, name__in=names, locked_at__gte=_stale_before(now))
+        .order_by().values('name').annotate(count=Count('pk'))
+    )
+    return {row['name']: row['count'] for row in rows}
+
+
+def claim(worker, queues=None):
+    """Lock the next due task for ``worker``; None when nothing is due"""
+    now = timezone.now()
+    stale = _stale_before(now)
+    due = Task.objects.filter(
+        Q(status=Task.PENDING, run_at__lte=now) |
+        Q(status=Task.RUNNING, locked_at__lt=stale)
+    )
+    if queues:
+        due = due.filter(queue__in=queues)
+    candidates = list(due.values('pk', 'name', 'status', 'locked_at')[:CLAIM_BATCH])
+
+    limited = {
+        candidate['name'] for candidate in candidates
+        if getattr(get_spec(candidate['name']), 'concurrency', None) is not None
+    }
+    running = _running_counts(limited, now) if limited else {}
+
+    for candidate in candidates:
+        name = candidate['name']
+        if name in limited and running.get(name, 0) >= get_spec(name).concurrency:
+            continue
+        claimed = Task.objects.filter(
+            pk=candidate['pk'], status=candidate['status'], locked_at=candidate['locked_at']
+        ).update(status=Task.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1)
+        if not claimed:
+            continue  # another worker got there first
+        if name in limited and _running_counts([name], now).get(name, 0) > get_spec(name).concurrency:
+            # Lost a race for the last slot; hand the row back untouched
+            Task.objects.filter(pk=candidate['pk'], locked_by=worker).update(
+                status=Task.PENDING, locked_by='', locked_at=None, attempts=F('attempts') - 1,
+            )
+            running[name] = get_spec(name).concurrency
+            continue
+        return Task.objects.get(pk=candidate['pk'])
+    return None
+
+
+def execute(job):
+    """Run a claimed task and record the outcome; True when it succeeded"""
+    spec = get_spec(job.name)
+    mine = Task.objects.filter(pk=job.pk, locked_by=job.locked_by, status=Task.RUNNING)
+    try:
+        if spec is None:
+            raise LookupError(f'{job.name!r} is not a registered task')
+        spec.func(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if spec is None or job.attempts >= job.max_attempts:
+            mine.update(status=Task.DEAD, last_error=error, locked_by='', finished_at=timezone.now())
+            logger.error('Task %s (%s) dead after %s attempts:\n%s', job.pk, job.name, job.attempts, error)
+        else:
+            retry_at = timezone.now() + timedelta(seconds=spec.retry_delay(job.attempts))
+            mine.update(status=Task.PENDING, last_error=error, locked_by='', locked_at=None, run_at=retry_at)
+            logger.warning('Task %s (%s) failed, retrying at %s', job.pk, job.name, retry_at)
+        return False
+    mine.update(status=Task.DONE, locked_by='', finished_at=timezone.now())
+    return True
+
+
+def run_inline():
+    """Run up to INLINE_MAX_TASKS due tasks in this process"""
+    autodiscover_modules('tasks')
+    name = f'inline:{socket.gethostname()}:{os.getpid()}'
+    for _ in range(INLINE_MAX_TASKS):
+        job = claim(name)
+        if job is None:
+            break
+        execute(job)
+
+
+def backlog():
+    """{'count': due pending tasks, 'oldest': earliest run_at among them}"""
+    return Task.objects.filter(status=Task.PENDING, run_at__lte=timezone.now()).aggregate(
+        count=Count('pk'), oldest=Min('run_at'),
+    )
+
+
+class Worker:
+    """Polls for due tasks with ``concurrency`` threads"""
+
+    def __init__(self, queues=None, concurrency=1, poll_interval=1.0, name=None):
+        autodiscover_modules('tasks')
+        self.queues = queues
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def run_once(self, thread_name=None):
+        """Claim and run one task; False when none was due"""
+        job = claim(thread_name or self.name, self.queues)
+        if job is None:
+            return False
+        succeeded = execute(job)
+        with self._lock:
+            self.processed += 1
+            self.failed += not succeeded
+        return True
+
+    def _loop(self, thread_name, burst, max_tasks):
+        try:
+            while not self.stopping.is_set():
+                if max_tasks is not None and self.processed >= max_tasks:
+                    break
+                close_old_connections()
+                if not self.run_once(thread_name) and (burst or self.stopping.wait(self.poll_interval)):
+                    break
+        finally:
+            close_old_connections()
+
+    def run(self, burst=False, max_tasks=None):
+        """Work until stopped; ``burst`` returns once nothing is due"""
+        if self.concurrency == 1:
+            self._loop(self.name, burst, max_tasks)
+            return
+        threads = [
+            threading.Thread(target=self._loop, args=(f'{self.name}/{index}', burst, max_tasks), daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def stop(self):
+        """Finish the running tasks, then return from run()"""
+        self.stopping.set()
@@ -0,0 +1,136 @@
+# main/related.py
+"""Materialized "related projects" index.
+
+Every project keeps its RELATED_PROJECTS_LIMIT best neighbours in
+RelatedProject, scored by the Jaccard similarity of their technology
+sets. When a project's technologies change only its own list is
+recomputed; the lists of other projects are patched in place, and only
+fall back to a full recompute when a neighbour drops out of a full list.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from .cache import bump_content_version
+from .models import Project, RelatedProject
+
+RELATED_PROJECTS_LIMIT = 6
+
+Through = Project.technologies.through
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def technology_sets(project_pks=None):
+    """Map project pk -> set of skill ids, in one query"""
+    rows = Through.objects.all()
+    if project_pks is not None:
+        rows = rows.filter(project_id__in=project_pks)
+    sets = defaultdict(set)
+    for project_id, skill_id in rows.values_list('project_id', 'skill_id'):
+        sets[project_id].add(skill_id)
+    return sets
+
+
+def _top(scores):
+    """The best (score, pk) pairs with a non-zero score"""
+    ranked = sorted(
+        ((score, pk) for pk, score in scores.items() if score > 0),
+        key=lambda item: (-item[0], str(item[1])),
+    )
+    return ranked[:RELATED_PROJECTS_LIMIT]
+
+
+def _neighbour_sets(pk, techs):
+    """Technology sets of every other project sharing a technology with ``pk``"""
+    if not techs:
+        return {}
+    sharing = Through.objects.filter(skill_id__in=techs).exclude(project_id=pk).values('project_id')
+    return technology_sets(sharing)
+
+
+def recompute(pk):
+    """Rebuild the neighbour list of one project from scratch"""
+    techs = technology_sets([pk]).get(pk, set())
+    neighbours = _neighbour_sets(pk, techs)
+    top = _top({other: jaccard(techs, other_techs) for other, other_techs in neighbours.items()})
+    RelatedProject.objects.filter(project_id=pk).delete()
+    RelatedProject.objects.bulk_create([
+        RelatedProject(project_id=pk, related_id=other, score=score) for score, other in top
+    ])
+    return techs, neighbours
+
+
+def refresh_project(pk):
+    """Update the index after the technologies of project ``pk`` changed"""
+    with transaction.atomic():
+        techs, neighbours = recompute(pk)
+
+        pointing = {link.project_id: link for link in RelatedProject.objects.filter(related_id=pk)}
+        affected = set(neighbours) | set(pointing)
+        lists = defaultdict(list)
+        for link in RelatedProject.objects.filter(project_id__in=affected):
+            lists[link.project_id].append(link)
+
+        stale = []
+        for other in affected:
+            score = jaccard(techs, neighbours.get(other, set()))
+            current = lists[other]
+            full = len(current) >= RELATED_PROJECTS_LIMIT
+            floor = min((link.score for link in current), default=0.0)
+            link = pointing.get(other)
+
+            if link is not None:
+                if score >= link.score or (score > 0 and (not full or score >= floor)):
+                    link.score = score
+                    link.save(update_fields=['score'])
+                elif full:
+                    # Something outside the list may now outrank ``pk``
+                    stale.append(other)
+                else:
+                    link.delete()
+            elif score > 0 and (not full or score > floor):
+                if full:
+                    lowest = min(current, key=lambda item: (item.score, str(item.related_id)))
+                    lowest.delete()
+                RelatedProject.objects.create(project_id=other, related_id=pk, score=score)
+
+        for other in stale:
+            recompute(other)
+
+
+def refresh_projects(pks):
+    for pk in pks:
+        refresh_project(pk)
+
+
+def rebuild():
+    """Recompute every neighbour list; returns the number of rows stored.
+
+    The content version is bumped when any link changed, since detail
+    pages (and their validators) show the lists.
+    """
+    sets = technology_sets()
+    by_skill = defaultdict(set)
+    for pk, techs in sets.items():
+        for skill_id in techs:
+            by_skill[skill_id].add(pk)
+
+    rows = []
+    for pk, techs in sets.items():
+        others = set().union(*(by_skill[skill_id] for skill_id in techs)) - {pk}
+        top = _top({other: jaccard(techs, sets[other]) for other in others})
+        rows.extend(RelatedProject(project_id=pk, related_id=other, score=score) for score, other in top)
+
+    with transaction.atomic():
+        stored = set(RelatedProject.objects.values_list('project_id', 'related_id', 'score'))
+        if stored == {(row.project_id, row.related_id, row.score) for row in rows}:
+            return len(rows)
+        RelatedProject.objects.all().delete()
+        RelatedProject.objects.bulk_create(rows, batch_size=1000)
+    bump_content_version()
+    return len(rows)
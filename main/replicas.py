@@ -0,0 +1,173 @@
+# main/replicas.py
+"""Read replicas for the public pages.
+
+``DATABASE_REPLICA_URLS`` adds one database alias per replica
+(``replica1``, ``replica2``...; see portfolio.settings). Without any,
+everything here is a no-op.
+
+ReplicaMiddleware marks GET/HEAD requests to the views in REPLICA_VIEWS,
+and ReplicaRouter sends the reads of ``main`` models made while serving
+them to a healthy replica. Everything else (writes, the admin, sessions
+and auth, background tasks) stays on ``default``. A request falls back to
+the primary when:
+
+* it has written anything (read-your-writes within the request);
+* the client wrote within the last REPLICA_PIN_SECONDS, remembered with
+  a cookie set on the response that wrote, or is logged in;
+* content changed within the last REPLICA_LAG seconds (the content
+  version keys in main.cache are timestamps), so a page rendered from a
+  replica that has not caught up is never cached under the new version;
+* no replica passes its health check.
+
+A replica is checked with ``SELECT 1`` at most every
+REPLICA_HEALTH_INTERVAL seconds per process. One that fails, or whose
+connection fails while serving a request, is skipped until the next
+check, and the request is served again from the primary.
+"""
+import contextvars
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, InterfaceError, OperationalError, connections
+
+from .cache import CONTENT_VERSION_KEY, PROFILE_VERSION_KEY, RESUME_VERSION_KEY, SKILLS_VERSION_KEY
+
+logger = logging.getLogger(__name__)
+
+REPLICA_VIEWS = {'home', 'about', 'projects', 'project_detail', 'skills_api', 'search_projects'}
+PIN_COOKIE = 'db_primary'
+VERSION_KEYS = [CONTENT_VERSION_KEY, SKILLS_VERSION_KEY, PROFILE_VERSION_KEY, RESUME_VERSION_KEY]
+
+# alias -> (healthy, monotonic time of the check)
+_health = {}
+
+
+class RequestState:
+    def __init__(self, replica=None):
+        self.replica = replica
+        self.used = False
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('replica_state', default=None)
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def check_replica(alias):
+    """True if ``alias`` answers ``SELECT 1``"""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except (OperationalError, InterfaceError) as e:
+        logger.warning('Replica %s failed its health check: %s', alias, e)
+        connections[alias].close()
+        return False
+    return True
+
+
+def is_healthy(alias):
+    healthy, checked_at = _health.get(alias, (None, None))
+    if healthy is None or time.monotonic() - checked_at >= settings.REPLICA_HEALTH_INTERVAL:
+        healthy = check_replica(alias)
+        _health[alias] = (healthy, time.monotonic())
+    return healthy
+
+
+def mark_down(alias):
+    _health[alias] = (False, time.monotonic())
+    connections[alias].close()
+
+
+def choose_replica():
+    """A healthy replica alias, or None"""
+    candidates = replicas()
+    random.shuffle(candidates)
+    for alias in candidates:
+        if is_healthy(alias):
+            return alias
+    return None
+
+
+def content_changed_recently():
+    """True if a content version was bumped within REPLICA_LAG seconds"""
+    versions = [version for version in cache.get_many(VERSION_KEYS).values() if version]
+    return bool(versions) and time.time_ns() - max(versions) < settings.REPLICA_LAG * 1e9
+
+
+class ReplicaRouter:
+    """Routes reads of ``main`` models made while serving a replica request"""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None or state.wrote or model._meta.app_label != 'main':
+            return None
+        state.used = True
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get the schema through replication
+        return db not in replicas()
+
+
+class ReplicaMiddleware:
+    """Serves REPLICA_VIEWS from a replica and pins writers to the primary"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and replicas():
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def use_replica(self, request):
+        match = request.resolver_match
+        return (
+            request.method in ('GET', 'HEAD')
+            and match is not None and match.url_name in REPLICA_VIEWS
+            and PIN_COOKIE not in request.COOKIES
+            and not request.user.is_authenticated
+            and not content_changed_recently()
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        if state is None or not replicas() or not self.use_replica(request):
+            return None
+        state.replica = choose_replica()
+        if state.replica is None:
+            return None
+        try:
+            return view_func(request, *view_args, **view_kwargs)
+        except (OperationalError, InterfaceError) as e:
+            if not state.used or state.wrote:
+                raise
+            logger.warning('Replica %s failed during %s, retrying on the primary: %s',
+                           state.replica, request.path, e)
+            mark_down(state.replica)
+            state.replica = None
+            return view_func(request, *view_args, **view_kwargs)
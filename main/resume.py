@@ -0,0 +1,55 @@
+# main/resume.py
+"""Cached access to the active Resume.
+
+Like main.profile, the active resume is loaded once per resume version
+and memoized in each worker; saving or deleting a Resume bumps the
+version through main.signals. A download click therefore costs a cache
+read, not a query.
+
+The ``download_resume`` view serves the file from our own origin,
+reading it through the media proxy's disk cache (main.media_proxy).
+Templates link to ``/resume/download/?v=<token>``, where the token
+changes with every upload, so browsers and CDNs may keep that response
+for a year.
+"""
+import hashlib
+import os
+
+from django.urls import reverse
+
+from .cache import get_resume_version, versioned
+from .models import Resume
+
+
+def _load_resume():
+    # Wrapped so that "no resume yet" is cached too
+    return (Resume.objects.filter(is_active=True).exclude(file='').first(),)
+
+
+def get_active_resume():
+    """The active Resume (or None)"""
+    return versioned('resume', get_resume_version(), _load_resume)[0]
+
+
+def upload_token(resume):
+    """Short token that changes whenever a new file is uploaded"""
+    return hashlib.md5(resume.file.get_prep_value().encode()).hexdigest()[:16]
+
+
+def delivery_path(resume):
+    """Cloudinary delivery path of the file, e.g. ``raw/upload/v3/portfolio/documents/cv.pdf``"""
+    return resume.file.get_prep_value()
+
+
+def filename(resume):
+    name = os.path.basename(resume.file.public_id)
+    return f'{name}.{resume.file.format}' if resume.file.format else name
+
+
+def download_url():
+    """Versioned link to the active resume, for templates"""
+    url = reverse('download_resume')
+    resume = get_active_resume()
+    if resume is None:
+        return url
+    return f'{url}?v={upload_token(resume)}'
@@ -0,0 +1,191 @@
+# main/search.py
+"""Full-text search over projects.
+
+The index lives in ``main_project_search`` (see ProjectSearchDocument) and
+is picked from the database vendor in DATABASES:
+
+* SQLite: an FTS5 virtual table ranked with bm25()
+* PostgreSQL: a weighted tsvector column with a GIN index, ranked with
+  ts_rank_cd()
+* anything else: the old ``icontains`` filters, unranked
+
+Every backend indexes title, technology names and description (in that
+order of weight) and annotates matches with ``search_rank``, where higher
+means more relevant.
+"""
+import re
+
+from django.db import connections, router
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Project, ProjectSearchDocument
+
+SEARCH_TABLE = ProjectSearchDocument._meta.db_table
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Split user input into plain word tokens, dropping query syntax"""
+    return TOKEN_RE.findall(query or '')[:16]
+
+
+class IcontainsSearchBackend:
+    """Fallback for databases without a native full-text index"""
+
+    vendor = None
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return self.no_results(queryset)
+        condition = Q()
+        for token in tokens:
+            condition &= (
+                Q(title__icontains=token) |
+                Q(description__icontains=token) |
+                Q(technologies__name__icontains=token)
+            )
+        return queryset.filter(condition).distinct().annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    def no_results(self, queryset):
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index_projects(self, pks):
+        pass
+
+    def remove_projects(self, pks):
+        pass
+
+    def rebuild(self):
+        return 0
+
+    def _db_pks(self, pks):
+        pk_field = Project._meta.pk
+        return [pk_field.get_db_prep_value(pk, self.connection) for pk in pks]
+
+    def _execute(self, sql, params=()):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+
+class SQLiteSearchBackend(IcontainsSearchBackend):
+    vendor = 'sqlite'
+
+    # bm25() weights for (project_id, title, description, technologies)
+    RANK = f'-bm25({SEARCH_TABLE}, 0.0, 10.0, 2.0, 5.0)'
+    DOCUMENT_SQL = f'''
+        INSERT INTO {SEARCH_TABLE} (project_id, title, description, technologies)
+        SELECT p.id, p.title, p.description,
+               COALESCE((SELECT group_concat(s.name, ' ')
+                         FROM main_project_technologies pt
+                         JOIN main_skill s ON s.id = pt.skill_id
+                         WHERE pt.project_id = p.id), '')
+        FROM main_project p
+    '''
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return self.no_results(queryset)
+        # Every token is quoted (no FTS syntax leaks through) and
+        # prefix-matched so results update while the visitor types
+        match = ' '.join('"%s"*' % token for token in tokens)
+        return queryset.filter(search_document__isnull=False).filter(
+            RawSQL(f'{SEARCH_TABLE} MATCH %s', [match], output_field=BooleanField())
+        ).annotate(search_rank=RawSQL(self.RANK, [], output_field=FloatField()))
+
+    def index_projects(self, pks):
+        pks = self._db_pks(pks)
+        if not pks:
+            return
+        placeholders = ', '.join(['%s'] * len(pks))
+        self._execute(f'DELETE FROM {SEARCH_TABLE} WHERE project_id IN ({placeholders})', pks)
+        self._execute(f'{self.DOCUMENT_SQL} WHERE p.id IN ({placeholders})', pks)
+
+    def remove_projects(self, pks):
+        pks = self._db_pks(pks)
+        if pks:
+            placeholders = ', '.join(['%s'] * len(pks))
+            self._execute(f'DELETE FROM {SEARCH_TABLE} WHERE project_id IN ({placeholders})', pks)
+
+    def rebuild(self):
+        self._execute(f'DELETE FROM {SEARCH_TABLE}')
+        count = self._execute(self.DOCUMENT_SQL)
+        self._execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        return count
+
+
+class PostgreSQLSearchBackend(IcontainsSearchBackend):
+    vendor = 'postgresql'
+
+    CONFIG = 'english'
+    RANK = f'ts_rank_cd({SEARCH_TABLE}.document, to_tsquery(%s, %s))'
+    DOCUMENT_SQL = f'''
+        INSERT INTO {SEARCH_TABLE} (project_id, document)
+        SELECT p.id,
+               setweight(to_tsvector('{CONFIG}', p.title), 'A') ||
+               setweight(to_tsvector('{CONFIG}', COALESCE(
+                   (SELECT string_agg(s.name, ' ')
+                    FROM main_project_technologies pt
+                    JOIN main_skill s ON s.id = pt.skill_id
+                    WHERE pt.project_id = p.id), '')), 'B') ||
+               setweight(to_tsvector('{CONFIG}', p.description), 'C')
+        FROM main_project p
+    '''
+    UPSERT_SQL = ' ON CONFLICT (project_id) DO UPDATE SET document = EXCLUDED.document'
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return self.no_results(queryset)
+        tsquery = ' & '.join('%s:*' % token for token in tokens)
+        return queryset.filter(search_document__isnull=False).filter(
+            RawSQL(
+                f'{SEARCH_TABLE}.document @@ to_tsquery(%s, %s)',
+                [self.CONFIG, tsquery],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(self.RANK, [self.CONFIG, tsquery], output_field=FloatField())
+        )
+
+    def index_projects(self, pks):
+        pks = self._db_pks(pks)
+        if pks:
+            self._execute(f'{self.DOCUMENT_SQL} WHERE p.id = ANY(%s){self.UPSERT_SQL}', [pks])
+
+    def remove_projects(self, pks):
+        pks = self._db_pks(pks)
+        if pks:
+            self._execute(f'DELETE FROM {SEARCH_TABLE} WHERE project_id = ANY(%s)', [pks])
+
+    def rebuild(self):
+        self._execute(f'TRUNCATE {SEARCH_TABLE}')
+        return self._execute(self.DOCUMENT_SQL)
+
+
+BACKENDS = {
+    backend.vendor: backend
+    for backend in (SQLiteSearchBackend, PostgreSQLSearchBackend)
+}
+
+
+def get_backend(using=None):
+    """Search backend for the given database alias (writes go to the primary)"""
+    if using is None:
+        using = router.db_for_write(Project)
+    connection = connections[using]
+    return BACKENDS.get(connection.vendor, IcontainsSearchBackend)(connection)
+
+
+def search_queryset(queryset, query):
+    """Filter ``queryset`` to projects matching ``query``, annotated with
+    ``search_rank``"""
+    return get_backend(queryset.db).search(queryset, query)
@@ -0,0 +1,221 @@
+# main/seed.py
+"""Declarative seed data, applied as a bulk diff.
+
+A seed file lists rows per section (``profile``, ``skills``,
+``projects``), either as JSON::
+
+    {"skills": [{"name": "Python", "category": "programming", "proficiency": 85}],
+     "projects": [{"title": "Chatbot", "technologies": ["Python", "NLP"]}]}
+
+or as a CSV file holding one section (named by ``--section`` or the file
+name, e.g. ``skills.csv``); a ``technologies`` column is split on ``;``.
+
+``plan()`` reads the existing rows of each table once, matched by the
+section's natural key, and works out what to insert, what to update and
+which project technologies are missing. ``apply()`` writes all of it
+with bulk_create/bulk_update inside one transaction. A seed that is
+already applied costs a handful of SELECTs and writes nothing (cache
+versions included), so it is cheap to run on every deploy.
+
+By default existing rows are left alone, so edits made in the admin
+survive deploys; ``update=True`` overwrites the fields a seed names.
+Technologies are only ever added. Skills named only in ``technologies``
+are created with NEW_SKILL_DEFAULTS.
+"""
+import csv
+import json
+import os
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import related
+from .cache import bump_content_version, bump_profile_version, bump_skills_version
+from .models import Profile, Project, Skill
+from .search import get_backend
+
+Section = namedtuple('Section', 'model key')
+SECTIONS = {
+    'profile': Section(Profile, 'name'),
+    'skills': Section(Skill, 'name'),
+    'projects': Section(Project, 'title'),
+}
+NEW_SKILL_DEFAULTS = {'category': 'other', 'proficiency': 70}
+
+Through = Project.technologies.through
+
+
+class SeedError(Exception):
+    pass
+
+
+def load(path, section=None):
+    """Rows per section from a JSON or CSV seed file"""
+    if path.endswith('.csv'):
+        section = section or os.path.splitext(os.path.basename(path))[0]
+        if section not in SECTIONS:
+            raise SeedError(f'Unknown section {section!r}; use one of {", ".join(SECTIONS)}')
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = []
+            for row in csv.DictReader(f):
+                row = {name: value for name, value in row.items() if value != ''}
+                if 'technologies' in row:
+                    row['technologies'] = [name.strip() for name in row['technologies'].split(';') if name.strip()]
+                rows.append(row)
+        return {section: rows}
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    unknown = set(data) - set(SECTIONS)
+    if unknown:
+        raise SeedError(f'Unknown sections: {", ".join(sorted(unknown))}')
+    return data
+
+
+def _clean(model, row):
+    """Row values converted to Python, checked against the model's fields"""
+    values = {}
+    for name, value in row.items():
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise SeedError(f'{model.__name__} has no field {name!r}')
+        if isinstance(value, str) and field.get_internal_type() == 'BooleanField':
+            value = value.strip().lower() in ('1', 't', 'true', 'y', 'yes')
+        try:
+            values[name] = field.to_python(value)
+        except ValidationError as e:
+            raise SeedError(f'{model.__name__}.{name}: {"; ".join(e.messages)}')
+    return values
+
+
+class Plan:
+    """Changes that bring the database in line with a seed"""
+
+    def __init__(self):
+        self.creates = {name: [] for name in SECTIONS}
+        self.updates = {name: [] for name in SECTIONS}  # (object, {field: (old, new)})
+        self.links = []  # (project, skill name)
+        self.projects = {}  # title -> project, new or existing
+
+    def __bool__(self):
+        return bool(self.links or any(self.creates.values()) or any(self.updates.values()))
+
+    def describe(self):
+        """Human-readable diff lines"""
+        lines = []
+        for name, section in SECTIONS.items():
+            for obj in self.creates[name]:
+                lines.append(f'+ {name}: {getattr(obj, section.key)}')
+            for obj, changes in self.updates[name]:
+                for field, (old, new) in changes.items():
+                    lines.append(f'~ {name}: {getattr(obj, section.key)}: {field} {old!r} -> {new!r}')
+        for project, skill in self.links:
+            lines.append(f'+ technology: {project.title} -> {skill}')
+        return lines
+
+
+def plan(data, update=False):
+    """Diff ``data`` (as returned by load) against the database"""
+    result = Plan()
+    technologies = {}
+    for name, section in SECTIONS.items():
+        rows = data.get(name, [])
+        if not rows:
+            continue
+        model, key = section
+        cleaned = []
+        for row in rows:
+            row = dict(row)
+            if name == 'projects':
+                names = row.pop('technologies', [])
+            if key not in row:
+                raise SeedError(f'A {name} row has no {key!r}')
+            cleaned.append(_clean(model, row))
+            if name == 'projects':
+                technologies[cleaned[-1][key]] = names
+
+        existing = {getattr(obj, key): obj for obj in model.objects.filter(**{f'{key}__in': [row[key] for row in cleaned]})}
+        for row in cleaned:
+            obj = existing.get(row[key])
+            if obj is None:
+                obj = model(**row)
+                existing[row[key]] = obj
+                result.creates[name].append(obj)
+            elif update:
+                changes = {
+                    field: (getattr(obj, field), value)
+                    for field, value in row.items() if getattr(obj, field) != value
+                }
+                if changes:
+                    for field, (_, value) in changes.items():
+                        setattr(obj, field, value)
+                    result.updates[name].append((obj, changes))
+        if name == 'projects':
+            result.projects = existing
+
+    if technologies:
+        _plan_links(result, technologies)
+    return result
+
+
+def _plan_links(result, technologies):
+    skills = {skill.name.lower(): skill.name for skill in Skill.objects.all()}
+    skills.update((obj.name.lower(), obj.name) for obj in result.creates['skills'])
+    projects = result.projects
+    pks = [project.pk for project in projects.values() if not project._state.adding]
+    linked = set(Through.objects.filter(project_id__in=pks).values_list('project_id', 'skill__name'))
+    for title, names in technologies.items():
+        project = projects[title]
+        for name in names:
+            if name.lower() not in skills:
+                skills[name.lower()] = name
+                result.creates['skills'].append(Skill(name=name, **NEW_SKILL_DEFAULTS))
+            name = skills[name.lower()]
+            if (project.pk, name) not in linked:
+                linked.add((project.pk, name))
+                result.links.append((project, name))
+
+
+def apply(result):
+    """Write ``result`` in one transaction and refresh what depends on it"""
+    if not result:
+        return
+    with transaction.atomic():
+        now = timezone.now()
+        for name, section in SECTIONS.items():
+            model = section.model
+            if result.creates[name]:
+                model.objects.bulk_create(result.creates[name])
+            if result.updates[name]:
+                fields = {field for _, changes in result.updates[name] for field in changes}
+                objs = [obj for obj, _ in result.updates[name]]
+                if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+                    # bulk_update skips auto_now
+                    for obj in objs:
+                        obj.updated_at = now
+                    fields.add('updated_at')
+                model.objects.bulk_update(objs, sorted(fields))
+
+        if result.links:
+            skill_ids = dict(Skill.objects.filter(
+                name__in={name for _, name in result.links}).values_list('name', 'pk'))
+            Through.objects.bulk_create(
+                [Through(project_id=project.pk, skill_id=skill_ids[name]) for project, name in result.links],
+                ignore_conflicts=True,
+            )
+
+        # Bulk writes send no signals
+        projects = {obj.pk for obj in result.creates['projects']}
+        projects.update(obj.pk for obj, _ in result.updates['projects'])
+        projects.update(project.pk for project, _ in result.links)
+        if projects:
+            get_backend().index_projects(list(projects))
+        linked = {project.pk for project, _ in result.links}
+        if linked:
+            related.refresh_projects(linked)
+        for bump in (bump_content_version, bump_skills_version, bump_profile_version):
+            bump()
+            transaction.on_commit(bump)
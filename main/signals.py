@@ -0,0 +1,163 @@
+# main/signals.py
+import logging
+
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import related
+from .cache import bump_content_version, bump_profile_version, bump_resume_version, bump_skills_version
+from .models import Profile, Project, RelatedProject, Resume, Skill
+from .placeholders import measure_upload
+from .queue import enqueue
+from .search import get_backend
+from .tasks import store_image_placeholder
+
+logger = logging.getLogger(__name__)
+
+CONTENT_MODELS = (Profile, Project, Skill, Resume)
+
+
+def technologies_changed(pks):
+    """Refresh everything derived from the technology sets of ``pks``"""
+    pks = list(pks)
+    if pks:
+        get_backend().index_projects(pks)
+        related.refresh_projects(pks)
+
+
+@receiver(post_save, sender=Project)
+def index_saved_project(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_backend().index_projects([instance.pk])
+
+
+@receiver(pre_delete, sender=Project)
+def remember_project_neighbours(sender, instance, **kwargs):
+    # Lists pointing at this project lose a row by cascade
+    instance._neighbour_pks = list(
+        RelatedProject.objects.filter(related=instance).values_list('project_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Project)
+def unindex_deleted_project(sender, instance, **kwargs):
+    get_backend().remove_projects([instance.pk])
+    for pk in getattr(instance, '_neighbour_pks', []):
+        related.recompute(pk)
+
+
+@receiver(post_save, sender=Skill)
+def reindex_skill_projects(sender, instance, created=False, raw=False, **kwargs):
+    """A renamed skill changes the technology text of its projects"""
+    if not created and not raw:
+        get_backend().index_projects(list(instance.projects.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Skill)
+def remember_skill_projects(sender, instance, **kwargs):
+    # The through rows are gone by post_delete, so collect them now
+    instance._project_pks = list(instance.projects.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def reindex_deleted_skill_projects(sender, instance, **kwargs):
+    technologies_changed(getattr(instance, '_project_pks', []))
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def reindex_project_technologies(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # Clearing from the skill side does not report which projects lost it
+        instance._project_pks = list(instance.projects.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            technologies_changed([instance.pk])
+        elif action == 'post_clear':
+            technologies_changed(getattr(instance, '_project_pks', []))
+        else:
+            technologies_changed(pk_set or [])
+
+
+@receiver(pre_save, sender=Project)
+@receiver(pre_save, sender=Profile)
+def measure_uploaded_image(sender, instance, raw=False, **kwargs):
+    """Size and placeholder of a new upload, read before it goes to Cloudinary"""
+    upload = getattr(instance, instance.IMAGE_FIELD)
+    if raw or not isinstance(upload, UploadedFile):
+        return
+    try:
+        instance.image_width, instance.image_height, instance.image_placeholder = measure_upload(upload)
+        instance._image_measured = True
+    except Exception as e:
+        logger.warning(f'Could not measure uploaded image {upload.name}: {e}')
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Profile)
+def store_image_variants(sender, instance, raw=False, **kwargs):
+    """Precompute the srcset data of every variant when the image changes"""
+    if raw:
+        return
+    stored = instance.image_variants
+    if instance.refresh_image_variants() == stored:
+        return
+    fields = {'image_variants': instance.image_variants}
+    if not getattr(instance, '_image_measured', False):
+        # Set from an existing public id, so there were no bytes to measure
+        fields.update(image_width=None, image_height=None, image_placeholder='')
+        for name, value in fields.items():
+            setattr(instance, name, value)
+        if instance.image_variants:
+            enqueue(store_image_placeholder, model=sender._meta.label_lower, pk=str(instance.pk))
+    sender.objects.filter(pk=instance.pk).update(**fields)
+
+
+def content_changed(sender, raw=False, action='post', **kwargs):
+    if raw or action.startswith('pre'):
+        return
+    # Bump now so nothing renders under the old version, and again after
+    # commit so pages rendered from pre-commit data are superseded too
+    bump_content_version()
+    transaction.on_commit(bump_content_version)
+
+
+for model in CONTENT_MODELS:
+    post_save.connect(content_changed, sender=model, dispatch_uid=f'content_version_save_{model.__name__}')
+    post_delete.connect(content_changed, sender=model, dispatch_uid=f'content_version_delete_{model.__name__}')
+m2m_changed.connect(content_changed, sender=Project.technologies.through, dispatch_uid='content_version_m2m')
+
+
+def skills_changed(sender, raw=False, action='post', **kwargs):
+    if raw or action.startswith('pre'):
+        return
+    bump_skills_version()
+    transaction.on_commit(bump_skills_version)
+
+
+post_save.connect(skills_changed, sender=Skill, dispatch_uid='skills_version_save')
+post_delete.connect(skills_changed, sender=Skill, dispatch_uid='skills_version_delete')
+m2m_changed.connect(skills_changed, sender=Project.technologies.through, dispatch_uid='skills_version_m2m')
+
+
+def profile_changed(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump_profile_version()
+    transaction.on_commit(bump_profile_version)
+
+
+post_save.connect(profile_changed, sender=Profile, dispatch_uid='profile_version_save')
+post_delete.connect(profile_changed, sender=Profile, dispatch_uid='profile_version_delete')
+
+
+def resume_changed(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump_resume_version()
+    transaction.on_commit(bump_resume_version)
+
+
+post_save.connect(resume_changed, sender=Resume, dispatch_uid='resume_version_save')
+post_delete.connect(resume_changed, sender=Resume, dispatch_uid='resume_version_delete')
@@ -0,0 +1,68 @@
+# main/skills.py
+"""Skills grouped by category, shared by the about, home and API views.
+
+The tree is built with one query, ordered by SKILL_CATEGORIES and then by
+Skill.Meta.ordering, and cached per skills version (bumped by
+main.signals whenever a skill changes).
+"""
+from django.db.models import Case, IntegerField, Value, When
+
+from .cache import get_skills_version, versioned
+from .models import Skill
+
+SKILL_FIELDS = ('id', 'name', 'category', 'proficiency', 'icon', 'is_featured')
+CATEGORY_LABELS = dict(Skill.SKILL_CATEGORIES)
+
+
+def _build_tree():
+    category_order = Case(
+        *[When(category=key, then=Value(index)) for index, (key, _) in enumerate(Skill.SKILL_CATEGORIES)],
+        default=Value(len(Skill.SKILL_CATEGORIES)),
+        output_field=IntegerField(),
+    )
+    tree = {}
+    skills = Skill.objects.order_by(category_order, *Skill._meta.ordering).values(*SKILL_FIELDS)
+    for skill in skills:
+        label = CATEGORY_LABELS.get(skill['category'], skill['category'])
+        tree.setdefault(label, []).append(skill)
+    return tree
+
+
+def get_skills_by_category(version=None):
+    """{category label: [skill dicts]} in SKILL_CATEGORIES order"""
+    if version is None:
+        version = get_skills_version()
+    return versioned('skills-tree', version, _build_tree)
+
+
+def get_featured_skills(limit=8, version=None):
+    """Featured skills in Skill.Meta.ordering, like the old home query"""
+    featured = [
+        skill
+        for skills in get_skills_by_category(version).values()
+        for skill in skills
+        if skill['is_featured']
+    ]
+    featured.sort(key=lambda skill: (-skill['proficiency'], skill['name']))
+    return featured[:limit]
+
+
+def find_skill(name, version=None):
+    """Skill dict whose name matches ``name`` case-insensitively, or None"""
+    name = name.casefold()
+    for skills in get_skills_by_category(version).values():
+        for skill in skills:
+            if skill['name'].casefold() == name:
+                return skill
+    return None
+
+
+def get_skills_payload(version=None):
+    """Flat skills list served by skills_api"""
+    return {
+        'skills': [
+            {field: skill[field] for field in ('name', 'proficiency', 'category', 'icon')}
+            for skills in get_skills_by_category(version).values()
+            for skill in skills
+        ]
+    }
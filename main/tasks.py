@@ -0,0 +1,44 @@
+# main/tasks.py
+"""Background tasks, run by ``manage.py run_worker`` (see main.queue)"""
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .models import ContactMessage
+from .placeholders import measure_url
+from .queue import task
+
+
+@task(max_attempts=6, concurrency=2, backoff=60)
+def send_contact_notification(message_id):
+    """Email the site owner about a new contact message"""
+    message = ContactMessage.objects.filter(pk=message_id).first()
+    if message is None:
+        return  # deleted before the worker got to it
+    send_mail(
+        subject=f"Portfolio Contact: {message.subject}",
+        message=f"""
+        New message from your portfolio:
+
+        Name: {message.name}
+        Email: {message.email}
+        Subject: {message.subject}
+
+        Message:
+        {message.message}
+        """,
+        from_email=settings.EMAIL_HOST_USER,
+        recipient_list=[settings.EMAIL_HOST_USER],
+        fail_silently=False,
+    )
+
+
+@task(max_attempts=4, concurrency=2, backoff=30)
+def store_image_placeholder(model, pk):
+    """Measure an image that was set without an upload (see main.placeholders)"""
+    obj = apps.get_model(model).objects.filter(pk=pk).first()
+    if obj is None or not getattr(obj, obj.IMAGE_FIELD):
+        return
+    # The Cloudinary URL itself, even when pages use the media proxy
+    obj.image_width, obj.image_height, obj.image_placeholder = measure_url(getattr(obj, obj.IMAGE_FIELD).url)
+    obj.save(update_fields=['image_width', 'image_height', 'image_placeholder'])
@@ -0,0 +1,39 @@
+# main/templatetags/images.py
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from main.media import rendered_size
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(obj, preset, alt='', loading='lazy', **attrs):
+    """``<img>`` for variant ``preset`` of ``obj``'s image.
+
+    Reads the srcset data stored in ``obj.image_variants``, so the page
+    does no URL building. Uncropped variants take their width and
+    height from the stored image dimensions. The stored blurred
+    placeholder, if any, is painted behind the image until it loads.
+    Extra keyword arguments (``class``, ``style``...) become attributes;
+    renders nothing when there is no image.
+
+        {% responsive_image project 'card' alt=project.title class='card-img-top' %}
+    """
+    variant = (obj.image_variants or {}).get(preset) if obj else None
+    if variant is None and obj and preset in getattr(obj, 'IMAGE_VARIANTS', ()):
+        # Saved before variants existed; `manage.py rebuild_image_variants` stores them
+        variant = obj.refresh_image_variants().get(preset)
+    if variant is None:
+        return ''
+    width, height = rendered_size(variant, getattr(obj, 'image_width', None), getattr(obj, 'image_height', None))
+    placeholder = getattr(obj, 'image_placeholder', '')
+    if placeholder:
+        background = f'background: url({placeholder}) center / cover no-repeat'
+        attrs['style'] = f"{attrs['style'].rstrip('; ')}; {background}" if attrs.get('style') else background
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" loading="{}" decoding="async"{}>',
+        variant['src'], variant['srcset'], variant['sizes'], width, height,
+        alt, loading, flatatt(attrs),
+    )
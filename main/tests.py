@@ -1,3 +1,1921 @@
-from django.test import TestCase
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import cloudinary
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from . import archive
+from . import backup
+from . import database
+from . import cache as cache_module
+from . import health
+from . import media_migration
+from . import media_proxy
+from . import placeholders
+from . import media
+from . import related
+from . import replicas
+from . import resume as resume_module
+from .cache import brotli, content_validators
+from . import queue
+from .models import ArchivedMessage, AssetCheck, ContactMessage, Profile, Project, RelatedProject, Resume, Skill, Task
+from .profile import get_profile
+from .resume import get_active_resume
+from .pagination import KeysetPaginator
+from .search import search_queryset
+from .skills import get_featured_skills, get_skills_by_category
+from .views import PROJECTS_PER_PAGE
+
+
+@override_settings(
+    SECURE_SSL_REDIRECT=False,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class PortfolioTestCase(TestCase):
+    """Plain-HTTP test client with an isolated, empty cache"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        media.clear()
+
+
+def make_projects(count, technologies=()):
+    projects = []
+    for i in range(count):
+        project = Project.objects.create(
+            title=f'Project {i}',
+            short_description=f'Short description {i}',
+            description=f'Detailed description {i}',
+            status='completed' if i % 2 == 0 else 'in_progress',
+            order=i,
+        )
+        project.technologies.set(technologies)
+        projects.append(project)
+    return projects
+
+
+class ProjectsViewTests(PortfolioTestCase):
+    """The projects listing renders in a constant number of queries
+
+    Conditional GET validators are computed once per content version, so
+    they are primed before measuring.
+    """
+
+    QUERY_BUDGET = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.python = Skill.objects.create(name='Python', category='programming')
+        cls.django = Skill.objects.create(name='Django', category='framework')
+
+    def test_query_count_is_independent_of_project_count(self):
+        make_projects(3, [self.python, self.django])
+        content_validators()
+        get_profile()
+        get_active_resume()
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            small = self.client.get(reverse('projects'))
+
+        make_projects(30, [self.python, self.django])
+        content_validators()
+        get_profile()
+        get_active_resume()
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            large = self.client.get(reverse('projects'))
+
+        self.assertEqual(small.context['stats']['total'], 3)
+        self.assertEqual(large.context['stats']['total'], 33)
+
+    def test_filtered_listing_stays_within_budget(self):
+        make_projects(10, [self.python])
+        content_validators()
+        get_profile()
+        get_active_resume()
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(reverse('projects'), {'search': 'Python'})
+        self.assertEqual(response.context['stats']['total'], 10)
+
+    def test_stats_count_statuses(self):
+        make_projects(5, [self.python])
+        response = self.client.get(reverse('projects'))
+        stats = response.context['stats']
+        self.assertEqual(stats['completed'], 3)
+        self.assertEqual(stats['in_progress'], 2)
+        self.assertEqual(response.context['all_technologies'], [self.python])
+
+    def test_technology_filter_ignores_case(self):
+        make_projects(4, [self.python])
+        response = self.client.get(reverse('projects'), {'tech': 'PYTHON'})
+        self.assertEqual(response.context['stats']['total'], 4)
+        response = self.client.get(reverse('projects'), {'tech': 'Cobol'})
+        self.assertEqual(response.context['stats']['total'], 0)
+        self.assertEqual(response.context['projects'], [])
+
+
+class KeysetPaginationTests(PortfolioTestCase):
+    """Cursor pagination visits every project once, in Meta.ordering"""
+
+    @classmethod
+    def setUpTestData(cls):
+        created_at = timezone.now()
+        for i in range(25):
+            # Plenty of ties so the UUID tiebreaker matters
+            Project.objects.create(
+                title=f'Paged {i}',
+                short_description='Paged project',
+                description='Paged project',
+                is_featured=i % 5 == 0,
+                order=i % 3,
+                created_at=created_at,
+            )
+        cls.expected = list(
+            Project.objects.order_by('-is_featured', 'order', '-created_at', 'pk')
+        )
+
+    def test_forward_and_backward_pages(self):
+        paginator = KeysetPaginator(Project.objects.all(), 10)
+        pages = [paginator.page()]
+        while pages[-1].has_next:
+            pages.append(paginator.page(pages[-1].next_cursor))
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([p for page in pages for p in page], self.expected)
+        self.assertFalse(pages[0].has_previous)
+
+        previous = paginator.page(pages[2].prev_cursor)
+        self.assertEqual(previous.object_list, pages[1].object_list)
+        first = paginator.page(previous.prev_cursor)
+        self.assertEqual(first.object_list, pages[0].object_list)
+        self.assertFalse(first.has_previous)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        paginator = KeysetPaginator(Project.objects.all(), 10)
+        self.assertEqual(paginator.page('not-a-cursor').object_list, self.expected[:10])
+
+    def test_projects_view_links_next_page(self):
+        response = self.client.get(reverse('projects'))
+        self.assertEqual(len(response.context['projects']), PROJECTS_PER_PAGE)
+        self.assertIsNone(response.context['prev_query'])
+        self.assertEqual(response.context['stats']['total'], 25)
+
+        response = self.client.get(reverse('projects') + '?' + response.context['next_query'])
+        self.assertEqual(response.context['projects'], self.expected[PROJECTS_PER_PAGE:PROJECTS_PER_PAGE * 2])
+        self.assertIsNotNone(response.context['prev_query'])
+
+    def test_search_api_cursor(self):
+        url = reverse('search_projects')
+        seen = []
+        params = {'q': 'Paged', 'limit': 7}
+        while True:
+            data = self.client.get(url, params).json()
+            seen.extend(result['url'] for result in data['results'])
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+        self.assertEqual(seen, [p.get_absolute_url() for p in self.expected])
+
+
+class QueryPlanTests(PortfolioTestCase):
+    """The queries behind the public pages are answered from indexes.
+
+    Every SELECT a page runs (with the per-version caches primed) is
+    EXPLAINed; a sequential scan of a whole table fails the test. On
+    PostgreSQL sequential scans are disabled first, so the planner only
+    picks one when no index can serve the query.
+    """
+
+    FULL_SCAN = {
+        'sqlite': re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$'),
+        'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.python = Skill.objects.create(name='Python', proficiency=90, is_featured=True)
+        cls.django = Skill.objects.create(name='Django', proficiency=80)
+        cls.projects = make_projects(30, [cls.python, cls.django])
+        Project.objects.filter(order__lt=6).update(is_featured=True)
+        related.rebuild()
+
+    def full_scans(self, sql, params=None):
+        """Plan lines that scan a whole table (subqueries are not tables)"""
+        pattern = self.FULL_SCAN.get(connection.vendor)
+        if pattern is None:
+            self.skipTest(f'No plan check for {connection.vendor}')
+        tables = set(connection.introspection.table_names())
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}', params)
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [str(row[-1]).strip() for row in cursor.fetchall()]
+        return [line for line in plan if (match := pattern.search(line)) and match.group(1) in tables]
+
+    def assertIndexed(self, url, params=None):
+        content_validators()
+        get_profile()
+        get_active_resume()
+        get_skills_by_category()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects)
+        for sql in selects:
+            self.assertEqual(self.full_scans(sql), [], sql)
+        return response
+
+    def test_home(self):
+        self.assertIndexed(reverse('home'))
+
+    def test_projects_listing(self):
+        response = self.assertIndexed(reverse('projects'))
+        self.assertIndexed(reverse('projects') + '?' + response.context['next_query'])
+
+    def test_projects_filters(self):
+        self.assertIndexed(reverse('projects'), {'tech': 'python'})
+        self.assertIndexed(reverse('projects'), {'status': 'completed'})
+
+    def test_project_detail(self):
+        self.assertIndexed(self.projects[0].get_absolute_url())
+
+    def test_admin_lookups(self):
+        ContactMessage.objects.create(name='A', email='a@example.com', subject='Hi', message='Hello')
+        for queryset in (
+            ContactMessage.objects.filter(is_read=False)[:100],
+            ContactMessage.objects.all()[:100],
+            Resume.objects.filter(is_active=True).exclude(file=''),
+            Skill.objects.filter(name__in=['Python', 'Rust']),
+        ):
+            sql, params = queryset.query.sql_with_params()
+            with self.subTest(sql=sql):
+                self.assertEqual(self.full_scans(sql, params), [])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Replicas are simulated with SQLite files')
+@override_settings(DATABASE_REPLICAS=['replica_test'], REPLICA_LAG=0, REPLICA_HEALTH_INTERVAL=60)
+class ReplicaTests(PortfolioTestCase):
+    """Public reads go to a replica (a copy of the test database in a file)"""
+
+    ALIAS = 'replica_test'
+
+    def setUp(self):
+        super().setUp()
+        self.replica_dir = tempfile.mkdtemp()
+        self.add_replica(os.path.join(self.replica_dir, 'replica.sqlite3'))
+        self.addCleanup(self.remove_replica)
+        replicas._health.clear()
+        self.addCleanup(replicas._health.clear)
+        Project.objects.create(title='Replicated', short_description='On both', description='On both')
+        self.replicate()
+        Project.objects.create(title='Primary only', short_description='Not yet', description='Not yet')
+        cache.clear()
+
+    def add_replica(self, name):
+        connections.settings[self.ALIAS] = {**connections.settings['default'], 'NAME': name}
+
+    def remove_replica(self):
+        connections[self.ALIAS].close()
+        del connections.settings[self.ALIAS]
+        if hasattr(connections._connections, self.ALIAS):
+            delattr(connections._connections, self.ALIAS)
+        shutil.rmtree(self.replica_dir)
+
+    def replicate(self):
+        """Copy the primary, uncommitted test data included, into the replica file"""
+        connections[self.ALIAS].close()
+        connection.ensure_connection()
+        name = connections.settings[self.ALIAS]['NAME']
+        if os.path.exists(name):
+            os.remove(name)
+        # The backup API would wait for the test transaction to end. The
+        # full-text table does not survive a dump and is not needed here.
+        dump = [sql for sql in connection.connection.iterdump() if 'main_project_search' not in sql]
+        target = sqlite3.connect(name)
+        target.executescript('\n'.join(dump))
+        target.close()
+
+    def listed(self, **params):
+        response = self.client.get(reverse('projects'), params)
+        return response.context['stats']['total']
+
+    def test_public_pages_read_from_replica(self):
+        with CaptureQueriesContext(connections[self.ALIAS]) as queries:
+            self.assertEqual(self.listed(), 1)
+            self.assertEqual(self.client.get(reverse('home')).status_code, 200)
+        self.assertTrue(queries.captured_queries)
+
+    def test_other_views_read_from_primary(self):
+        with CaptureQueriesContext(connections[self.ALIAS]) as queries:
+            self.client.get(reverse('contact'))
+        self.assertEqual(queries.captured_queries, [])
+
+    def test_writer_is_pinned_to_primary(self):
+        response = self.client.post(reverse('contact'), {
+            'name': 'Visitor',
+            'email': 'visitor@example.com',
+            'subject': 'Hello',
+            'message': 'I would like to talk about a project.',
+        })
+        self.assertIn(replicas.PIN_COOKIE, response.cookies)
+        self.assertEqual(self.listed(), 2)
+
+    def test_recent_content_change_reads_primary(self):
+        with self.settings(REPLICA_LAG=60):
+            Project.objects.create(title='Fresh', short_description='New', description='New')
+            self.assertEqual(self.listed(), 3)
+
+    def test_unreachable_replica_fails_over(self):
+        connections[self.ALIAS].close()
+        connections.settings[self.ALIAS]['NAME'] = os.path.join(self.replica_dir, 'missing', 'db.sqlite3')
+        with self.assertLogs('main.replicas', 'WARNING'):
+            self.assertEqual(self.listed(), 2)
+        self.assertFalse(replicas._health[self.ALIAS][0])
+
+        # Not checked again until REPLICA_HEALTH_INTERVAL has passed
+        with mock.patch.object(replicas, 'check_replica') as check:
+            self.assertEqual(self.listed(status='completed'), 2)
+        check.assert_not_called()
+
+    def test_replica_failing_mid_request_is_retried_on_primary(self):
+        # Passed its last check, then went away
+        replicas._health[self.ALIAS] = (True, time.monotonic())
+        connections[self.ALIAS].close()
+        connections.settings[self.ALIAS]['NAME'] = os.path.join(self.replica_dir, 'missing', 'db.sqlite3')
+        with self.assertLogs('main.replicas', 'WARNING') as logs:
+            self.assertEqual(self.listed(), 2)
+        self.assertIn('retrying on the primary', logs.output[0])
+        self.assertFalse(replicas._health[self.ALIAS][0])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Uses SQLite files as extra databases')
+class ConnectionWarmupTests(PortfolioTestCase):
+    """Persistent connections are opened before the first request"""
+
+    def add_database(self, alias, name, max_age):
+        connections.settings[alias] = {**connections.settings['default'], 'NAME': name, 'CONN_MAX_AGE': max_age}
+
+        def remove():
+            connections[alias].close()
+            del connections.settings[alias]
+            if hasattr(connections._connections, alias):
+                delattr(connections._connections, alias)
+        self.addCleanup(remove)
+
+    def test_warm_up_opens_persistent_connections(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.add_database('warm', os.path.join(directory, 'warm.sqlite3'), 600)
+        self.add_database('per_request', os.path.join(directory, 'cold.sqlite3'), 0)
+        self.add_database('broken', os.path.join(directory, 'missing', 'db.sqlite3'), 600)
+
+        with self.assertLogs('main.database', 'WARNING') as logs:
+            timings = database.warm_up(['warm', 'per_request', 'broken'])
+        self.assertEqual(list(timings), ['warm'])
+        self.assertIsNotNone(connections['warm'].connection)
+        self.assertIsNone(connections['per_request'].connection)
+        self.assertIn('broken', logs.output[0])
+
+
+class ProjectSearchTests(PortfolioTestCase):
+    """The full-text index follows project and technology changes"""
+
+    def search(self, query):
+        return list(search_queryset(Project.objects.all(), query).order_by('-search_rank'))
+
+    def test_index_follows_saves_and_deletes(self):
+        project = make_projects(1)[0]
+        self.assertEqual(self.search('Project'), [project])
+
+        project.title = 'Energy meter'
+        project.save()
+        self.assertEqual(self.search('energy'), [project])
+        self.assertEqual(self.search('Project'), [])
+
+        project.delete()
+        self.assertEqual(self.search('energy'), [])
+
+    def test_index_follows_technologies(self):
+        project = make_projects(1)[0]
+        kivy = Skill.objects.create(name='Kivy')
+        self.assertEqual(self.search('kivy'), [])
+
+        project.technologies.add(kivy)
+        self.assertEqual(self.search('kivy'), [project])
+
+        kivy.name = 'Flutter'
+        kivy.save()
+        self.assertEqual(self.search('kivy'), [])
+        self.assertEqual(self.search('flutter'), [project])
+
+        kivy.projects.clear()
+        self.assertEqual(self.search('flutter'), [])
+
+    def test_title_matches_rank_first(self):
+        in_description = Project.objects.create(
+            title='Dashboard', short_description='-', description='Built for robots'
+        )
+        in_title = Project.objects.create(
+            title='Robot arm', short_description='-', description='Servo control'
+        )
+        self.assertEqual(self.search('robot'), [in_title, in_description])
+
+        response = self.client.get(reverse('projects'), {'search': 'robot'})
+        self.assertEqual(response.context['projects'], [in_title, in_description])
+
+    def test_query_syntax_is_not_interpreted(self):
+        make_projects(1)
+        for query in ['"unbalanced', 'a OR', 'NEAR(', '*', '-x']:
+            self.assertIsInstance(self.search(query), list)
+        response = self.client.get(reverse('search_projects'), {'q': '"('})
+        self.assertEqual(response.status_code, 200)
+
+
+class RelatedProjectsTests(PortfolioTestCase):
+    """Incremental updates keep the related index equal to a full rebuild"""
+
+    def snapshot(self):
+        links = {}
+        for link in RelatedProject.objects.all():
+            links.setdefault(link.project_id, []).append(round(link.score, 6))
+        return {pk: sorted(scores) for pk, scores in links.items()}
+
+    def test_incremental_updates_match_rebuild(self):
+        rng = random.Random(7)
+        skills = [Skill.objects.create(name=f'Skill {i}') for i in range(8)]
+        projects = make_projects(12)
+        for _ in range(40):
+            project = rng.choice(projects)
+            project.technologies.set(rng.sample(skills, rng.randint(0, 4)))
+        rng.choice(skills).delete()
+        projects[0].delete()
+
+        incremental = self.snapshot()
+        related.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_rebuild_invalidates_detail_pages_when_links_change(self):
+        python = Skill.objects.create(name='Python')
+        project, other = make_projects(2)
+        project.technologies.set([python])
+        other.technologies.set([python])
+        url = project.get_absolute_url()
+
+        response = self.client.get(url)
+        related.rebuild()  # nothing changed
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        RelatedProject.objects.all().delete()  # e.g. a stale index before a deploy-time rebuild
+        response = self.client.get(url)
+        self.assertEqual(response.context['related_projects'], [])
+        call_command('rebuild_related_projects', stdout=io.StringIO())
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['related_projects'], [other])
+
+    def test_detail_view_reads_neighbours_by_overlap(self):
+        python, django, react = (Skill.objects.create(name=name) for name in ('Python', 'Django', 'React'))
+        project, close, far, unrelated = make_projects(4)
+        project.technologies.set([python, django])
+        close.technologies.set([python, django, react])
+        far.technologies.set([python, react])
+        unrelated.technologies.set([react])
+
+        content_validators()
+        get_profile()
+        get_active_resume()
+        with self.assertNumQueries(3):
+            response = self.client.get(project.get_absolute_url())
+            self.assertEqual(response.context['related_projects'], [close, far])
+
+
+class PageCacheTests(PortfolioTestCase):
+    """Public pages are cached per content version"""
+
+    def test_repeat_views_skip_the_database(self):
+        make_projects(2)
+        for name in ('home', 'about', 'projects'):
+            first = self.client.get(reverse(name))
+            with self.assertNumQueries(0):
+                second = self.client.get(reverse(name))
+            self.assertEqual(first.content, second.content)
+
+    def test_content_changes_invalidate_pages(self):
+        project = make_projects(1)[0]
+        self.client.get(reverse('projects'))
+
+        project.title = 'Renamed project'
+        project.save()
+        self.assertContains(self.client.get(reverse('projects')), 'Renamed project')
+
+        skill = Skill.objects.create(name='Elixir', is_featured=True)
+        self.client.get(reverse('home'))
+        project.technologies.add(skill)
+        self.assertContains(self.client.get(reverse('projects')), 'Elixir')
+
+        skill.delete()
+        self.assertNotContains(self.client.get(reverse('home')), 'Elixir')
+
+    def test_query_strings_are_cached_separately(self):
+        make_projects(3)
+        self.client.get(reverse('projects'))
+        response = self.client.get(reverse('projects'), {'status': 'planned'})
+        self.assertEqual(response.context['stats']['total'], 0)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        self.client.get(reverse('about'))
+        self.assertIsNotNone(self.client.get(reverse('about')).context)
+
+
+class ConditionalGetTests(PortfolioTestCase):
+    """Pages and JSON endpoints answer 304 until their content changes"""
+
+    def setUp(self):
+        super().setUp()
+        self.project = make_projects(1)[0]
+        self.urls = [
+            reverse('home'),
+            reverse('about'),
+            reverse('projects'),
+            self.project.get_absolute_url(),
+            reverse('skills_api'),
+            reverse('search_projects') + '?q=project',
+        ]
+
+    def revalidate(self, url, response):
+        return self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+
+    def test_unchanged_content_is_not_modified(self):
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(self.revalidate(url, response).status_code, 304, url)
+
+    def test_validators_are_cheap_once_computed(self):
+        response = self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.revalidate(reverse('home'), response).status_code, 304)
+
+    def test_changes_produce_new_validators(self):
+        responses = {url: self.client.get(url) for url in self.urls}
+        self.project.title = 'Changed title'
+        self.project.save()
+
+        for url, response in responses.items():
+            # Neither the skills API nor the about page shows projects
+            expected = 304 if url in (reverse('skills_api'), reverse('about')) else 200
+            self.assertEqual(self.revalidate(url, response).status_code, expected, url)
+
+        skills = self.client.get(reverse('skills_api'))
+        Skill.objects.create(name='Rust')
+        self.assertEqual(self.revalidate(reverse('skills_api'), skills).status_code, 200)
+
+    def test_new_resume_changes_page_validators(self):
+        pages = [reverse('home'), reverse('about'), reverse('projects'), self.project.get_absolute_url()]
+        responses = {url: self.client.get(url) for url in pages}
+        Resume.objects.create(title='CV', file='raw/upload/v7/portfolio/documents/cv.pdf')
+        for url, response in responses.items():
+            # The pages link the resume with its upload token
+            self.assertEqual(self.revalidate(url, response).status_code, 200, url)
+
+    def test_deleting_a_project_changes_the_etag(self):
+        other = make_projects(1)[0]
+        response = self.client.get(reverse('projects'))
+        other.delete()
+        self.assertEqual(self.revalidate(reverse('projects'), response).status_code, 200)
+
+    def test_deleting_a_project_changes_last_modified(self):
+        other = make_projects(1)[0]
+        response = self.client.get(reverse('projects'))
+        # Last-Modified has one-second resolution
+        with mock.patch('main.cache.time.time_ns', return_value=time.time_ns() + 2 * 10**9):
+            other.delete()
+        revalidated = self.client.get(reverse('projects'), HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertNotEqual(revalidated['Last-Modified'], response['Last-Modified'])
+
+
+class SkillsApiTests(PortfolioTestCase):
+    """skills_api serves a precompressed body built once per skills version"""
+
+    def setUp(self):
+        super().setUp()
+        Skill.objects.create(name='Python', proficiency=90, category='programming', icon='fab fa-python')
+
+    def test_encodings(self):
+        url = reverse('skills_api')
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(plain.json()['skills'][0]['name'], 'Python')
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        gzipped = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+
+        refused = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(refused.has_header('Content-Encoding'))
+
+        if brotli is not None:
+            compressed = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+            self.assertEqual(compressed['Content-Encoding'], 'br')
+            self.assertEqual(brotli.decompress(compressed.content), plain.content)
+        self.assertEqual(gzipped['ETag'], plain['ETag'])
+
+    def test_body_is_built_once_per_version(self):
+        url = reverse('skills_api')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+
+        Skill.objects.create(name='Go')
+        names = [skill['name'] for skill in self.client.get(url).json()['skills']]
+        self.assertIn('Go', names)
+
+
+class SkillsTreeTests(PortfolioTestCase):
+    """One cached, category-ordered skills tree feeds about, home and the API"""
+
+    def setUp(self):
+        super().setUp()
+        Skill.objects.create(name='Docker', category='tool', proficiency=60, is_featured=True)
+        Skill.objects.create(name='Django', category='framework', proficiency=80, is_featured=True)
+        Skill.objects.create(name='Python', category='programming', proficiency=90)
+        Skill.objects.create(name='Java', category='programming', proficiency=70, is_featured=True)
+
+    def test_tree_follows_category_order_in_one_query(self):
+        with self.assertNumQueries(1):
+            tree = get_skills_by_category()
+        self.assertEqual(list(tree), ['Programming Languages', 'Frameworks', 'Tools & Technologies'])
+        self.assertEqual([skill['name'] for skill in tree['Programming Languages']], ['Python', 'Java'])
+
+        with self.assertNumQueries(0):
+            get_skills_by_category()
+            get_featured_skills()
+
+    def test_views_share_the_tree(self):
+        about = self.client.get(reverse('about'))
+        self.assertEqual(list(about.context['skills_by_category'])[0], 'Programming Languages')
+
+        home = self.client.get(reverse('home'))
+        self.assertEqual([skill['name'] for skill in home.context['featured_skills']], ['Django', 'Java', 'Docker'])
+
+        names = [skill['name'] for skill in self.client.get(reverse('skills_api')).json()['skills']]
+        self.assertEqual(names, ['Python', 'Java', 'Django', 'Docker'])
+
+    def test_skill_changes_rebuild_the_tree(self):
+        get_skills_by_category()
+        Skill.objects.filter(name='Python').get().delete()
+        self.assertEqual(
+            [skill['name'] for skill in get_skills_by_category()['Programming Languages']], ['Java']
+        )
+
+
+class ProfileCacheTests(PortfolioTestCase):
+    """The profile is loaded once per version and shared with every template"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(cloudinary.config(), 'cloud_name', 'demo')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.profile = Profile.objects.create(
+            name='Test Person', email='person@example.com', profile_image='portfolio/profile/me'
+        )
+
+    def test_profile_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            get_profile()
+        with self.assertNumQueries(0):
+            profile = get_profile()
+        self.assertEqual(profile.name, 'Test Person')
+        self.assertIn('c_fill', profile.image_url)
+        self.assertIn('portfolio/profile/me', profile.image_url)
+
+    def test_saving_invalidates_every_worker(self):
+        get_profile()
+        # Simulate another worker: only the shared version survives
+        profile_module_memo = dict(cache_module._memo)
+        self.profile.name = 'Renamed Person'
+        self.profile.save()
+        cache_module._memo.update(profile_module_memo)
+        self.assertEqual(get_profile().name, 'Renamed Person')
+
+    def test_templates_receive_the_profile(self):
+        response = self.client.get(reverse('contact'))
+        self.assertContains(response, 'mailto:person@example.com')
+        response = self.client.get(reverse('about'))
+        self.assertContains(response, get_profile().image_url)
+
+    def test_missing_profile_is_cached_too(self):
+        self.profile.delete()
+        get_profile()
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_profile())
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class TaskQueueTests(PortfolioTestCase):
+    """Background tasks are stored by enqueue() and run by the worker"""
+
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+
+        def flaky(fail=0):
+            self.calls.append(fail)
+            if len(self.calls) <= fail:
+                raise RuntimeError('boom')
+
+        queue.task(flaky, name='tests.flaky', max_attempts=3, concurrency=1, backoff=10)
+        self.addCleanup(queue._registry.pop, 'tests.flaky')
+
+    def post_contact(self):
+        return self.client.post(reverse('contact'), {
+            'name': 'Visitor',
+            'email': 'visitor@example.com',
+            'subject': 'Hello',
+            'message': 'I would like to talk about a project.',
+        })
+
+    @override_settings(TASK_WORKER=True)
+    def test_contact_view_defers_the_email(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_contact()
+        self.assertRedirects(response, reverse('contact'), fetch_redirect_response=False)
+        self.assertEqual(len(mail.outbox), 0)
+        job = Task.objects.get()
+        self.assertEqual(job.kwargs, {'message_id': ContactMessage.objects.get().pk})
+
+        call_command('run_worker', '--burst', stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Portfolio Contact: Hello')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.DONE, 1))
+
+    @override_settings(TASK_WORKER=False)
+    def test_tasks_run_inline_without_a_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_contact()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_admin_shows_waiting_tasks(self):
+        queue.enqueue('tests.flaky')
+        Task.objects.create(name='tests.flaky', run_at=timezone.now() + timedelta(hours=1))
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        response = self.client.get(reverse('admin:main_task_changelist'))
+        self.assertContains(response, '1 task(s) waiting')
+
+    def test_failures_back_off_then_dead_letter(self):
+        job = queue.enqueue('tests.flaky', fail=5)
+        worker = queue.Worker()
+        before = timezone.now()
+        with self.assertLogs('main.queue', 'WARNING'):
+            self.assertTrue(worker.run_once())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.PENDING, 1))
+        self.assertIn('RuntimeError: boom', job.last_error)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=5))
+
+        # Not due yet, so nothing is claimed
+        self.assertFalse(worker.run_once())
+
+        for attempt in (2, 3):
+            Task.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            with self.assertLogs('main.queue', 'WARNING'):
+                self.assertTrue(worker.run_once())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.DEAD, 3))
+        self.assertEqual(len(self.calls), 3)
+
+    def test_retry_succeeds(self):
+        job = queue.enqueue('tests.flaky', fail=1)
+        worker = queue.Worker()
+        with self.assertLogs('main.queue', 'WARNING'):
+            worker.run_once()
+        Task.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.DONE, 2))
+
+    def test_concurrency_limit_is_shared_by_workers(self):
+        first = queue.enqueue('tests.flaky')
+        queue.enqueue('tests.flaky')
+        self.assertEqual(queue.claim('worker-a').pk, first.pk)
+        self.assertIsNone(queue.claim('worker-b'))
+
+    def test_abandoned_tasks_are_reclaimed(self):
+        job = queue.enqueue('tests.flaky')
+        queue.claim('worker-a')
+        Task.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+        reclaimed = queue.claim('worker-b')
+        self.assertEqual((reclaimed.pk, reclaimed.locked_by, reclaimed.attempts), (job.pk, 'worker-b', 2))
+
+    def test_unknown_tasks_are_dead_lettered(self):
+        job = Task.objects.create(name='tests.missing')
+        with self.assertLogs('main.queue', 'ERROR'):
+            queue.Worker().run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.DEAD)
+        with self.assertRaises(LookupError):
+            queue.enqueue('tests.missing')
+
+
+class MediaUrlTests(PortfolioTestCase):
+    """Cloudinary URLs are built once and reused while still valid"""
+
+    def setUp(self):
+        super().setUp()
+        for name, value in [('cloud_name', 'demo'), ('api_secret', 'secret')]:
+            patcher = mock.patch.object(cloudinary.config(), name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        builder = mock.patch.object(media, 'cloudinary_url', wraps=media.cloudinary_url)
+        self.builder = builder.start()
+        self.addCleanup(builder.stop)
+
+    def test_unsigned_urls_are_built_once(self):
+        project = make_projects(1)[0]
+        project.image = 'image/upload/v1700000000/portfolio/projects/demo.jpg'
+        project.save()
+        project.refresh_from_db()
+        expected = project.image.url
+
+        self.builder.reset_mock()
+        for _ in range(5):
+            self.assertEqual(project.get_image_url(), expected)
+        self.assertEqual(self.builder.call_count, 1)
+
+    def test_new_asset_version_gets_a_new_url(self):
+        old = cloudinary.CloudinaryResource('portfolio/demo', version='1', resource_type='image')
+        new = cloudinary.CloudinaryResource('portfolio/demo', version='2', resource_type='image')
+        self.assertIn('/v1/', media.resource_url(old))
+        self.assertIn('/v2/', media.resource_url(new))
+        self.assertEqual(self.builder.call_count, 2)
+
+    def test_transformations_are_part_of_the_key(self):
+        resource = cloudinary.CloudinaryResource('portfolio/demo', resource_type='image')
+        small = media.resource_url(resource, width=100, crop='fill')
+        large = media.resource_url(resource, crop='fill', width=800)
+        self.assertNotEqual(small, large)
+        self.assertEqual(media.resource_url(resource, crop='fill', width=100), small)
+        self.assertEqual(self.builder.call_count, 2)
+
+    def test_signed_urls_expire(self):
+        resume = Resume.objects.create(file='raw/upload/v1/portfolio/documents/cv.pdf')
+        resume.refresh_from_db()
+        url = resume.get_download_url()
+        self.assertIn('/s--', url)
+        self.assertEqual(resume.get_download_url(), url)
+        self.assertEqual(self.builder.call_count, 1)
+
+        with override_settings(CLOUDINARY_SIGNED_URL_TTL=0):
+            media.clear()
+            resume.get_download_url()
+            resume.get_download_url()
+        self.assertEqual(self.builder.call_count, 3)
+
+    def test_urls_close_to_expiry_are_rebuilt(self):
+        expires_at = int(timezone.now().timestamp()) + media.EXPIRY_MARGIN // 2
+        media.build_url('portfolio/demo', expires_at=expires_at, sign_url=True)
+        media.build_url('portfolio/demo', expires_at=expires_at, sign_url=True)
+        self.assertEqual(self.builder.call_count, 2)
+
+
+class ResponsiveImageTests(PortfolioTestCase):
+    """Variant srcset data is stored on save and only read when rendering"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(cloudinary.config(), 'cloud_name', 'demo')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.project = make_projects(1)[0]
+        self.project.image = 'image/upload/v1700000000/portfolio/projects/demo.jpg'
+        self.project.save()
+
+    def test_variants_are_stored_on_save(self):
+        self.project.refresh_from_db()
+        variants = self.project.image_variants
+        self.assertEqual(set(variants), set(Project.IMAGE_VARIANTS))
+        card = variants['card']
+        self.assertEqual((card['width'], card['height']), media.IMAGE_VARIANTS['card']['size'])
+        self.assertIn('f_auto', card['src'])
+        self.assertIn('q_auto', card['src'])
+        self.assertEqual(card['srcset'].count('w,') + 1, len(media.IMAGE_VARIANTS['card']['widths']))
+        self.assertIn('h_220,q_auto,w_320/', card['srcset'])
+
+    def test_rendering_builds_no_urls(self):
+        with mock.patch.object(media, 'cloudinary_url') as builder:
+            media.clear()
+            response = self.client.get(reverse('projects'))
+        builder.assert_not_called()
+        card = self.project.image_variants['card']
+        self.assertContains(response, f'srcset="{card["srcset"]}"')
+        self.assertContains(response, 'width="640" height="440"')
+
+    def test_detail_page_uses_hero_and_og_variants(self):
+        response = self.client.get(self.project.get_absolute_url())
+        variants = self.project.image_variants
+        self.assertContains(response, f'src="{variants["hero"]["src"]}"')
+        self.assertContains(response, f'<meta property="og:image" content="{variants["og"]["src"]}">')
+
+    def test_hero_keeps_the_stored_aspect_ratio(self):
+        hero = self.project.image_variants['hero']
+        self.assertIn('c_limit,', hero['src'])
+        self.assertNotIn('h_', hero['src'])
+        url = self.project.get_absolute_url()
+        # Dimensions not measured yet: the preset size reserves the space
+        self.assertContains(self.client.get(url), 'width="1200" height="675"')
+
+        for size, attributes in (((3000, 1000), 'width="1200" height="400"'), ((800, 600), 'width="800" height="600"')):
+            self.project.image_width, self.project.image_height = size
+            self.project.save()
+            self.assertContains(self.client.get(url), attributes)
+
+    def test_rebuild_command_fills_missing_variants(self):
+        Project.objects.update(image_variants={})
+        call_command('rebuild_image_variants', stdout=io.StringIO())
+        self.project.refresh_from_db()
+        self.assertEqual(set(self.project.image_variants), set(Project.IMAGE_VARIANTS))
+
+    def test_rebuild_command_invalidates_cached_pages(self):
+        self.assertNotContains(self.client.get(reverse('projects')), 'srcset="/media/')
+        with override_settings(MEDIA_PROXY_ENABLED=True):
+            media.clear()
+            call_command('rebuild_image_variants', stdout=io.StringIO())
+            self.assertContains(self.client.get(reverse('projects')), 'srcset="/media/')
+        media.clear()
+
+    def test_projects_without_image_render_nothing(self):
+        from .templatetags.images import responsive_image
+        self.assertEqual(responsive_image(make_projects(1)[0], 'card'), '')
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local CDN stand-in: /ok/..., /missing/..., /slow/... and /get-only/..."""
+
+    def do_HEAD(self):
+        server = self.server
+        with server.lock:
+            server.hits.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        if self.path.startswith('/slow/'):
+            time.sleep(server.slow_seconds)
+        elif self.path.startswith('/busy/'):
+            time.sleep(0.05)
+        # Counted out before replying, since the client may reuse its slot
+        # as soon as the response arrives
+        with server.lock:
+            server.in_flight -= 1
+        if self.path.startswith('/missing/'):
+            status = 404
+        elif self.path.startswith('/get-only/'):
+            status = 405
+        else:
+            status = 200
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AssetHealthTests(PortfolioTestCase):
+    """Assets are checked concurrently against a local HTTP stand-in"""
+
+    def setUp(self):
+        super().setUp()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.hits = []
+        self.server.in_flight = self.server.max_in_flight = 0
+        self.server.slow_seconds = 1
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = f'http://127.0.0.1:{self.server.server_port}'
+
+    def asset(self, path):
+        return health.Asset(f'project:{path}:image', path, f'{self.base}/{path}')
+
+    def test_results_and_report(self):
+        assets = [self.asset('ok/a.jpg'), self.asset('missing/b.jpg'), self.asset('get-only/c.jpg')]
+        report = health.HealthChecker(workers=4).run(assets)
+        self.assertEqual([a['result'] for a in report['assets']], ['ok', 'failed', 'ok'])
+        self.assertEqual(report['assets'][1]['status_code'], 404)
+        self.assertEqual(report['summary'], {'ok': 2, 'failed': 1, 'unchanged': 0, 'timeout': 0})
+        self.assertFalse(report['deadline_exceeded'])
+        json.dumps(report)
+        self.assertEqual(AssetCheck.objects.filter(ok=True).count(), 2)
+
+    def test_unchanged_assets_are_skipped(self):
+        assets = [self.asset('ok/a.jpg'), self.asset('missing/b.jpg')]
+        health.HealthChecker().run(assets)
+        self.server.hits.clear()
+
+        report = health.HealthChecker().run(assets)
+        self.assertEqual([a['result'] for a in report['assets']], ['unchanged', 'failed'])
+        self.assertEqual(self.server.hits, ['/missing/b.jpg'])
+
+        # A new version of the asset has a new URL and is checked again
+        moved = health.Asset(assets[0].key, 'moved', f'{self.base}/ok/v2/a.jpg')
+        report = health.HealthChecker().run([moved])
+        self.assertEqual(report['assets'][0]['result'], 'ok')
+
+    @override_settings(MEDIA_PROXY_ENABLED=True)
+    def test_collected_urls_bypass_the_media_proxy(self):
+        media.clear()
+        project = make_projects(1)[0]
+        Project.objects.filter(pk=project.pk).update(image='image/upload/v1/portfolio/projects/p.jpg')
+        with mock.patch.object(cloudinary.config(), 'cloud_name', 'demo'):
+            assets = health.collect_assets()
+            self.assertTrue(Project.objects.get().get_image_url().startswith('/media/'))
+        self.assertEqual(len(assets), 1)
+        self.assertTrue(assets[0].url.startswith('https://res.cloudinary.com/demo/image/upload/'), assets[0].url)
+        media.clear()
+
+    def test_per_host_limit(self):
+        assets = [self.asset(f'busy/{index}.jpg') for index in range(12)]
+        report = health.HealthChecker(workers=8, per_host=2).run(assets)
+        self.assertEqual(report['summary']['ok'], 12)
+        self.assertLessEqual(self.server.max_in_flight, 2)
+
+    def test_deadline_bounds_the_run(self):
+        assets = [self.asset('slow/a.jpg'), self.asset('ok/b.jpg')]
+        start = time.monotonic()
+        report = health.HealthChecker(workers=1, deadline=0.5).run(assets)
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertTrue(report['deadline_exceeded'])
+        self.assertEqual(report['summary']['ok'], 0)
+        self.assertFalse(AssetCheck.objects.exists())
+
+    def test_command_writes_report(self):
+        project = make_projects(1)[0]
+        Project.objects.filter(pk=project.pk).update(image='image/upload/v1/portfolio/projects/a.jpg')
+        fake_url = lambda resource, **options: f'{self.base}/ok/{resource.public_id}'
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(health, 'resource_url', fake_url):
+            path = os.path.join(directory, 'report.json')
+            call_command('fix_cloudinary_images', '--report', path, stdout=io.StringIO())
+            with open(path) as f:
+                report = json.load(f)
+        self.assertEqual(report['summary']['ok'], 1)
+        self.assertEqual(report['assets'][0]['key'], f'project:{project.pk}:image')
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    """Cloudinary stand-in serving ``size`` bytes per path, with ETags"""
+
+    def do_GET(self):
+        server = self.server
+        server.hits.append(self.path)
+        if server.delay:
+            time.sleep(server.delay)
+        status = getattr(server, 'status', None)
+        if 'missing' in self.path or status:
+            self.send_response(status or 404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        etag = f'"{hashlib.md5(self.path.encode()).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        body = self.path.encode().ljust(server.size, b'.')
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the proxy gave up waiting
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MediaProxyTests(PortfolioTestCase):
+    """The media proxy reads through a bounded disk cache"""
+
+    def setUp(self):
+        super().setUp()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeUpstreamHandler)
+        self.server.daemon_threads = True
+        self.server.hits = []
+        self.server.delay = 0
+        self.server.size = 1000
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            MEDIA_PROXY_ENABLED=True,
+            MEDIA_PROXY_ROOT=directory.name,
+            MEDIA_PROXY_MAX_BYTES=2500,
+            MEDIA_PROXY_TIMEOUT=0.2,
+            MEDIA_PROXY_MAX_AGE=3600,
+            MEDIA_PROXY_UPSTREAM=f'http://127.0.0.1:{self.server.server_port}/demo/',
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get(self, path, **headers):
+        response = self.client.get(f'/media/{path}', **headers)
+        if hasattr(response, 'streaming_content'):
+            response.body = b''.join(response.streaming_content)
+        return response
+
+    def test_reads_through_and_caches(self):
+        response = self.get('image/upload/v1/a.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.body.startswith(b'/demo/image/upload/v1/a.jpg'))
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+        again = self.get('image/upload/v1/a.jpg')
+        self.assertEqual(again.body, response.body)
+        self.assertEqual(self.server.hits, ['/demo/image/upload/v1/a.jpg'])
+
+        not_modified = self.get('image/upload/v1/a.jpg', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_least_recently_used_files_are_evicted(self):
+        self.get('image/upload/v1/a.jpg')
+        self.get('image/upload/v1/b.jpg')
+        time.sleep(0.01)
+        self.get('image/upload/v1/a.jpg')  # b is now the oldest
+        self.get('image/upload/v1/c.jpg')
+        self.server.hits.clear()
+
+        self.get('image/upload/v1/a.jpg')
+        self.get('image/upload/v1/c.jpg')
+        self.assertEqual(self.server.hits, [])
+        self.get('image/upload/v1/b.jpg')
+        self.assertEqual(self.server.hits, ['/demo/image/upload/v1/b.jpg'])
+
+    def test_stale_copy_is_served_when_upstream_is_slow(self):
+        first = self.get('image/upload/unversioned.jpg')
+        self.assertEqual(first['Cache-Control'], 'public, max-age=3600')
+        self.server.delay = 0.5
+        with override_settings(MEDIA_PROXY_MAX_AGE=0), self.assertLogs('main.media_proxy', 'WARNING'):
+            start = time.monotonic()
+            response = self.get('image/upload/unversioned.jpg')
+        self.assertLess(time.monotonic() - start, 0.45)
+        self.assertEqual(response.body, first.body)
+
+    def test_stale_copy_is_revalidated(self):
+        self.get('image/upload/unversioned.jpg')
+        with override_settings(MEDIA_PROXY_MAX_AGE=0):
+            response = self.get('image/upload/unversioned.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.server.hits), 2)
+
+    def test_failed_revalidation_closes_the_cached_file(self):
+        media_proxy.fetch('image/upload/gone.jpg')[0].close()
+        opened = []
+        get = media_proxy.DiskCache.get
+
+        def tracked_get(cache, key):
+            entry = get(cache, key)
+            opened.append(entry[0])
+            return entry
+
+        self.server.status = 404  # every path, not just ones named "missing"
+        with override_settings(MEDIA_PROXY_MAX_AGE=0), \
+                mock.patch.object(media_proxy.DiskCache, 'get', tracked_get):
+            with self.assertRaises(media_proxy.UpstreamError):
+                media_proxy.fetch('image/upload/gone.jpg')
+        self.assertTrue(opened[0].closed)
+
+    def test_uncached_miss_falls_back_to_upstream(self):
+        self.server.delay = 0.5
+        response = self.get('image/upload/v1/slow.jpg')
+        self.assertRedirects(response, media_proxy.upstream_url('image/upload/v1/slow.jpg'),
+                             fetch_redirect_response=False)
+        self.server.delay = 0
+        self.assertEqual(self.get('image/upload/v1/missing.jpg').status_code, 404)
+
+    def test_only_our_delivery_paths_are_proxied(self):
+        for path in (
+            '../othercloud/image/upload/x.jpg',
+            'image/upload/../../othercloud/image/upload/x.jpg',
+            'image/upload/%2e%2e/%2e%2e/othercloud/image/upload/x.jpg',
+            'image/upload/./x.jpg',
+            'image/upload//x.jpg',
+            'image/fetch/https://example.com/x.jpg',
+            'othercloud/image/upload/x.jpg',
+        ):
+            self.assertEqual(self.get(path).status_code, 404, path)
+        self.assertEqual(self.server.hits, [])
+
+    def test_urls_point_at_the_proxy(self):
+        media.clear()
+        resource = cloudinary.CloudinaryResource('portfolio/demo', version='3', format='jpg', resource_type='image')
+        with mock.patch.object(media, 'cloudinary_url', return_value=(
+            media_proxy.upstream_url('image/upload/v3/portfolio/demo.jpg'), {}
+        )):
+            self.assertEqual(media.resource_url(resource), '/media/image/upload/v3/portfolio/demo.jpg')
+
+    def test_storage_opens_through_the_cache(self):
+        storage = media_proxy.MediaProxyStorage()
+        with mock.patch.object(storage, '_get_url', return_value=media_proxy.upstream_url('image/upload/v1/s.jpg')):
+            for _ in range(2):
+                with storage.open('s.jpg') as f:
+                    self.assertTrue(f.read().startswith(b'/demo/image/upload/v1/s.jpg'))
+        self.assertEqual(len(self.server.hits), 1)
+
+
+def make_jpeg(width, height, color=(200, 40, 40)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class ImagePlaceholderTests(PortfolioTestCase):
+    """Sizes and blurred previews are stored once per image"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(cloudinary.config(), 'cloud_name', 'demo')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_measure(self):
+        width, height, placeholder = placeholders.measure(io.BytesIO(make_jpeg(320, 200)))
+        self.assertEqual((width, height), (320, 200))
+        prefix = 'data:image/webp;base64,'
+        self.assertTrue(placeholder.startswith(prefix))
+        preview = Image.open(io.BytesIO(base64.b64decode(placeholder[len(prefix):])))
+        self.assertEqual(preview.size, (16, 10))
+        self.assertLess(len(placeholder), 400)
+
+    def test_uploads_are_measured_before_upload(self):
+        uploaded = []
+
+        def upload_resource(file, **options):
+            uploaded.append(file.read())
+            return cloudinary.CloudinaryResource('portfolio/projects/up', version='5', format='jpg',
+                                                 type='upload', resource_type='image')
+
+        content = make_jpeg(640, 480)
+        project = make_projects(1)[0]
+        project.image = SimpleUploadedFile('up.jpg', content, content_type='image/jpeg')
+        with mock.patch('cloudinary.uploader.upload_resource', upload_resource):
+            project.save()
+
+        self.assertEqual(uploaded, [content])
+        project.refresh_from_db()
+        self.assertEqual((project.image_width, project.image_height), (640, 480))
+        self.assertTrue(project.image_placeholder.startswith('data:image/webp'))
+        self.assertFalse(Task.objects.exists())
+
+    def test_public_ids_are_measured_by_the_worker(self):
+        project = make_projects(1)[0]
+        project.image = 'image/upload/v1/portfolio/projects/existing.jpg'
+        project.save()
+        job = Task.objects.get()
+        self.assertEqual(job.kwargs, {'model': 'main.project', 'pk': str(project.pk)})
+
+        with mock.patch('main.tasks.measure_url', return_value=(800, 600, 'data:image/webp;base64,AAAA')) as measure:
+            queue.Worker().run_once()
+        project.refresh_from_db()
+        measure.assert_called_once_with(project.image.url)
+        self.assertEqual((project.image_width, project.image_height), (800, 600))
+        response = self.client.get(reverse('projects'))
+        self.assertContains(response, 'background: url(data:image/webp;base64,AAAA) center / cover no-repeat')
+
+    def test_backfill_command(self):
+        project = make_projects(1)[0]
+        Project.objects.filter(pk=project.pk).update(image='image/upload/v1/portfolio/projects/old.jpg')
+        command = 'main.management.commands.backfill_image_placeholders.measure_url'
+        with mock.patch(command, return_value=(100, 50, 'data:image/webp;base64,BBBB')):
+            call_command('backfill_image_placeholders', '--workers', '2', stdout=io.StringIO())
+        project.refresh_from_db()
+        self.assertEqual((project.image_width, project.image_height, project.image_placeholder),
+                         (100, 50, 'data:image/webp;base64,BBBB'))
+
+
+class MediaMigrationTests(PortfolioTestCase):
+    """Local media is uploaded in parallel and the run can be resumed"""
+
+    def setUp(self):
+        super().setUp()
+        for name, value in (('cloud_name', 'demo'), ('api_key', 'key'), ('api_secret', 'secret')):
+            patcher = mock.patch.object(cloudinary.config(), name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.source = os.path.join(directory.name, 'media')
+        self.manifest = os.path.join(directory.name, 'manifest.json')
+        os.makedirs(os.path.join(self.source, 'projects'))
+        os.makedirs(os.path.join(self.source, 'documents'))
+
+        self.projects = make_projects(3)
+        for i, project in enumerate(self.projects):
+            with open(os.path.join(self.source, 'projects', f'p{i}.jpg'), 'wb') as f:
+                f.write(make_jpeg(320, 160))
+            Project.objects.filter(pk=project.pk).update(image=f'projects/p{i}.jpg')
+        with open(os.path.join(self.source, 'documents', 'cv.pdf'), 'wb') as f:
+            f.write(b'%PDF-1.4 resume')
+        self.resume = Resume.objects.create(title='CV', file='documents/cv.pdf')
+        # Already on Cloudinary, left alone
+        done = Project.objects.create(title='Done', short_description='-', description='-')
+        Project.objects.filter(pk=done.pk).update(image='image/upload/v2/portfolio/projects/done.jpg')
+
+    def fake_upload(self, path, folder, resource_type, **options):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if resource_type == 'raw':
+            return {'public_id': f'{folder}/{os.path.basename(path)}', 'version': 7,
+                    'type': 'upload', 'resource_type': 'raw'}
+        return {'public_id': f'{folder}/{name}', 'version': 7, 'format': 'jpg',
+                'type': 'upload', 'resource_type': 'image'}
+
+    def migrate(self, *args):
+        call_command('migrate_to_cloudinary', '--source', self.source, '--manifest', self.manifest,
+                     '--workers', '3', *args, stdout=io.StringIO())
+
+    def test_uploads_and_updates_rows(self):
+        with mock.patch('cloudinary.uploader.upload', side_effect=self.fake_upload) as upload:
+            self.migrate()
+        self.assertEqual(upload.call_count, 4)
+
+        project = Project.objects.get(pk=self.projects[1].pk)
+        self.assertEqual(project.image.public_id, 'portfolio/projects/p1')
+        self.assertEqual(str(project.image.version), '7')
+        self.assertEqual((project.image_width, project.image_height), (320, 160))
+        self.assertTrue(project.image_placeholder.startswith('data:image/webp'))
+        self.assertIn('/v7/portfolio/projects/p1', project.image_variants['card']['src'])
+        self.resume.refresh_from_db()
+        self.assertTrue(self.resume.get_download_url().endswith('/v7/portfolio/documents/cv.pdf'))
+
+        with open(self.manifest) as f:
+            entries = json.load(f)['items']
+        self.assertEqual(entries[f'main.project:{project.pk}:image']['old'], 'projects/p1.jpg')
+
+        # A second run finds nothing left to upload
+        with mock.patch('cloudinary.uploader.upload') as upload:
+            self.migrate()
+        upload.assert_not_called()
+
+    def test_migrated_resume_replaces_the_memoized_one(self):
+        self.assertEqual(get_active_resume().file.public_id, 'documents/cv')
+        with mock.patch('cloudinary.uploader.upload', side_effect=self.fake_upload):
+            self.migrate()
+        resume = get_active_resume()
+        self.assertTrue(resume.get_download_url().endswith('/v7/portfolio/documents/cv.pdf'))
+
+    def test_resumes_after_a_crash(self):
+        def flaky(path, **options):
+            if path.endswith('p2.jpg'):
+                raise ConnectionError('connection reset')
+            return self.fake_upload(path, **options)
+
+        with mock.patch('cloudinary.uploader.upload', side_effect=flaky):
+            with self.assertRaises(CommandError):
+                self.migrate()
+        self.assertEqual(Project.objects.get(pk=self.projects[2].pk).image.public_id, 'projects/p2')
+
+        # Rows of finished uploads are reverted, as if the process died before writing them
+        Project.objects.filter(pk=self.projects[0].pk).update(image='projects/p0.jpg')
+        with mock.patch('cloudinary.uploader.upload', side_effect=self.fake_upload) as upload:
+            self.migrate()
+        self.assertEqual([c.args[0] for c in upload.call_args_list],
+                         [os.path.join(self.source, 'projects', 'p2.jpg')])
+        for project in Project.objects.filter(pk__in=[p.pk for p in self.projects]):
+            self.assertEqual(str(project.image.version), '7')
+
+    def test_dry_run(self):
+        out = io.StringIO()
+        with mock.patch('cloudinary.uploader.upload') as upload:
+            call_command('migrate_to_cloudinary', '--source', self.source, '--manifest', self.manifest,
+                         '--dry-run', stdout=out)
+        upload.assert_not_called()
+        self.assertIn('4 files to upload', out.getvalue())
+        self.assertIn('Estimated time', out.getvalue())
+        self.assertFalse(os.path.exists(self.manifest))
+        items, missing = media_migration.find_items(self.source)
+        self.assertEqual(len(items), 4)
+        self.assertEqual(missing, [])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class AdminChangelistTests(PortfolioTestCase):
+    """Changelists run a fixed number of queries and reuse stored URLs"""
+
+    def setUp(self):
+        super().setUp()
+        for name, value in (('cloud_name', 'demo'), ('api_secret', 'secret')):
+            patcher = mock.patch.object(cloudinary.config(), name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.skills = [Skill.objects.create(name=f'Skill {i}', category='backend') for i in range(3)]
+
+    def add_projects(self, count):
+        for project in make_projects(count, self.skills):
+            project.image = f'image/upload/v1/portfolio/projects/p{project.pk}.jpg'
+            project.save()
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_project_changelist_queries_do_not_grow_with_rows(self):
+        url = reverse('admin:main_project_changelist')
+        self.add_projects(3)
+        few = self.changelist_queries(url)
+        self.add_projects(20)
+        self.assertEqual(self.changelist_queries(url), few)
+
+    def test_project_changelist_uses_thumbnails_and_counts(self):
+        self.add_projects(1)
+        response = self.client.get(reverse('admin:main_project_changelist'))
+        self.assertContains(response, 'w_60/v1/portfolio/projects/')
+        self.assertContains(response, 'sizes="60px"')
+        self.assertContains(response, '<td class="field-tech_count">3</td>', html=True)
+        self.assertNotContains(response, 'field-image_url_debug')
+        response = self.client.get(reverse('admin:main_project_changelist'), {'o': '5'})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ADMIN_DEBUG_COLUMNS=True)
+    def test_debug_columns_are_opt_in(self):
+        self.add_projects(1)
+        Resume.objects.create(title='CV', file='raw/upload/v3/portfolio/documents/cv.pdf')
+        self.assertContains(self.client.get(reverse('admin:main_project_changelist')), 'field-image_url_debug')
+        self.assertContains(self.client.get(reverse('admin:main_resume_changelist')), 'field-file_info_debug')
+
+    def test_editable_columns_can_be_turned_off(self):
+        self.add_projects(2)
+        url = reverse('admin:main_project_changelist')
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['cl'].formset.forms), 2)
+        self.assertContains(response, 'name="form-0-status"')
+        with override_settings(ADMIN_LIST_EDITABLE=False):
+            response = self.client.get(url)
+        self.assertIsNone(response.context['cl'].formset)
+        self.assertNotContains(response, 'name="form-0-status"')
+
+    def test_resume_links_are_signed_once(self):
+        for i in range(5):
+            Resume.objects.create(title=f'CV {i}', file=f'raw/upload/v3/portfolio/documents/cv{i}.pdf')
+        url = reverse('admin:main_resume_changelist')
+        with mock.patch('main.media.cloudinary_url', wraps=media.cloudinary_url) as build:
+            self.assertContains(self.client.get(url), 'fl_attachment', count=5)
+            self.assertEqual(build.call_count, 10)
+            self.client.get(url)
+            self.assertEqual(build.call_count, 10)
+
+
+class ResumeDownloadTests(PortfolioTestCase):
+    """The active resume is served from our origin with range and cache support"""
+
+    def setUp(self):
+        super().setUp()
+        for name, value in (('cloud_name', 'demo'), ('api_secret', 'secret')):
+            patcher = mock.patch.object(cloudinary.config(), name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeUpstreamHandler)
+        self.server.daemon_threads = True
+        self.server.hits = []
+        self.server.delay = 0
+        self.server.size = 1000
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            MEDIA_PROXY_ROOT=directory.name,
+            MEDIA_PROXY_UPSTREAM=f'http://127.0.0.1:{self.server.server_port}/demo/',
+            RESUME_MAX_AGE=600,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.resume = Resume.objects.create(title='CV', file='raw/upload/v3/portfolio/documents/cv.pdf')
+        self.resume.refresh_from_db()
+        self.url = reverse('download_resume')
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.url, **headers)
+        if hasattr(response, 'streaming_content'):
+            response.body = b''.join(response.streaming_content)
+        return response
+
+    def test_streams_the_active_resume(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.body), 1000)
+        self.assertTrue(response.body.startswith(b'/demo/raw/upload/v3/portfolio/documents/cv.pdf'))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="cv.pdf"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=600')
+
+        self.get()
+        self.assertEqual(len(self.server.hits), 1)
+
+    def test_lookup_is_cached(self):
+        self.get()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get().status_code, 200)
+        Resume.objects.create(title='New CV', file='raw/upload/v4/portfolio/documents/new.pdf')
+        self.assertEqual(self.get()['Content-Disposition'], 'attachment; filename="new.pdf"')
+
+    def test_versioned_link_is_immutable(self):
+        page = self.client.get(reverse('about'))
+        token = resume_module.upload_token(self.resume)
+        self.assertContains(page, f'href="{self.url}?v={token}"')
+        response = self.get(f'{self.url}?v={token}')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['ETag'], f'"{token}"')
+        not_modified = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_ranges(self):
+        etag = self.get()['ETag']
+        partial = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], 'bytes 10-19/1000')
+        self.assertEqual(partial.body, b'/demo/raw/upload/v3/portfolio/documents/cv.pdf'.ljust(1000, b'.')[10:20])
+
+        self.assertEqual(self.get(HTTP_RANGE='bytes=-100').body, b'.' * 100)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=990-').body, b'.' * 10)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=5-5, 10-20').status_code, 200)
+        unsatisfiable = self.get(HTTP_RANGE='bytes=1000-')
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable['Content-Range'], 'bytes */1000')
+
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"').status_code, 200)
+
+    def test_redirect_mode_and_fallback(self):
+        with override_settings(RESUME_DELIVERY='redirect'):
+            response = self.get()
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/raw/upload/s--', response['Location'])
+        self.assertEqual(self.server.hits, [])
+
+        Resume.objects.create(title='Gone', file='raw/upload/v5/portfolio/documents/missing.pdf')
+        with self.assertLogs('main.views', 'WARNING'):
+            response = self.get()
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('fl_attachment', response['Location'])
+
+    def test_no_resume(self):
+        Resume.objects.all().delete()
+        self.assertEqual(self.get().status_code, 404)
+
+
+class BackupTests(PortfolioTestCase):
+    """Backups stream every table into gzipped NDJSON with a checksum manifest"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        python = Skill.objects.create(name='Python', category='programming')
+        self.project = make_projects(1, [python])[0]
+        Project.objects.filter(pk=self.project.pk).update(image='image/upload/v1/portfolio/projects/p.jpg')
+        Resume.objects.create(title='CV', file='raw/upload/v3/portfolio/documents/cv.pdf')
+        ContactMessage.objects.create(name='A', email='a@example.com', subject='Hi', message='Hello "quoted"')
+
+    def backup(self, *args):
+        call_command('backup_data', '--output', self.root, *args, stdout=io.StringIO())
+        newest = max(os.listdir(self.root))
+        directory = os.path.join(self.root, newest)
+        manifest = backup.read_manifest(directory)
+        return directory, manifest, {
+            name: list(backup.read_table(directory, entry)) for name, entry in manifest['tables'].items()
+        }
+
+    def test_full_backup(self):
+        directory, manifest, tables = self.backup()
+        self.assertEqual(set(tables), {table.name for table in backup.TABLES})
+        self.assertEqual(manifest['tables']['messages']['rows'], 1)
+        self.assertEqual(tables['messages'][0]['message'], 'Hello "quoted"')
+        self.assertEqual(tables['projects'][0]['id'], str(self.project.pk))
+        self.assertEqual(tables['projects'][0]['image'], 'image/upload/v1/portfolio/projects/p.jpg')
+        self.assertEqual(tables['resumes'][0]['file'], 'raw/upload/v3/portfolio/documents/cv.pdf')
+        self.assertEqual(tables['project_technologies'], [{'project': str(self.project.pk), 'skill': 'Python'}])
+        with gzip.open(os.path.join(directory, 'messages.ndjson.gz'), 'rt') as f:
+            self.assertEqual(len(f.read().splitlines()), 1)
+
+    def test_corrupt_backups_are_rejected(self):
+        directory, manifest, tables = self.backup()
+        with open(os.path.join(directory, 'skills.ndjson.gz'), 'ab') as f:
+            f.write(b'x')
+        with self.assertRaisesMessage(backup.BackupError, 'Checksum mismatch for skills.ndjson.gz'):
+            backup.read_manifest(directory)
+        os.unlink(os.path.join(directory, 'manifest.json'))
+        with self.assertRaises(backup.BackupError):
+            backup.read_manifest(directory)
+
+    def test_incremental_backup(self):
+        self.backup()
+        yesterday = timezone.now() - timedelta(days=1)
+        ContactMessage.objects.update(created_at=yesterday, updated_at=yesterday)
+        Project.objects.update(updated_at=yesterday)
+        Skill.objects.update(created_at=yesterday, updated_at=yesterday)
+        Resume.objects.update(uploaded_at=yesterday, updated_at=yesterday)
+        ContactMessage.objects.create(name='B', email='b@example.com', subject='New', message='Later')
+
+        _, manifest, tables = self.backup('--since', 'last')
+        self.assertIsNotNone(manifest['since'])
+        self.assertEqual([row['name'] for row in tables['messages']], ['B'])
+        self.assertEqual(tables['projects'], [])
+        self.assertEqual(tables['project_technologies'], [])
+        self.assertEqual(tables['skills'], [])
+        self.assertEqual(tables['resumes'], [])
+
+        # Edits to older rows are picked up too
+        message = ContactMessage.objects.get(name='A')
+        message.is_read = True
+        message.save()
+        skill = Skill.objects.get()
+        skill.proficiency = 90
+        skill.save()
+        resume = Resume.objects.get()
+        resume.is_active = False
+        resume.save()
+        _, _, tables = self.backup('--since', 'last')
+        self.assertEqual([(row['name'], row['is_read']) for row in tables['messages']], [('A', True)])
+        self.assertEqual([row['proficiency'] for row in tables['skills']], [90])
+        self.assertEqual([row['is_active'] for row in tables['resumes']], [False])
+
+        _, _, tables = self.backup('--since', (timezone.now() - timedelta(days=2)).date().isoformat())
+        self.assertEqual(len(tables['messages']), 2)
+        self.assertEqual(len(tables['project_technologies']), 1)
+
+    def restore(self, directory):
+        call_command('restore_data', directory, '--batch-size', '2', stdout=io.StringIO())
+
+    def test_restore_round_trip(self):
+        make_projects(4, Skill.objects.all())
+        Skill.objects.create(name='Django', category='framework')
+        project = Project.objects.get(pk=self.project.pk)
+        directory, _, _ = self.backup()
+
+        for model in (ContactMessage, Resume, Project, Skill, Profile):
+            model.objects.all().delete()
+        # Skills are matched by name, whatever their ids in the new database
+        Skill.objects.create(name='Django', category='other')
+        self.restore(directory)
+
+        self.assertEqual(Project.objects.count(), 5)
+        restored = Project.objects.get(pk=project.pk)
+        self.assertEqual(restored.updated_at, project.updated_at)
+        self.assertEqual(restored.image.public_id, 'portfolio/projects/p')
+        self.assertEqual(list(restored.technologies.values_list('name', flat=True)), ['Python'])
+        self.assertEqual(Skill.objects.get(name='Django').category, 'framework')
+        self.assertEqual(Skill.objects.count(), 2)
+        self.assertEqual(ContactMessage.objects.get().message, 'Hello "quoted"')
+        self.assertEqual(Resume.objects.get().file.public_id, 'portfolio/documents/cv')
+        self.assertIn(restored, search_queryset(Project.objects.all(), 'Python'))
+        # Sequences moved past restored ids
+        ContactMessage.objects.create(name='C', email='c@example.com', subject='After', message='restore')
+
+    def test_incremental_restore_replaces_technologies(self):
+        directory, _, _ = self.backup()
+        self.project.technologies.set([Skill.objects.create(name='Rust', category='programming')])
+        ContactMessage.objects.all().delete()
+        self.restore(directory)
+        self.assertEqual(list(self.project.technologies.values_list('name', flat=True)), ['Python'])
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.restore(directory)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_restore_fills_timestamps_missing_from_older_backups(self):
+        directory, _, _ = self.backup()
+        # As written before messages had updated_at
+        path = os.path.join(directory, 'messages.ndjson.gz')
+        rows = list(backup.read_table(directory, backup.read_manifest(directory)['tables']['messages']))
+        for row in rows:
+            del row['updated_at']
+        backup.write_table(path, rows)
+        with open(os.path.join(directory, 'manifest.json')) as f:
+            manifest = json.load(f)
+        manifest['tables']['messages'].update(bytes=os.path.getsize(path), sha256=backup.file_checksum(path))
+        with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        ContactMessage.objects.all().delete()
+        self.restore(directory)
+        self.assertIsNotNone(ContactMessage.objects.get().updated_at)
+
+    def test_restore_rejects_corrupt_backup(self):
+        directory, _, _ = self.backup()
+        with open(os.path.join(directory, 'messages.ndjson.gz'), 'ab') as f:
+            f.write(b'x')
+        with self.assertRaisesMessage(CommandError, 'Checksum mismatch'):
+            self.restore(directory)
+
+
+class SeedTests(PortfolioTestCase):
+    """Seed files are applied as one bulk diff"""
+
+    def populate(self, *args):
+        out = io.StringIO()
+        call_command('populate_data', *args, stdout=out)
+        return out.getvalue()
+
+    def test_populate_is_idempotent(self):
+        self.populate()
+        self.assertEqual(Skill.objects.filter(name='Python').count(), 1)
+        chatbot = Project.objects.get(title='Veronica AI Chatbot')
+        self.assertEqual(sorted(chatbot.technologies.values_list('name', flat=True)), ['NLP', 'Python', 'TensorFlow'])
+        self.assertEqual(Skill.objects.get(name='NLP').category, 'other')
+        self.assertEqual(Profile.objects.get().location, 'India')
+        self.assertIn(chatbot, search_queryset(Project.objects.all(), 'tensorflow'))
+        counts = (Skill.objects.count(), Project.objects.count(), Project.technologies.through.objects.count())
+
+        version = cache_module.get_content_version()
+        with self.assertNumQueries(5):
+            output = self.populate()
+        self.assertIn('already up to date', output)
+        self.assertEqual(cache_module.get_content_version(), version)
+        self.assertEqual(counts, (Skill.objects.count(), Project.objects.count(),
+                                  Project.technologies.through.objects.count()))
+
+    def test_admin_edits_survive_unless_updating(self):
+        self.populate()
+        Skill.objects.filter(name='Python').update(proficiency=99)
+        self.populate()
+        self.assertEqual(Skill.objects.get(name='Python').proficiency, 99)
+
+        output = self.populate('--update', '--dry-run')
+        self.assertIn("~ skills: Python: proficiency 99 -> 85", output)
+        self.assertEqual(Skill.objects.get(name='Python').proficiency, 99)
+        self.populate('--update')
+        self.assertEqual(Skill.objects.get(name='Python').proficiency, 85)
+
+    def test_dry_run_writes_nothing(self):
+        output = self.populate('--dry-run')
+        self.assertIn('+ projects: IoT Energy Meter', output)
+        self.assertIn('+ technology: IoT Energy Meter -> Arduino', output)
+        self.assertFalse(Skill.objects.exists())
+
+    def test_update_skills_from_csv(self):
+        Skill.objects.create(name='Python', category='programming', proficiency=50)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'skills.csv')
+            with open(path, 'w') as f:
+                f.write('name,proficiency,is_featured\nPython,90,true\nRust,40,false\n')
+            call_command('update_skills', path, stdout=io.StringIO())
+        self.assertEqual(Skill.objects.get(name='Python').proficiency, 90)
+        self.assertTrue(Skill.objects.get(name='Python').is_featured)
+        self.assertEqual(Skill.objects.get(name='Rust').proficiency, 40)
+
+        call_command('update_skills', '--skill', 'Rust', '--proficiency', '45', stdout=io.StringIO())
+        self.assertEqual(Skill.objects.get(name='Rust').proficiency, 45)
+
+    def test_unknown_fields_are_rejected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'skills.csv')
+            with open(path, 'w') as f:
+                f.write('name,level\nPython,90\n')
+            with self.assertRaisesMessage(CommandError, "Skill has no field 'level'"):
+                call_command('update_skills', path, stdout=io.StringIO())
+
+
+class MessageArchiveTests(PortfolioTestCase):
+    """Old read messages move to daily archive files and an index"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        now = timezone.now()
+        self.old = [
+            self.message(f'Old {i}', now - timedelta(days=200 + i % 3), is_read=True) for i in range(7)
+        ]
+        self.unread = self.message('Unread', now - timedelta(days=300), is_read=False)
+        self.recent = self.message('Recent', now - timedelta(days=10), is_read=True)
+
+    def message(self, subject, created_at, is_read):
+        return ContactMessage.objects.create(
+            name='Visitor', email='visitor@example.com', subject=subject,
+            message=f'Body of {subject}', is_read=is_read, created_at=created_at,
+        )
+
+    def archive(self, *args):
+        out = io.StringIO()
+        call_command('archive_messages', '--output', self.root, '--days', '180', *args, stdout=out)
+        return out.getvalue()
+
+    @override_settings(MESSAGE_ARCHIVE_ROOT='')
+    def test_refuses_to_run_without_an_archive_root(self):
+        with self.assertRaisesMessage(CommandError, 'MESSAGE_ARCHIVE_ROOT is not set'):
+            call_command('archive_messages', stdout=io.StringIO())
+        self.assertEqual(ContactMessage.objects.count(), 9)
+        out = io.StringIO()
+        call_command('archive_messages', '--dry-run', stdout=out)
+        self.assertIn('Dry run: 7 read messages', out.getvalue())
+
+    def test_moves_old_read_messages_in_chunks(self):
+        output = self.archive('--chunk-size', '3')
+        self.assertIn('Archived 7 messages', output)
+        self.assertEqual(output.count('archived so far'), 3)
+        self.assertEqual(set(ContactMessage.objects.all()), {self.unread, self.recent})
+
+        entries = ArchivedMessage.objects.all()
+        self.assertEqual({entry.message_id for entry in entries}, {message.pk for message in self.old})
+        files = {entry.archive for entry in entries}
+        self.assertEqual(files, {archive.partition(message.created_at) for message in self.old})
+        self.assertEqual(len(files), 3)
+        for message in self.old:
+            entry = ArchivedMessage.objects.get(message_id=message.pk)
+            self.assertTrue(entry.archive.startswith(f'messages/{message.created_at:%Y/%m/%Y-%m-%d}'))
+            row = archive.read_archived(self.root, entry)
+            self.assertEqual(row['message'], message.message)
+            self.assertEqual(row['created_at'], message.created_at.isoformat())
+
+    def test_later_runs_append_to_day_files(self):
+        self.archive()
+        self.recent.created_at = self.old[0].created_at
+        self.recent.save()
+        self.archive()
+        entry = ArchivedMessage.objects.get(message_id=self.recent.pk)
+        self.assertEqual(entry.archive, archive.partition(self.old[0].created_at))
+        self.assertEqual(archive.read_archived(self.root, entry)['subject'], 'Recent')
+        first = ArchivedMessage.objects.get(message_id=self.old[0].pk)
+        self.assertEqual(archive.read_archived(self.root, first)['subject'], 'Old 0')
+        self.assertIn('Archived 0 messages', self.archive())
+
+    def test_dry_run_changes_nothing(self):
+        output = self.archive('--dry-run')
+        self.assertIn('7 read messages', output)
+        self.assertEqual(ContactMessage.objects.count(), 9)
+        self.assertFalse(ArchivedMessage.objects.exists())
+        self.assertEqual(os.listdir(self.root), [])
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_admin_lists_the_index_without_reading_files(self):
+        self.archive()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        url = reverse('admin:main_archivedmessage_changelist')
+        with override_settings(MESSAGE_ARCHIVE_ROOT=self.root), \
+                mock.patch('main.admin.read_archived', wraps=archive.read_archived) as read:
+            response = self.client.get(url, {'q': 'Old 1'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(list(response.context['cl'].result_list), [ArchivedMessage.objects.get(subject='Old 1')])
+            read.assert_not_called()
+
+            entry = ArchivedMessage.objects.get(subject='Old 2')
+            response = self.client.get(reverse('admin:main_archivedmessage_change', args=[entry.pk]))
+            self.assertContains(response, 'Body of Old 2')
+            read.assert_called_once()
@@ -12,4 +12,5 @@ urlpatterns = [
     path('resume/download/', views.download_resume, name='download_resume'),
     path('api/skills/', views.skills_api, name='skills_api'),
     path('api/search-projects/', views.search_projects, name='search_projects'),
+    path('media/<path:path>', views.media_proxy, name='media_proxy'),
 ]
@@ -1,74 +1,119 @@
 # main/views.py - Fixed version for Cloudinary
-import requests
-from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse, Http404
+from django.shortcuts import render, redirect
+from django.http import FileResponse, HttpResponseNotModified, Http404
 from django.contrib import messages
-from django.core.mail import send_mail
 from django.conf import settings
+from django.utils.http import content_disposition_header
+from django.utils.decorators import method_decorator
 from django.views.generic import DetailView
-from django.db.models import Q
-from .models import Project, Skill, Resume, ContactMessage, Profile
+from django.db import transaction
+from django.db.models import Q, Count, Exists, OuterRef
+from .models import Project, Skill, ContactMessage, RelatedProject
+from .cache import (
+    conditional, content_cached, content_validators, precompressed_json, precompressed_response,
+)
 from .forms import ContactForm
+from . import media_proxy as proxy
+from . import resume
+from .http import ranged_file_response
+from .pagination import KeysetPaginator
+from .queue import enqueue
+from .search import search_queryset
+from .skills import find_skill, get_featured_skills, get_skills_by_category, get_skills_payload
+from .tasks import send_contact_notification
+import logging
 import mimetypes
 
+logger = logging.getLogger(__name__)
+
+PROJECTS_PER_PAGE = 12
+SEARCH_RESULTS_PER_PAGE = 5
+SEARCH_RESULTS_MAX_PER_PAGE = 20
+
+
+def _cursor_query(request, cursor):
+    """Current query string with the pagination cursor replaced"""
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return params.urlencode()
+
+
+@conditional('profile', 'projects', 'skills', 'resume')
+@content_cached
 def home(request):
     """Home page with featured projects and skills"""
-    profile = Profile.objects.first()
     featured_projects = Project.objects.filter(is_featured=True)[:6]
-    featured_skills = Skill.objects.filter(is_featured=True)[:8]
+    featured_skills = get_featured_skills(limit=8)
 
     context = {
-        'profile': profile,
         'featured_projects': featured_projects,
         'featured_skills': featured_skills,
     }
     return render(request, 'main/home.html', context)
 
+@conditional('profile', 'skills', 'resume')
+@content_cached
 def about(request):
     """About page with detailed information"""
-    profile = Profile.objects.first()
-    skills_by_category = {}
-
-    for skill in Skill.objects.all():
-        category = skill.get_category_display()
-        if category not in skills_by_category:
-            skills_by_category[category] = []
-        skills_by_category[category].append(skill)
+    skills_by_category = get_skills_by_category()
 
     context = {
-        'profile': profile,
         'skills_by_category': skills_by_category,
     }
     return render(request, 'main/about.html', context)
 
+@conditional('profile', 'projects', 'skills', 'resume')
+@content_cached
 def projects(request):
     """Projects listing page with search and filter"""
     projects_list = Project.objects.all()
 
-    # Search functionality
+    # Search functionality (full-text index, ranked by relevance)
     search_query = request.GET.get('search')
+    ordering = None
     if search_query:
-        projects_list = projects_list.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(technologies__name__icontains=search_query)
-        ).distinct()
+        projects_list = search_queryset(projects_list, search_query)
+        ordering = ['-search_rank', *Project._meta.ordering]
 
     # Filter by technology
     tech_filter = request.GET.get('tech')
     if tech_filter:
-        projects_list = projects_list.filter(technologies__name__iexact=tech_filter)
+        # Matched against the cached skills so the query joins on the
+        # indexed skill id rather than comparing names case-insensitively
+        skill = find_skill(tech_filter)
+        if skill is None:
+            projects_list = projects_list.none()
+        else:
+            projects_list = projects_list.filter(technologies=skill['id'])
 
     # Filter by status
     status_filter = request.GET.get('status')
     if status_filter:
         projects_list = projects_list.filter(status=status_filter)
 
-    # Get all technologies for filter dropdown
-    all_technologies = Skill.objects.filter(projects__isnull=False).distinct()
+    # One aggregate query for the result/status counters instead of
+    # re-counting the queryset in the template
+    stats = projects_list.aggregate(
+        total=Count('pk', distinct=True),
+        completed=Count('pk', distinct=True, filter=Q(status='completed')),
+        in_progress=Count('pk', distinct=True, filter=Q(status='in_progress')),
+    )
+
+    # Prefetch technologies so each card does not query its own tags
+    projects_list = projects_list.prefetch_related('technologies')
+    page = KeysetPaginator(projects_list, PROJECTS_PER_PAGE, ordering).page(request.GET.get('cursor'))
+
+    # Get all technologies for filter dropdown (evaluated once)
+    all_technologies = list(
+        Skill.objects.filter(Exists(Project.technologies.through.objects.filter(skill=OuterRef('pk'))))
+    )
 
     context = {
-        'projects': projects_list,
+        'projects': page.object_list,
+        'page': page,
+        'next_query': _cursor_query(request, page.next_cursor) if page.has_next else None,
+        'prev_query': _cursor_query(request, page.prev_cursor) if page.has_previous else None,
+        'stats': stats,
         'all_technologies': all_technologies,
         'search_query': search_query,
         'current_tech': tech_filter,
@@ -76,19 +121,18 @@ def projects(request):
     }
     return render(request, 'main/projects.html', context)
 
+@method_decorator(conditional('profile', 'projects', 'skills', 'resume'), name='dispatch')
 class ProjectDetailView(DetailView):
     """Detailed view for individual projects"""
-    model = Project
+    queryset = Project.objects.prefetch_related('technologies')
     template_name = 'main/project_detail.html'
     context_object_name = 'project'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get related projects (same technologies)
-        related_projects = Project.objects.filter(
-            technologies__in=self.object.technologies.all()
-        ).exclude(pk=self.object.pk).distinct()[:3]
-        context['related_projects'] = related_projects
+        # Related projects come precomputed from main.related, best first
+        links = RelatedProject.objects.filter(project=self.object).select_related('related')[:3]
+        context['related_projects'] = [link.related for link in links]
         return context
 
 def contact(request):
@@ -96,82 +140,136 @@ def contact(request):
     if request.method == 'POST':
         form = ContactForm(request.POST)
         if form.is_valid():
-            # Save the contact message
-            contact_message = ContactMessage.objects.create(
-                name=form.cleaned_data['name'],
-                email=form.cleaned_data['email'],
-                subject=form.cleaned_data['subject'],
-                message=form.cleaned_data['message']
-            )
-
-            # Send email notification
-            try:
-                send_mail(
-                    subject=f"Portfolio Contact: {form.cleaned_data['subject']}",
-                    message=f"""
-                    New message from your portfolio:
-
-                    Name: {form.cleaned_data['name']}
-                    Email: {form.cleaned_data['email']}
-                    Subject: {form.cleaned_data['subject']}
-
-                    Message:
-                    {form.cleaned_data['message']}
-                    """,
-                    from_email=settings.EMAIL_HOST_USER,
-                    recipient_list=[settings.EMAIL_HOST_USER],
-                    fail_silently=False,
+            # Save the message and leave the email to the worker, so a
+            # slow SMTP server never holds up the response
+            with transaction.atomic():
+                contact_message = ContactMessage.objects.create(
+                    name=form.cleaned_data['name'],
+                    email=form.cleaned_data['email'],
+                    subject=form.cleaned_data['subject'],
+                    message=form.cleaned_data['message']
                 )
-                messages.success(request, 'Thank you! Your message has been sent successfully.')
-            except Exception as e:
-                messages.warning(request, 'Message saved but email notification failed. I will still get back to you!')
+                enqueue(send_contact_notification, message_id=contact_message.pk)
+            messages.success(request, 'Thank you! Your message has been sent successfully.')
 
             return redirect('contact')
     else:
         form = ContactForm()
 
-    profile = Profile.objects.first()
     context = {
         'form': form,
-        'profile': profile,
     }
     return render(request, 'main/contact.html', context)
 
-from django.shortcuts import redirect
-
 def download_resume(request):
-    drive_link = "https://drive.google.com/file/d/1LMrY57BEEraAV-9EHpVFHzbET38g6rm5/view?usp=sharing"
-    return redirect(drive_link)
+    """The active resume, streamed from our origin (see main.resume).
+
+    With RESUME_DELIVERY = 'redirect', or when the file cannot be fetched,
+    it redirects to a signed Cloudinary URL instead.
+    """
+    active = resume.get_active_resume()
+    if active is None:
+        raise Http404('No resume uploaded')
+    if settings.RESUME_DELIVERY == 'redirect':
+        return redirect(active.get_download_url())
+
+    token = resume.upload_token(active)
+    etag = f'"{token}"'
+    if request.GET.get('v') == token:
+        # The link names this upload, so it never changes
+        cache_control = 'public, max-age=31536000, immutable'
+    else:
+        cache_control = f'public, max-age={settings.RESUME_MAX_AGE}'
+
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+    else:
+        try:
+            file, meta = proxy.fetch(resume.delivery_path(active))
+        except proxy.UpstreamError as e:
+            logger.warning(f'Could not fetch resume {active.pk}, redirecting: {e}')
+            return redirect(active.get_download_url())
+        filename = resume.filename(active)
+        content_type = mimetypes.guess_type(filename)[0] or meta['content_type']
+        response = ranged_file_response(
+            request, file, content_type, etag=etag, last_modified=active.uploaded_at.timestamp(),
+        )
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Cache-Control'] = cache_control
+    return response
+
 
+def media_proxy(request, path):
+    """Cloudinary asset ``path`` served from the local disk cache"""
+    if not settings.MEDIA_PROXY_ENABLED:
+        raise Http404
+    try:
+        file, meta = proxy.fetch(path)
+    except proxy.UpstreamError as e:
+        if e.status is not None and e.status < 500:
+            raise Http404
+        # Not cached and upstream too slow: let the client fetch it directly
+        return redirect(proxy.upstream_url(path))
 
+    if proxy.is_immutable(path):
+        cache_control = 'public, max-age=31536000, immutable'
+    else:
+        cache_control = f'public, max-age={settings.MEDIA_PROXY_MAX_AGE}'
+    etag = meta.get('etag')
+    if etag and etag in request.headers.get('If-None-Match', ''):
+        file.close()
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(file, content_type=meta['content_type'])
+        if meta.get('last_modified'):
+            response['Last-Modified'] = meta['last_modified']
+    if etag:
+        response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    return response
+
+
+@conditional('skills', weak=True)
 def skills_api(request):
-    """API endpoint for skills data (for animations)"""
-    skills = Skill.objects.all().values('name', 'proficiency', 'category', 'icon')
-    skills_data = list(skills)
+    """API endpoint for skills data (for animations)
 
-    from django.http import JsonResponse
-    return JsonResponse({'skills': skills_data})
+    The body is built and compressed once per skills version.
+    """
+    version = content_validators(('skills',), request)['skills'][0]
+    bodies = precompressed_json('skills', version, lambda: get_skills_payload(version))
+    return precompressed_response(request, bodies)
 
+@conditional('projects', 'skills')
 def search_projects(request):
-    """AJAX search for projects"""
+    """AJAX search for projects, paginated with ``cursor``"""
+    from django.http import JsonResponse
+
     query = request.GET.get('q', '')
-    if query:
-        projects = Project.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query)
-        )[:5]
-
-        results = []
-        for project in projects:
-            results.append({
-                'title': project.title,
-                'url': project.get_absolute_url(),
-                'description': project.short_description,
-                'image': project.image.url if project.image else None,
-            })
-
-        from django.http import JsonResponse
-        return JsonResponse({'results': results})
+    if not query:
+        return JsonResponse({'results': [], 'next_cursor': None, 'prev_cursor': None})
 
-    from django.http import JsonResponse
-    return JsonResponse({'results': []})
+    try:
+        limit = int(request.GET.get('limit', SEARCH_RESULTS_PER_PAGE))
+    except ValueError:
+        limit = SEARCH_RESULTS_PER_PAGE
+    limit = max(1, min(limit, SEARCH_RESULTS_MAX_PER_PAGE))
+
+    projects = search_queryset(Project.objects.all(), query)
+    ordering = ['-search_rank', *Project._meta.ordering]
+    page = KeysetPaginator(projects, limit, ordering).page(request.GET.get('cursor'))
+
+    results = []
+    for project in page:
+        results.append({
+            'title': project.title,
+            'url': project.get_absolute_url(),
+            'description': project.short_description,
+            'image': project.get_image_url(),
+        })
+
+    return JsonResponse({
+        'results': results,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    })
@@ -1,7 +1,7 @@
 # portfolio/settings.py - FIXED VERSION FOR PERSISTENT CLOUDINARY STORAGE
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 import dj_database_url
 import cloudinary
 import cloudinary.uploader
@@ -36,6 +36,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'main.replicas.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'portfolio.urls'
@@ -51,6 +52,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'main.context_processors.profile',
+                'main.context_processors.resume',
             ],
         },
     },
@@ -58,13 +61,70 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'portfolio.wsgi.application'
 
-# Database configuration
+# Database configuration. Connections are kept for DB_CONN_MAX_AGE seconds
+# (0 closes them after every request) and checked before being reused.
+# DB_STATEMENT_TIMEOUT (milliseconds, PostgreSQL only, 0 for none) aborts
+# runaway queries. Gunicorn opens the connections at worker boot
+# (gunicorn.conf.py, main.database).
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+DB_STATEMENT_TIMEOUT = config('DB_STATEMENT_TIMEOUT', default=0, cast=int)
+
 DATABASES = {
     'default': dj_database_url.config(
-        default=config('DATABASE_URL')
+        default=config('DATABASE_URL'),
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
     )
 }
 
+# Optional read replicas for the public pages (main.replicas), as
+# comma-separated database URLs. Public reads stay on the primary for
+# REPLICA_LAG seconds after a content change, and a client that wrote is
+# pinned to it for REPLICA_PIN_SECONDS.
+DATABASE_REPLICA_URLS = config('DATABASE_REPLICA_URLS', default='', cast=Csv())
+DATABASE_REPLICAS = []
+for index, url in enumerate(DATABASE_REPLICA_URLS, 1):
+    alias = f'replica{index}'
+    DATABASES[alias] = dj_database_url.parse(
+        url, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['main.replicas.ReplicaRouter']
+REPLICA_LAG = config('REPLICA_LAG', default=5.0, cast=float)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=30, cast=int)
+REPLICA_HEALTH_INTERVAL = config('REPLICA_HEALTH_INTERVAL', default=10.0, cast=float)
+
+# Sent as a connection parameter, so it costs no extra round trip
+if DB_STATEMENT_TIMEOUT:
+    for database in DATABASES.values():
+        if database['ENGINE'] == 'django.db.backends.postgresql':
+            database.setdefault('OPTIONS', {})['options'] = f'-c statement_timeout={DB_STATEMENT_TIMEOUT}'
+
+# Cache configuration - shared by all gunicorn workers so that content
+# version bumps (see main/cache.py) are seen everywhere
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / '.django_cache')),
+            'OPTIONS': {'MAX_ENTRIES': 2000},
+        }
+    }
+
+# Rendered pages are keyed by content version, so this only bounds how
+# long superseded entries linger
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -101,8 +161,29 @@ cloudinary.config(
     secure=True  # Forces HTTPS URLs
 )
 
+# Seconds a signed delivery URL is reused before it is signed again (main.media)
+CLOUDINARY_SIGNED_URL_TTL = config('CLOUDINARY_SIGNED_URL_TTL', default=60 * 60, cast=int)
+
+# Optional read-through disk cache in front of Cloudinary (main.media_proxy).
+# Stored image variants embed the URLs, so run rebuild_image_variants after
+# switching it on or off.
+MEDIA_PROXY_ENABLED = config('MEDIA_PROXY_ENABLED', default=False, cast=bool)
+MEDIA_PROXY_ROOT = config('MEDIA_PROXY_ROOT', default=str(BASE_DIR / '.media_cache'))
+MEDIA_PROXY_MAX_BYTES = config('MEDIA_PROXY_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
+MEDIA_PROXY_TIMEOUT = config('MEDIA_PROXY_TIMEOUT', default=3.0, cast=float)
+MEDIA_PROXY_MAX_AGE = config('MEDIA_PROXY_MAX_AGE', default=60 * 60 * 24, cast=int)
+MEDIA_PROXY_UPSTREAM = config('MEDIA_PROXY_UPSTREAM', default='')
+
+# /resume/download/ streams the active resume through the media proxy's disk
+# cache ('stream') or redirects to a signed Cloudinary URL ('redirect').
+# RESUME_MAX_AGE is the browser cache lifetime of unversioned links.
+RESUME_DELIVERY = config('RESUME_DELIVERY', default='stream')
+RESUME_MAX_AGE = config('RESUME_MAX_AGE', default=60 * 60, cast=int)
+
 # CRITICAL: Use Cloudinary for media storage
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+if MEDIA_PROXY_ENABLED:
+    DEFAULT_FILE_STORAGE = 'main.media_proxy.MediaProxyStorage'
 
 # Remove local media storage to prevent confusion
 # MEDIA_URL and MEDIA_ROOT should not be used when using Cloudinary
@@ -124,6 +205,28 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 
+# Background tasks (main.queue): seconds before a running task whose
+# worker stopped responding is handed to another worker
+TASK_LOCK_TIMEOUT = config('TASK_LOCK_TIMEOUT', default=10 * 60, cast=int)
+# Set when a ``run_worker`` process is deployed (Procfile "worker"). Without
+# one, enqueue() runs due tasks itself once the request's transaction commits
+TASK_WORKER = config('TASK_WORKER', default=False, cast=bool)
+
+# Retention for contact messages (archive_messages, main.archive): read
+# messages older than MESSAGE_RETENTION_DAYS move to date-partitioned files
+# under MESSAGE_ARCHIVE_ROOT. The messages are deleted from the database, so
+# there is no default: it must be a persistent disk (e.g. a Render disk
+# mount), never the app directory, which is replaced on every deploy
+MESSAGE_RETENTION_DAYS = config('MESSAGE_RETENTION_DAYS', default=180, cast=int)
+MESSAGE_ARCHIVE_ROOT = config('MESSAGE_ARCHIVE_ROOT', default='')
+
+# Show the stored-URL debug columns in the admin changelists (main.admin)
+ADMIN_DEBUG_COLUMNS = config('ADMIN_DEBUG_COLUMNS', default=DEBUG, cast=bool)
+# Inline-editable status/featured columns in the project changelist. Set it
+# to False to drop them when very long pages render too slowly: the per-row
+# form widgets cost no queries but dominate the render time
+ADMIN_LIST_EDITABLE = config('ADMIN_LIST_EDITABLE', default=True, cast=bool)
+
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = True